@@ -1,7 +1,5 @@
 from flask import Flask, render_template, jsonify, request, redirect, url_for, session
 import json
-import os
-import subprocess
 import sys
 from pathlib import Path
 from datetime import datetime
@@ -10,6 +8,8 @@ from functools import wraps
 def create_app():
     # Configuração correta dos caminhos
     BASE_DIR = Path(__file__).parent.parent  # Volta para a raiz do projeto
+    if str(BASE_DIR) not in sys.path:
+        sys.path.insert(0, str(BASE_DIR))  # Módulos capture_* da raiz
     TEMPLATE_DIR = BASE_DIR / 'templates'    # Templates estão na raiz
     
     app = Flask(__name__, 
@@ -25,6 +25,8 @@ def create_app():
     # Criar diretórios se não existirem
     DATA_DIR.mkdir(parents=True, exist_ok=True)
     
+    from capture_latest import load_latest_data, read_latest
+    
     def login_required(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
@@ -67,7 +69,12 @@ def create_app():
     def api_latest_data():
         """Retorna os dados mais recentes"""
         try:
-            # Procura arquivos de captura
+            # Ponteiro gravado pelo save_data: sem varrer as pastas
+            data = load_latest_data(DATA_DIR)
+            if data:
+                return jsonify(data)
+            
+            # Dados anteriores ao ponteiro: procura arquivos de captura
             capture_files = []
             
             # Procura em data/captures
@@ -83,6 +90,17 @@ def create_app():
             capture_files.extend(BASE_DIR.glob('captura_*.json'))
             capture_files.extend(BASE_DIR.glob('resumo_*.json'))
             
+            # Modo delta (capture.storage = 'delta'): captura remontada do histórico
+            history_index = BASE_DIR / 'data' / 'history' / 'index.json'
+            if history_index.exists() and (
+                not capture_files
+                or history_index.stat().st_mtime > max(p.stat().st_mtime for p in capture_files)
+            ):
+                from capture_history import CaptureHistory
+                data = CaptureHistory(history_index.parent).rebuild()
+                if data:
+                    return jsonify(data)
+            
             if not capture_files:
                 return jsonify({'error': 'Nenhum dado disponível'}), 404
             
@@ -98,50 +116,29 @@ def create_app():
             print(f"Erro ao carregar dados: {e}")
             return jsonify({'error': str(e)}), 500
     
+    # Fila de capturas: um worker no próprio processo com o navegador quente
+    from app.services.capture_jobs import CaptureJobQueue
+    capture_jobs = CaptureJobQueue(
+        CONFIG_DIR / 'config.json',
+        user_data_dir=BASE_DIR / 'data' / 'browser_profile_web'
+    )
+    app.extensions['capture_jobs'] = capture_jobs
+    
     @app.route('/api/capture', methods=['POST'])
     @login_required
     def api_capture():
-        """Inicia captura de dados"""
+        """Enfileira uma captura e retorna o job para acompanhar o progresso"""
         try:
-            # Procura script de captura
-            capture_scripts = [
-                'capture_corrected.py',
-                'capture_complete.py',
-                'captura.py'
-            ]
-            
-            capture_script = None
-            for script in capture_scripts:
-                script_path = BASE_DIR / script
-                if script_path.exists():
-                    capture_script = str(script_path)
-                    break
-            
-            if not capture_script:
-                return jsonify({
-                    'error': 'Sistema de captura não encontrado',
-                    'detail': 'Nenhum script de captura disponível'
-                }), 404
-            
-            # Executa captura em processo separado
-            if os.name == 'nt':  # Windows
-                # Cria um arquivo .bat temporário
-                bat_file = BASE_DIR / 'temp_capture.bat'
-                with open(bat_file, 'w') as f:
-                    f.write(f'@echo off\n')
-                    f.write(f'cd /d "{BASE_DIR}"\n')
-                    f.write(f'python "{capture_script}"\n')
-                    f.write(f'pause\n')
-                
-                subprocess.Popen(['cmd', '/c', 'start', 'Captura Imperio Rapidinhas', str(bat_file)])
-            else:
-                # Linux/Mac
-                subprocess.Popen([sys.executable, capture_script])
+            options = request.get_json(silent=True) or {}
+            job = capture_jobs.submit(capture_details=options.get('tipo', 'completa') != 'rapida')
             
             return jsonify({
                 'status': 'success',
-                'message': 'Captura iniciada! Aguarde alguns minutos e recarregue a página.'
-            })
+                'message': 'Captura na fila! Acompanhe o progresso pelo status do job.',
+                'job_id': job.id,
+                'status_url': url_for('api_capture_status', job_id=job.id),
+                'job': job.to_dict()
+            }), 202
             
         except Exception as e:
             return jsonify({
@@ -149,17 +146,50 @@ def create_app():
                 'detail': str(e)
             }), 500
     
+    @app.route('/api/capture/<job_id>')
+    @login_required
+    def api_capture_status(job_id):
+        """Progresso de uma captura: etapa, página/relatório atual e ETA"""
+        job = capture_jobs.get(job_id)
+        if job is None:
+            return jsonify({'error': 'Captura não encontrada'}), 404
+        return jsonify(job.to_dict())
+    
+    @app.route('/api/capture/<job_id>/cancel', methods=['POST'])
+    @login_required
+    def api_capture_cancel(job_id):
+        """Cancela uma captura na fila ou em andamento"""
+        job = capture_jobs.cancel(job_id)
+        if job is None:
+            return jsonify({'error': 'Captura não encontrada'}), 404
+        return jsonify(job.to_dict())
+    
+    @app.route('/api/capture/jobs')
+    @login_required
+    def api_capture_jobs():
+        """Capturas recentes (ativas e finalizadas)"""
+        return jsonify([job.to_dict() for job in capture_jobs.list()])
+    
     @app.route('/api/status')
     @login_required
     def api_status():
         """Retorna status do sistema"""
         try:
+            # Verifica configuração
+            config_file = CONFIG_DIR / 'config.json'
+            
+            latest = read_latest(DATA_DIR)
+            if latest:
+                return jsonify({
+                    'data_files': latest.get('total_arquivos', 0),
+                    'config_exists': config_file.exists(),
+                    'last_update': datetime.fromtimestamp(latest['timestamp_unix']).strftime('%d/%m/%Y %H:%M:%S')
+                })
+            
             # Conta arquivos de dados
             capture_files = list(DATA_DIR.glob('captura_*.json')) if DATA_DIR.exists() else []
             capture_files.extend(BASE_DIR.glob('captura_*.json'))
             
-            # Verifica configuração
-            config_file = CONFIG_DIR / 'config.json'
             config_exists = config_file.exists()
             
             status = {
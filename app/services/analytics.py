@@ -1,11 +1,12 @@
 """
 Serviço de Analytics e Relatórios Gerenciais
+Lê as capturas do banco de ingestão (app/services/ingestion.py); as
+consultas do dashboard usam os agregados por hora/dia, cujo tamanho não
+depende de quantas capturas existem
 """
 from datetime import datetime, timedelta
-from sqlalchemy import func, and_, or_
 import pandas as pd
 import numpy as np
-from app.models import Capture, Rifa, User, ActivityLog, Report, db
 import json
 from pathlib import Path
 import matplotlib.pyplot as plt
@@ -13,12 +14,15 @@ import seaborn as sns
 from io import BytesIO
 import base64
 
+from app.services.ingestion import IngestionStore
+
 class AnalyticsService:
     """Serviço de análise de dados e geração de relatórios"""
     
-    def __init__(self):
+    def __init__(self, store=None):
         self.reports_dir = Path('data/reports')
         self.reports_dir.mkdir(parents=True, exist_ok=True)
+        self.store = store or IngestionStore()
         
         # Configuração de visualização
         plt.style.use('dark_background')
@@ -36,17 +40,14 @@ class AnalyticsService:
         else:
             start_date = None
         
-        # Query base
-        query = Capture.query
-        if start_date:
-            query = query.filter(Capture.timestamp >= start_date)
-        
         # Métricas agregadas
+        totals = self._totals_since(start_date)
+        
         metrics = {
-            'total_capturas': query.count(),
-            'total_rifas': db.session.query(func.sum(Capture.total_rifas)).scalar() or 0,
-            'arrecadacao_total': db.session.query(func.sum(Capture.arrecadado_total)).scalar() or 0,
-            'titulos_vendidos': db.session.query(func.sum(Capture.titulos_total)).scalar() or 0,
+            'total_capturas': totals['capturas'],
+            'total_rifas': totals['total_rifas'],
+            'arrecadacao_total': totals['arrecadado_total'],
+            'titulos_vendidos': totals['titulos_total'],
             'ticket_medio': 0,
             'taxa_sucesso': 0,
             'crescimento': 0
@@ -56,10 +57,14 @@ class AnalyticsService:
         if metrics['titulos_vendidos'] > 0:
             metrics['ticket_medio'] = metrics['arrecadacao_total'] / metrics['titulos_vendidos']
         
-        # Taxa de sucesso das capturas
-        capturas_sucesso = query.filter(Capture.status == 'success').count()
-        if metrics['total_capturas'] > 0:
-            metrics['taxa_sucesso'] = (capturas_sucesso / metrics['total_capturas']) * 100
+        # Taxa de sucesso: capturas concluídas sobre concluídas + execuções que falharam
+        failures = self.store.query(
+            "SELECT COUNT(*) FROM capturas_falhas WHERE timestamp_unix >= ?",
+            (start_date.timestamp() if start_date else 0,)
+        )[0][0]
+        attempts = metrics['total_capturas'] + failures
+        if attempts > 0:
+            metrics['taxa_sucesso'] = (metrics['total_capturas'] / attempts) * 100
         
         # Calcula crescimento
         if period == 'today':
@@ -67,32 +72,61 @@ class AnalyticsService:
             yesterday_start = yesterday.replace(hour=0, minute=0, second=0, microsecond=0)
             yesterday_end = yesterday.replace(hour=23, minute=59, second=59, microsecond=999999)
             
-            yesterday_total = db.session.query(func.sum(Capture.arrecadado_total))\
-                .filter(and_(Capture.timestamp >= yesterday_start, 
-                           Capture.timestamp <= yesterday_end)).scalar() or 0
+            yesterday_total = self.store.query(
+                "SELECT arrecadado_total FROM rollup_dia WHERE dia = ?",
+                (yesterday_start.strftime('%Y-%m-%d'),)
+            )
+            yesterday_total = yesterday_total[0][0] if yesterday_total else 0
             
             if yesterday_total > 0:
                 metrics['crescimento'] = ((metrics['arrecadacao_total'] - yesterday_total) / yesterday_total) * 100
         
         return metrics
     
+    def _totals_since(self, start_date=None):
+        """Somas das capturas desde `start_date`
+
+        Horas completas vêm de rollup_hora; só a fração da primeira hora
+        consulta a tabela de capturas (pelo índice de timestamp).
+        """
+        measures = ('capturas', 'total_rifas', 'arrecadado_total', 'titulos_total')
+        sums = ', '.join(f"COALESCE(SUM({m}), 0)" for m in measures)
+        
+        if start_date is None:
+            row = self.store.query(f"SELECT {sums} FROM rollup_dia")[0]
+            return dict(zip(measures, row))
+        
+        next_hour = start_date.replace(minute=0, second=0, microsecond=0)
+        if next_hour < start_date:
+            next_hour += timedelta(hours=1)
+        
+        hours = self.store.query(
+            f"SELECT {sums} FROM rollup_hora WHERE hora >= ?",
+            (next_hour.strftime('%Y-%m-%d %H'),)
+        )[0]
+        edge = self.store.query(
+            f"""SELECT COUNT(*), COALESCE(SUM(total_rifas), 0), COALESCE(SUM(arrecadado_total), 0),
+                       COALESCE(SUM(titulos_total), 0)
+                FROM capturas WHERE timestamp_unix >= ? AND timestamp_unix < ?""",
+            (start_date.timestamp(), next_hour.timestamp())
+        )[0]
+        return {m: hours[i] + edge[i] for i, m in enumerate(measures)}
+    
     def get_rifas_performance(self, limit=10):
         """Análise de performance das rifas"""
         # Top rifas por arrecadação
-        top_rifas = db.session.query(
-            Rifa.titulo,
-            func.sum(Rifa.arrecadado_total).label('total'),
-            func.avg(Rifa.ticket_medio).label('ticket_medio'),
-            func.sum(Rifa.vendas_total).label('vendas')
-        ).group_by(Rifa.titulo)\
-         .order_by(func.sum(Rifa.arrecadado_total).desc())\
-         .limit(limit).all()
+        top_rifas = self.store.query(
+            """SELECT titulo, SUM(arrecadado_total) AS total, AVG(ticket_medio) AS ticket_medio,
+                      SUM(vendas_total) AS vendas
+               FROM rifas GROUP BY titulo ORDER BY total DESC LIMIT ?""",
+            (limit,)
+        )
         
         return [{
-            'titulo': r.titulo,
-            'arrecadacao': float(r.total),
-            'ticket_medio': float(r.ticket_medio),
-            'vendas': int(r.vendas)
+            'titulo': r['titulo'],
+            'arrecadacao': float(r['total'] or 0),
+            'ticket_medio': float(r['ticket_medio'] or 0),
+            'vendas': int(r['vendas'] or 0)
         } for r in top_rifas]
     
     def get_sales_timeline(self, days=30):
@@ -100,33 +134,44 @@ class AnalyticsService:
         start_date = datetime.now() - timedelta(days=days)
         
         # Dados por dia
-        daily_data = db.session.query(
-            func.date(Capture.timestamp).label('date'),
-            func.sum(Capture.arrecadado_total).label('total'),
-            func.sum(Capture.titulos_total).label('titulos')
-        ).filter(Capture.timestamp >= start_date)\
-         .group_by(func.date(Capture.timestamp))\
-         .order_by(func.date(Capture.timestamp)).all()
+        daily_data = self.store.query(
+            """SELECT dia AS date, arrecadado_total AS total, titulos_total AS titulos
+               FROM rollup_dia WHERE dia >= ? ORDER BY dia""",
+            (start_date.strftime('%Y-%m-%d'),)
+        )
         
         return [{
-            'date': str(d.date),
-            'arrecadacao': float(d.total),
-            'titulos': int(d.titulos)
+            'date': str(d['date']),
+            'arrecadacao': float(d['total'] or 0),
+            'titulos': int(d['titulos'] or 0)
         } for d in daily_data]
     
     def get_hourly_pattern(self):
         """Padrão de vendas por hora"""
-        hourly_data = db.session.query(
-            func.strftime('%H', Capture.timestamp).label('hour'),
-            func.avg(Capture.arrecadado_total).label('avg_total')
-        ).group_by(func.strftime('%H', Capture.timestamp))\
-         .order_by('hour').all()
+        hourly_data = self.store.query(
+            """SELECT hora AS hour, SUM(arrecadado_total) / SUM(capturas) AS avg_total
+               FROM rollup_semana_hora GROUP BY hora ORDER BY hora"""
+        )
         
         return [{
-            'hour': int(h.hour),
-            'avg_arrecadacao': float(h.avg_total)
+            'hour': int(h['hour']),
+            'avg_arrecadacao': float(h['avg_total'] or 0)
         } for h in hourly_data]
     
+    def get_weekday_hour_pattern(self):
+        """Média de arrecadação por dia da semana (0 = domingo) × hora"""
+        rows = self.store.query(
+            """SELECT dia_semana, hora, arrecadado_total / capturas AS avg_total, capturas
+               FROM rollup_semana_hora ORDER BY dia_semana, hora"""
+        )
+        
+        return [{
+            'weekday': r['dia_semana'],
+            'hour': r['hora'],
+            'avg_arrecadacao': float(r['avg_total'] or 0),
+            'capturas': r['capturas']
+        } for r in rows]
+    
     def generate_performance_report(self, start_date=None, end_date=None):
         """Gera relatório completo de performance"""
         if not end_date:
@@ -134,28 +179,11 @@ class AnalyticsService:
         if not start_date:
             start_date = end_date - timedelta(days=30)
         
-        # Coleta dados
-        captures = Capture.query.filter(
-            and_(Capture.timestamp >= start_date,
-                 Capture.timestamp <= end_date)
-        ).all()
+        df = self._load_captures(start_date, end_date)
         
-        if not captures:
+        if df.empty:
             return None
         
-        # Prepara dados para análise
-        data = []
-        for capture in captures:
-            data.append({
-                'timestamp': capture.timestamp,
-                'arrecadacao': capture.arrecadado_total,
-                'titulos': capture.titulos_total,
-                'vendas': capture.vendas_total,
-                'ticket_medio': capture.ticket_medio,
-                'rifas_ativas': capture.rifas_ativas
-            })
-        
-        df = pd.DataFrame(data)
         df['date'] = df['timestamp'].dt.date
         df['weekday'] = df['timestamp'].dt.day_name()
         df['hour'] = df['timestamp'].dt.hour
@@ -192,19 +220,38 @@ class AnalyticsService:
             json.dump(report, f, ensure_ascii=False, indent=2)
         
         # Salva no banco
-        db_report = Report(
-            name=f"Relatório de Performance - {start_date.strftime('%d/%m/%Y')} a {end_date.strftime('%d/%m/%Y')}",
-            type='performance',
-            start_date=start_date,
-            end_date=end_date,
-            file_path=str(report_path)
+        self.store.save_report(
+            f"Relatório de Performance - {start_date.strftime('%d/%m/%Y')} a {end_date.strftime('%d/%m/%Y')}",
+            'performance', start_date, end_date, report_path, report
         )
-        db_report.set_data(report)
-        db.session.add(db_report)
-        db.session.commit()
         
         return report
     
+    def _load_captures(self, start_date, end_date):
+        """Capturas do período: partições Parquet do período ou, sem pyarrow, o SQLite"""
+        columns = {
+            'timestamp': 'timestamp',
+            'arrecadado_total': 'arrecadacao',
+            'titulos_total': 'titulos',
+            'vendas_total': 'vendas',
+            'ticket_medio_geral': 'ticket_medio',
+            'rifas_ativas': 'rifas_ativas'
+        }
+        
+        if self.store.archive:
+            df = self.store.archive.read('capturas', start_date, end_date, list(columns) + ['timestamp_unix'])
+            df = df[df['timestamp_unix'].between(start_date.timestamp(), end_date.timestamp())]
+            df = df.sort_values('timestamp_unix').drop(columns='timestamp_unix')
+            return df.rename(columns=columns).reset_index(drop=True)
+        
+        return pd.read_sql_query(
+            f"""SELECT {', '.join(f'{c} AS {a}' for c, a in columns.items())}
+                FROM capturas WHERE timestamp_unix BETWEEN ? AND ? ORDER BY timestamp_unix""",
+            self.store.connect(),
+            params=(start_date.timestamp(), end_date.timestamp()),
+            parse_dates=['timestamp']
+        )
+    
     def _calculate_growth_rate(self, df):
         """Calcula taxa de crescimento"""
         daily_totals = df.groupby('date')['arrecadacao'].sum()
@@ -319,23 +366,6 @@ class AnalyticsService:
         
         return charts
     
-    def get_user_activity_report(self):
-        """Relatório de atividade dos usuários"""
-        # Atividade por usuário
-        user_activity = db.session.query(
-            User.username,
-            func.count(ActivityLog.id).label('total_actions'),
-            func.max(ActivityLog.timestamp).label('last_activity')
-        ).join(ActivityLog)\
-         .group_by(User.username)\
-         .order_by(func.count(ActivityLog.id).desc()).all()
-        
-        return [{
-            'usuario': u.username,
-            'total_acoes': u.total_actions,
-            'ultima_atividade': u.last_activity.isoformat() if u.last_activity else None
-        } for u in user_activity]
-    
     def export_to_excel(self, report_data, filename=None):
         """Exporta relatório para Excel"""
         if not filename:
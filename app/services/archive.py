@@ -0,0 +1,101 @@
+"""
+Arquivo colunar das capturas (Parquet particionado por dia)
+Cada captura ingerida vai para data/archive/<tabela>/dia=AAAA-MM-DD/: as
+linhas de relatório em um arquivo por captura e os resumos em um único
+arquivo por dia (capturas.parquet, regravado a cada captura do dia), para
+os relatórios de período carregarem só as partições e colunas pedidas
+direto no pandas.
+pyarrow é opcional: sem ele o arquivo fica desativado e o AnalyticsService
+lê do SQLite.
+"""
+import os
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+TABLES = ('capturas', 'relatorio_linhas')
+
+
+class ColumnarArchive:
+    """Partições diárias em Parquet de capturas e linhas de relatório"""
+
+    def __init__(self, base_dir='data/archive'):
+        self.base_dir = Path(base_dir)
+
+    @staticmethod
+    def available():
+        return pq is not None
+
+    def partition(self, table, day):
+        return self.base_dir / table / f"dia={day}"
+
+    def path(self, table, day, arquivo):
+        if table == 'capturas':
+            return self.partition(table, day) / 'capturas.parquet'
+        return self.partition(table, day) / f"{Path(arquivo).stem}.parquet"
+
+    def has(self, day, arquivo):
+        if not self.path('relatorio_linhas', day, arquivo).exists():
+            return False
+        summary = self.path('capturas', day, arquivo)
+        if not summary.exists():
+            return False
+        return arquivo in pq.ParquetFile(summary).read(columns=['arquivo']).column('arquivo').to_pylist()
+
+    def write(self, day, arquivo, frames):
+        """Grava {tabela: DataFrame} de uma captura na partição do dia"""
+        linhas = frames['relatorio_linhas']
+        capturas = frames['capturas']
+
+        summary = self.path('capturas', day, arquivo)
+        if summary.exists():
+            previous = pq.ParquetFile(summary).read().to_pandas()
+            capturas = pd.concat([previous[previous['arquivo'] != arquivo], capturas], ignore_index=True)
+
+        self.write_table(self.path('relatorio_linhas', day, arquivo), linhas)
+        self.write_table(summary, capturas)
+
+    def remove(self, day, arquivo):
+        """Tira uma captura da partição do dia"""
+        linhas = self.path('relatorio_linhas', day, arquivo)
+        if linhas.exists():
+            linhas.unlink()
+
+        summary = self.path('capturas', day, arquivo)
+        if summary.exists():
+            previous = pq.ParquetFile(summary).read().to_pandas()
+            self.write_table(summary, previous[previous['arquivo'] != arquivo])
+
+    @staticmethod
+    def write_table(path, frame):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = path.with_suffix('.tmp')
+        pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), tmp_file)
+        os.replace(tmp_file, path)
+
+    def days(self, table):
+        """Dias com partição gravada, em ordem"""
+        root = self.base_dir / table
+        if not root.exists():
+            return []
+        return sorted(p.name[4:] for p in root.glob('dia=*') if p.is_dir())
+
+    def read(self, table, start_date, end_date, columns=None):
+        """DataFrame com as partições de start_date a end_date (só as colunas pedidas)"""
+        first, last = start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')
+        files = [
+            path
+            for day in self.days(table) if first <= day <= last
+            for path in sorted(self.partition(table, day).glob('*.parquet'))
+        ]
+        if not files:
+            return pd.DataFrame(columns=columns)
+        # Um ParquetFile por arquivo sai bem mais barato que montar um dataset
+        return pa.concat_tables([pq.ParquetFile(path).read(columns=columns) for path in files]).to_pandas()
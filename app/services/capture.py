@@ -2,22 +2,23 @@ import sys
 from pathlib import Path
 
 # Adiciona diretorio ao path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-try:
-    from capture_complete import ImperioRapidinhasFinal
-except ImportError:
-    sys.path.insert(0, str(Path(__file__).parent.parent / 'legacy'))
-    from capture_legacy import ImperioRapidinhasFinal
+from capture_corrected import ImperioCapturaCorrected
 
 class CaptureService:
+    """Capturas do CLI (run.py capture)
+
+    Passam pela mesma trava de captura única do agendador e do servidor web:
+    se já houver uma captura rodando, retornam o arquivo dela.
+    """
     def __init__(self):
         self.config_file = './config/config.json'
 
     def full_capture(self, headless=False):
-        capture = ImperioRapidinhasFinal(self.config_file)
-        capture.run(headless=headless, capture_reports=True)
+        capture = ImperioCapturaCorrected(self.config_file)
+        return capture.run(headless=headless, capture_details=True)
 
     def quick_capture(self, headless=False):
-        capture = ImperioRapidinhasFinal(self.config_file)
-        capture.run(headless=headless, capture_reports=False)
+        capture = ImperioCapturaCorrected(self.config_file)
+        return capture.run(headless=headless, capture_details=False)
@@ -0,0 +1,216 @@
+"""
+Fila de capturas do servidor web
+Cada clique em "Capturar" vira um job com ID executado por uma thread de
+trabalho no próprio processo, reaproveitando o navegador quente entre jobs.
+O progresso (página da lista, relatório i/n, ETA) fica disponível para
+consulta em /api/capture/<id>, e o job pode ser cancelado.
+"""
+import queue
+import threading
+import time
+import uuid
+
+from capture_worker import WarmBrowserWorker
+
+# Estados de um job
+QUEUED = 'na_fila'
+RUNNING = 'executando'
+DONE = 'concluida'
+FAILED = 'falhou'
+CANCELLED = 'cancelada'
+
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+
+class CaptureJob:
+    """Uma captura pedida pelo painel, com progresso e cancelamento"""
+
+    def __init__(self, capture_details=True):
+        self.id = uuid.uuid4().hex[:12]
+        self.capture_details = capture_details
+        self.status = QUEUED
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.progress = {}
+        self.stage_started = None
+        self.stage_start_count = 0
+        self.result = None
+        self.error = None
+        self.cancel_event = threading.Event()
+        self.lock = threading.Lock()
+
+    def update(self, progress):
+        """Callback de progresso da captura (roda na thread da captura)"""
+        with self.lock:
+            if progress.get('etapa') != self.progress.get('etapa'):
+                self.stage_started = time.time()
+                self.stage_start_count = progress_count(progress)[0]
+            self.progress = progress
+
+    def eta(self):
+        """Segundos restantes estimados pelo ritmo da etapa atual (None se incerto)"""
+        done, total = progress_count(self.progress)
+        if not total or self.stage_started is None:
+            return None
+
+        elapsed = time.time() - self.stage_started
+        advanced = done - self.stage_start_count
+        if advanced <= 0 or elapsed <= 0:
+            return None
+        return max(0.0, (total - done) * elapsed / advanced)
+
+    def to_dict(self):
+        with self.lock:
+            done, total = progress_count(self.progress)
+            eta = self.eta() if self.status == RUNNING else None
+            return {
+                'id': self.id,
+                'tipo': 'completa' if self.capture_details else 'rapida',
+                'status': self.status,
+                'criado': self.created,
+                'iniciado': self.started,
+                'finalizado': self.finished,
+                'progresso': dict(self.progress),
+                'percentual': round(100 * done / total, 1) if total else None,
+                'eta_s': round(eta, 1) if eta is not None else None,
+                'arquivo': self.result,
+                'erro': self.error
+            }
+
+
+def progress_count(progress):
+    """(feito, total) da etapa: relatórios i/n ou páginas da lista"""
+    if progress.get('etapa') == 'relatorios':
+        return progress.get('atual', 0), progress.get('total')
+    if progress.get('etapa') == 'lista':
+        return progress.get('pagina', 0), progress.get('total_paginas')
+    return 0, None
+
+
+class CaptureJobQueue:
+    """Fila FIFO de capturas atendida por uma única thread de trabalho
+
+    Um só navegador por processo: pedidos iguais feitos enquanto já há uma
+    captura na fila ou em andamento recebem o job existente. O perfil do
+    Chrome é próprio do servidor web: o daemon de automação mantém o seu
+    navegador quente em data/browser_profile, e dois Chrome vivos não podem
+    usar o mesmo diretório de perfil.
+    """
+
+    def __init__(self, config_file, headless=True, warm_browser=True, keep_finished=50,
+                 user_data_dir='data/browser_profile_web', log=None):
+        self.config_file = str(config_file)
+        self.user_data_dir = str(user_data_dir)
+        self.headless = headless
+        self.warm_browser = warm_browser
+        self.keep_finished = keep_finished
+        self.log = log or print
+        self.jobs = {}
+        self.pending = queue.Queue()
+        self.browser_worker = None
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def submit(self, capture_details=True):
+        """Enfileira uma captura; retorna o job (novo ou o já ativo)"""
+        with self.lock:
+            for job in self.jobs.values():
+                if job.status in ACTIVE_STATES and job.capture_details == capture_details:
+                    return job
+
+            job = CaptureJob(capture_details)
+            self.jobs[job.id] = job
+            self.prune()
+
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.work, name='capture-jobs', daemon=True)
+                self.thread.start()
+
+        self.pending.put(job)
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def list(self):
+        with self.lock:
+            return sorted(self.jobs.values(), key=lambda j: j.created, reverse=True)
+
+    def cancel(self, job_id):
+        """Cancela um job; na fila sai na hora, em andamento para na próxima página/relatório"""
+        job = self.get(job_id)
+        if job is None or job.status not in ACTIVE_STATES:
+            return job
+
+        job.cancel_event.set()
+        with job.lock:
+            if job.status == QUEUED:
+                job.status = CANCELLED
+                job.finished = time.time()
+        return job
+
+    def prune(self):
+        """Descarta os jobs finalizados mais antigos além de `keep_finished`"""
+        finished = [j for j in self.jobs.values() if j.status not in ACTIVE_STATES]
+        finished.sort(key=lambda j: j.created)
+        for job in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self.jobs[job.id]
+
+    def work(self):
+        while True:
+            job = self.pending.get()
+            if job is None:
+                return
+            if job.status != QUEUED:
+                continue
+            self.run_job(job)
+
+    def run_job(self, job):
+        with job.lock:
+            job.status = RUNNING
+            job.started = time.time()
+        self.log(f"🎬 Captura {job.id} iniciada")
+
+        try:
+            result, _ = self.worker().run_capture(
+                headless=self.headless,
+                capture_details=job.capture_details,
+                progress=job.update,
+                cancel_event=job.cancel_event
+            )
+            status = DONE if result else FAILED
+            error = None if result else 'Captura não concluída (veja o log do servidor)'
+        except Exception as e:
+            result, status, error = None, FAILED, str(e)
+        finally:
+            if not self.warm_browser and self.browser_worker:
+                self.browser_worker.close()
+
+        if job.cancel_event.is_set():
+            status, error = CANCELLED, None
+
+        with job.lock:
+            job.status = status
+            job.result = str(result) if result else None
+            job.error = error
+            job.finished = time.time()
+        self.log(f"🏁 Captura {job.id}: {status}")
+
+    def worker(self):
+        if self.browser_worker is None:
+            self.browser_worker = WarmBrowserWorker(
+                self.config_file, user_data_dir=self.user_data_dir, log=self.log
+            )
+        return self.browser_worker
+
+    def close(self):
+        """Para a thread de trabalho (após o job atual) e fecha o navegador"""
+        for job in self.list():
+            self.cancel(job.id)
+        self.pending.put(None)
+        if self.thread is not None:
+            self.thread.join(timeout=30)
+        if self.browser_worker:
+            self.browser_worker.close()
@@ -0,0 +1,501 @@
+"""
+Ingestão das capturas em SQLite
+Carrega cada captura_*.json (ou, no modo delta, cada captura remontada de
+data/history) em tabelas normalizadas (capturas, rifas por captura e linhas
+diárias dos relatórios), indexadas por data, token e título, para o
+AnalyticsService consultar sem varrer os arquivos JSON. Uma captura
+regravada depois de ingerida (camada quente) sai do banco, dos agregados e
+do Parquet e entra de novo.
+Mantém também agregados por hora, dia e dia da semana × hora, atualizados
+só no balde de cada captura nova, para o dashboard não reagregar o
+histórico inteiro a cada acesso. Com pyarrow instalado, cada captura vai
+também para o arquivo Parquet particionado por dia (app/services/archive.py).
+"""
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from app.services.archive import ColumnarArchive
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS capturas (
+    id INTEGER PRIMARY KEY,
+    arquivo TEXT NOT NULL UNIQUE,
+    timestamp TEXT NOT NULL,
+    timestamp_unix REAL NOT NULL,
+    camada TEXT,
+    total_rifas INTEGER,
+    rifas_ativas INTEGER,
+    rifas_finalizadas INTEGER,
+    vendas_total INTEGER,
+    titulos_total INTEGER,
+    arrecadado_total REAL,
+    ticket_medio_geral REAL,
+    total_recusadas INTEGER,
+    ingerido_em REAL
+);
+CREATE INDEX IF NOT EXISTS idx_capturas_timestamp ON capturas (timestamp_unix);
+
+CREATE TABLE IF NOT EXISTS rifas (
+    captura_id INTEGER NOT NULL REFERENCES capturas (id) ON DELETE CASCADE,
+    token TEXT,
+    rifa_id TEXT,
+    titulo TEXT,
+    status TEXT,
+    vendas_total INTEGER,
+    titulos_total INTEGER,
+    arrecadado_total REAL,
+    ticket_medio REAL,
+    recusadas INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_rifas_captura ON rifas (captura_id);
+CREATE INDEX IF NOT EXISTS idx_rifas_token ON rifas (token);
+CREATE INDEX IF NOT EXISTS idx_rifas_titulo ON rifas (titulo);
+
+CREATE TABLE IF NOT EXISTS relatorio_linhas (
+    captura_id INTEGER NOT NULL REFERENCES capturas (id) ON DELETE CASCADE,
+    token TEXT NOT NULL,
+    data TEXT NOT NULL,
+    ticket_medio REAL,
+    vendas INTEGER,
+    qtd_titulos INTEGER,
+    total REAL
+);
+CREATE INDEX IF NOT EXISTS idx_linhas_captura ON relatorio_linhas (captura_id);
+CREATE INDEX IF NOT EXISTS idx_linhas_token_data ON relatorio_linhas (token, data);
+CREATE INDEX IF NOT EXISTS idx_linhas_data ON relatorio_linhas (data);
+
+-- Execuções da captura que falharam (as concluídas estão em capturas)
+CREATE TABLE IF NOT EXISTS capturas_falhas (
+    id INTEGER PRIMARY KEY,
+    timestamp_unix REAL NOT NULL,
+    erro TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_falhas_timestamp ON capturas_falhas (timestamp_unix);
+
+-- Relatórios gerados pelo AnalyticsService (o JSON completo fica em data/reports)
+CREATE TABLE IF NOT EXISTS relatorios (
+    id INTEGER PRIMARY KEY,
+    nome TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    inicio TEXT,
+    fim TEXT,
+    arquivo TEXT,
+    dados TEXT,
+    criado_em REAL
+);
+CREATE INDEX IF NOT EXISTS idx_relatorios_tipo ON relatorios (tipo, criado_em);
+
+-- Maior id de captura já conferido no arquivo Parquet (linha única)
+CREATE TABLE IF NOT EXISTS arquivamento (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    ultimo_id INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS arquivos_ignorados (
+    arquivo TEXT PRIMARY KEY,
+    motivo TEXT,
+    ignorado_em REAL
+);
+"""
+
+# Snapshots da camada quente (versões antigas gravavam um captura_*.json a
+# cada atualização) repetiriam o arrecadado da varredura nos totais
+IGNORED_TIERS = ('quente',)
+
+# Agregados: tabela, colunas da chave e expressão SQL da chave sobre capturas.timestamp
+ROLLUPS = [
+    ('rollup_hora', ('hora',), ("strftime('%Y-%m-%d %H', timestamp)",)),
+    ('rollup_dia', ('dia',), ('date(timestamp)',)),
+    ('rollup_semana_hora', ('dia_semana', 'hora'),
+     ("CAST(strftime('%w', timestamp) AS INTEGER)", "CAST(strftime('%H', timestamp) AS INTEGER)"))
+]
+
+ROLLUP_MEASURES = ('total_rifas', 'vendas_total', 'titulos_total', 'arrecadado_total')
+
+
+def rollup_schema():
+    statements = []
+    for table, keys, _ in ROLLUPS:
+        columns = ', '.join(f"{key} {'INTEGER' if table == 'rollup_semana_hora' else 'TEXT'} NOT NULL" for key in keys)
+        measures = ', '.join(f"{m} REAL NOT NULL DEFAULT 0" for m in ROLLUP_MEASURES)
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {table} ({columns}, capturas INTEGER NOT NULL DEFAULT 0, "
+            f"{measures}, PRIMARY KEY ({', '.join(keys)}));"
+        )
+    return '\n'.join(statements)
+
+
+def rollup_upsert(table, keys):
+    """INSERT de uma captura no balde, somando ao que já existe"""
+    columns = keys + ('capturas',) + ROLLUP_MEASURES
+    updates = ', '.join(f"{c} = {c} + excluded.{c}" for c in ('capturas',) + ROLLUP_MEASURES)
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+        f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates}"
+    )
+
+
+def rollup_keys(moment):
+    """Chaves dos baldes de um instante, na ordem de ROLLUPS"""
+    return [
+        (moment.strftime('%Y-%m-%d %H'),),
+        (moment.strftime('%Y-%m-%d'),),
+        (int(moment.strftime('%w')), moment.hour)
+    ]
+
+
+RIFA_COLUMNS = ('token', 'rifa_id', 'titulo', 'status', 'vendas_total', 'titulos_total',
+                'arrecadado_total', 'ticket_medio', 'recusadas')
+
+
+def iso_date(text):
+    """'DD/MM/AAAA' da tabela diária em 'AAAA-MM-DD' (None se inválida)"""
+    try:
+        return datetime.strptime((text or '').strip()[:10], '%d/%m/%Y').strftime('%Y-%m-%d')
+    except ValueError:
+        return None
+
+
+def capture_timestamp(captura):
+    """(texto 'AAAA-MM-DD HH:MM:SS', unix) da seção 'captura' do JSON"""
+    if captura.get('timestamp_unix'):
+        moment = datetime.fromtimestamp(captura['timestamp_unix'])
+    else:
+        moment = datetime.fromisoformat(captura['timestamp'])
+    return moment.strftime('%Y-%m-%d %H:%M:%S'), moment.timestamp()
+
+
+class IngestionStore:
+    """Banco SQLite de capturas (data/analytics.db)"""
+
+    def __init__(self, db_path='data/analytics.db', archive_dir=None):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.local = threading.local()
+        self.archive = None
+        if ColumnarArchive.available():
+            self.archive = ColumnarArchive(archive_dir or self.db_path.parent / 'archive')
+        with self.connect() as conn:
+            conn.executescript(SCHEMA)
+            conn.executescript(rollup_schema())
+
+        if self.query(
+            f"SELECT 1 FROM capturas WHERE camada IN ({', '.join('?' * len(IGNORED_TIERS))}) LIMIT 1",
+            IGNORED_TIERS
+        ):
+            self.purge_ignored_tiers()
+
+        # Banco anterior aos agregados: calcula uma vez a partir das capturas
+        if not self.query('SELECT 1 FROM rollup_dia LIMIT 1') and self.query('SELECT 1 FROM capturas LIMIT 1'):
+            self.rebuild_rollups()
+
+    def connect(self):
+        """Conexão da thread atual (o servidor web atende em várias threads)"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA foreign_keys=ON')
+            self.local.conn = conn
+        return conn
+
+    def query(self, sql, params=()):
+        return self.connect().execute(sql, params).fetchall()
+
+    def ingested_files(self):
+        """{arquivo: quando foi ingerido} dos arquivos já no banco ou já descartados
+
+        Descartados valem para sempre (infinito); os ingeridos são relidos se
+        o arquivo for regravado depois (camada quente atualiza no lugar).
+        """
+        done = {row['arquivo']: row['ingerido_em'] or 0 for row in self.query('SELECT arquivo, ingerido_em FROM capturas')}
+        done.update((row['arquivo'], float('inf')) for row in self.query('SELECT arquivo FROM arquivos_ignorados'))
+        return done
+
+    def record_failure(self, error):
+        """Registra uma execução da captura que falhou (entra na taxa de sucesso)"""
+        conn = self.connect()
+        with conn:
+            conn.execute(
+                'INSERT INTO capturas_falhas (timestamp_unix, erro) VALUES (?, ?)',
+                (datetime.now().timestamp(), str(error))
+            )
+
+    def save_report(self, nome, tipo, inicio, fim, arquivo, dados):
+        """Registra um relatório gerado; retorna o id"""
+        conn = self.connect()
+        with conn:
+            cursor = conn.execute(
+                """INSERT INTO relatorios (nome, tipo, inicio, fim, arquivo, dados, criado_em)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    nome, tipo, inicio.isoformat(), fim.isoformat(), str(arquivo),
+                    json.dumps(dados, ensure_ascii=False), datetime.now().timestamp()
+                )
+            )
+        return cursor.lastrowid
+
+    def stale(self, done, arquivo, path):
+        """True se `arquivo` já foi ingerido e não mudou desde então"""
+        if arquivo not in done:
+            return False
+        try:
+            return path.stat().st_mtime <= done[arquivo]
+        except OSError:
+            return True
+
+    def forget(self, arquivo):
+        """Tira uma captura do banco, dos agregados e do Parquet (para ser reingerida)"""
+        rows = self.query('SELECT * FROM capturas WHERE arquivo = ?', (arquivo,))
+        if not rows:
+            return
+        row = rows[0]
+
+        # Desconta a captura dos baldes dela em vez de recalcular os agregados
+        measures = tuple(-(row[m] or 0) for m in ROLLUP_MEASURES)
+        moment = datetime.strptime(row['timestamp'], '%Y-%m-%d %H:%M:%S')
+        conn = self.connect()
+        with conn:
+            for (table, keys, _), key in zip(ROLLUPS, rollup_keys(moment)):
+                conn.execute(rollup_upsert(table, keys), key + (-1,) + measures)
+                conn.execute(f"DELETE FROM {table} WHERE capturas <= 0")
+            conn.execute('DELETE FROM capturas WHERE id = ?', (row['id'],))
+
+        if self.archive:
+            self.archive.remove(row['timestamp'][:10], arquivo)
+
+    def ingest_file(self, path):
+        """Ingere um captura_*.json; retorna o id da captura (None se já ingerido ou ignorado)"""
+        path = Path(path)
+        if self.query(
+            'SELECT 1 FROM capturas WHERE arquivo = ? UNION SELECT 1 FROM arquivos_ignorados WHERE arquivo = ?',
+            (path.name, path.name)
+        ):
+            return None
+
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return self.ingest(data, path.name)
+
+    def ingest(self, data, arquivo):
+        """Grava uma captura (dict no formato do captura_*.json) em uma transação
+
+        Snapshots da camada quente só são registrados como ignorados.
+        """
+        captura = data.get('captura', {})
+        resumo = data.get('resumo_geral', {})
+        timestamp, timestamp_unix = capture_timestamp(captura)
+
+        conn = self.connect()
+        if captura.get('camada') in IGNORED_TIERS:
+            with conn:
+                self.ignore(conn, arquivo, f"camada {captura['camada']}")
+            return None
+
+        with conn:
+            cursor = conn.execute(
+                """INSERT INTO capturas (arquivo, timestamp, timestamp_unix, camada, total_rifas,
+                       rifas_ativas, rifas_finalizadas, vendas_total, titulos_total,
+                       arrecadado_total, ticket_medio_geral, total_recusadas, ingerido_em)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    arquivo, timestamp, timestamp_unix, captura.get('camada', 'completa'),
+                    resumo.get('total_rifas', 0), resumo.get('rifas_ativas', 0),
+                    resumo.get('rifas_finalizadas', 0), resumo.get('vendas_total', 0),
+                    resumo.get('titulos_total', 0), resumo.get('arrecadado_total', 0),
+                    resumo.get('ticket_medio_geral', 0), resumo.get('total_recusadas', 0),
+                    datetime.now().timestamp()
+                )
+            )
+            captura_id = cursor.lastrowid
+
+            measures = tuple(resumo.get(m, 0) for m in ROLLUP_MEASURES)
+            moment = datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S')
+            for (table, keys, _), key in zip(ROLLUPS, rollup_keys(moment)):
+                conn.execute(rollup_upsert(table, keys), key + (1,) + measures)
+
+            conn.executemany(
+                f"INSERT INTO rifas (captura_id, {', '.join(RIFA_COLUMNS)}) VALUES (?{', ?' * len(RIFA_COLUMNS)})",
+                (
+                    (
+                        captura_id, rifa.get('data_token'), rifa.get('id'), rifa.get('titulo'),
+                        rifa.get('status'), rifa.get('vendas_total', 0), rifa.get('titulos_total', 0),
+                        rifa.get('arrecadado_total', 0), rifa.get('ticket_medio', 0), rifa.get('recusadas', 0)
+                    )
+                    for rifa in data.get('rifas', [])
+                )
+            )
+
+            conn.executemany(
+                """INSERT INTO relatorio_linhas (captura_id, token, data, ticket_medio, vendas, qtd_titulos, total)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                self.report_rows(captura_id, data.get('relatorios_detalhados', {}))
+            )
+
+        if self.archive:
+            self.archive_capture(captura_id)
+        return captura_id
+
+    def report_rows(self, captura_id, reports):
+        for token, report in reports.items():
+            for row in report.get('dados_tabela', []):
+                data = iso_date(row.get('data'))
+                if data is None:
+                    continue
+                yield (
+                    captura_id, token, data, row.get('ticket_medio', 0), row.get('vendas', 0),
+                    row.get('qtd_titulos', 0), row.get('total', 0)
+                )
+
+    def ignore(self, conn, arquivo, motivo):
+        conn.execute(
+            'INSERT OR REPLACE INTO arquivos_ignorados (arquivo, motivo, ignorado_em) VALUES (?, ?, ?)',
+            (arquivo, motivo, datetime.now().timestamp())
+        )
+
+    def purge_ignored_tiers(self):
+        """Tira do banco (e do arquivo Parquet) os snapshots quentes já ingeridos"""
+        rows = self.query(
+            f"""SELECT id, arquivo, camada, date(timestamp) AS dia FROM capturas
+                WHERE camada IN ({', '.join('?' * len(IGNORED_TIERS))})""",
+            IGNORED_TIERS
+        )
+        conn = self.connect()
+        with conn:
+            for row in rows:
+                conn.execute('DELETE FROM capturas WHERE id = ?', (row['id'],))
+                self.ignore(conn, row['arquivo'], f"camada {row['camada']}")
+
+        self.rebuild_rollups()
+        if self.archive:
+            for row in rows:
+                self.archive.remove(row['dia'], row['arquivo'])
+
+    def rebuild_rollups(self):
+        """Recalcula todos os agregados a partir da tabela de capturas"""
+        conn = self.connect()
+        with conn:
+            for table, keys, expressions in ROLLUPS:
+                conn.execute(f"DELETE FROM {table}")
+                key_select = ', '.join(f"{expr} AS {key}" for expr, key in zip(expressions, keys))
+                sums = ', '.join(f"SUM({m})" for m in ROLLUP_MEASURES)
+                conn.execute(
+                    f"INSERT INTO {table} ({', '.join(keys + ('capturas',) + ROLLUP_MEASURES)}) "
+                    f"SELECT {key_select}, COUNT(*), {sums} FROM capturas GROUP BY {', '.join(keys)}"
+                )
+
+    def archive_capture(self, captura_id):
+        """Copia uma captura já ingerida para a partição do dia no Parquet"""
+        conn = self.connect()
+        capturas = pd.read_sql_query(
+            'SELECT * FROM capturas WHERE id = ?', conn, params=(captura_id,), parse_dates=['timestamp']
+        )
+        linhas = pd.read_sql_query(
+            'SELECT * FROM relatorio_linhas WHERE captura_id = ?', conn, params=(captura_id,)
+        )
+        captura = capturas.iloc[0]
+        self.archive.write(
+            captura['timestamp'].strftime('%Y-%m-%d'), captura['arquivo'],
+            {'capturas': capturas, 'relatorio_linhas': linhas}
+        )
+
+    def last_archived_id(self):
+        rows = self.query('SELECT ultimo_id FROM arquivamento WHERE id = 1')
+        return rows[0]['ultimo_id'] if rows else 0
+
+    def archive_pending(self, log=None, backfill=False):
+        """Arquiva as capturas ingeridas depois da última já conferida
+
+        Só olha as capturas com id acima do marcador em `arquivamento`, então
+        o custo não cresce com o histórico. backfill=True confere o banco
+        inteiro (ex.: partições apagadas); um banco sem marcador faz essa
+        conferência completa uma única vez. Para no primeiro erro, para a
+        próxima ingestão tentar de novo a partir dali.
+        """
+        log = log or (lambda message: None)
+        last = self.last_archived_id()
+        checked = last
+        count = 0
+
+        rows = self.query(
+            'SELECT id, arquivo, date(timestamp) AS dia FROM capturas WHERE id > ? ORDER BY id',
+            (0 if backfill else last,)
+        )
+        for row in rows:
+            try:
+                if not self.archive.has(row['dia'], row['arquivo']):
+                    self.archive_capture(row['id'])
+                    count += 1
+            except Exception as e:
+                log(f"⚠️ Erro ao arquivar {row['arquivo']}: {e}")
+                break
+            checked = max(checked, row['id'])
+
+        if checked != last:
+            conn = self.connect()
+            with conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO arquivamento (id, ultimo_id) VALUES (1, ?)', (checked,)
+                )
+        if count:
+            log(f"🗄️ {count} captura(s) arquivada(s) em Parquet")
+        return count
+
+    def ingest_pending(self, data_dir='data/captures', log=None, history_dir=None, backfill=False):
+        """Ingere as capturas ainda fora do banco; retorna quantas entraram
+
+        Lê os captura_*.json de `data_dir` e as entradas do histórico em
+        delta (`history_dir`, padrão data/history ao lado de data/captures),
+        registradas pelo nome do arquivo base_*/delta_*. backfill é repassado
+        ao archive_pending.
+        """
+        from capture_history import CaptureHistory
+
+        log = log or (lambda message: None)
+        done = self.ingested_files()
+        count = 0
+
+        for path in sorted(Path(data_dir).glob('captura_*.json')):
+            if self.stale(done, path.name, path):
+                continue
+            try:
+                # Regravado depois da ingestão (camada quente): sai e entra de novo
+                self.forget(path.name)
+                if self.ingest_file(path) is None:
+                    continue
+                count += 1
+                log(f"📥 {'Reingerido' if path.name in done else 'Ingerido'}: {path.name}")
+            except Exception as e:
+                log(f"⚠️ Erro ao ingerir {path.name}: {e}")
+
+        history = CaptureHistory(history_dir or Path(data_dir).parent / 'history')
+        for entry in history.entries:
+            if self.stale(done, entry['arquivo'], history.history_dir / entry['arquivo']):
+                continue
+            try:
+                # A entrada regravada pode ter trocado de base_* para delta_* (ou o contrário)
+                for name in (f"base_{entry['id']}.json", f"delta_{entry['id']}.json"):
+                    self.forget(name)
+                if self.ingest(history.rebuild(entry['id']), entry['arquivo']) is None:
+                    continue
+                count += 1
+                log(f"📥 {'Reingerido' if entry['arquivo'] in done else 'Ingerido'} do histórico: {entry['arquivo']}")
+            except Exception as e:
+                log(f"⚠️ Erro ao ingerir {entry['arquivo']}: {e}")
+
+        if self.archive:
+            self.archive_pending(log, backfill=backfill)
+        return count
+
+    def close(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
@@ -39,6 +39,7 @@ class ImperioAutomationSystem:
         self.last_capture_time = None
         self.capture_count = 0
         self.api_server = None
+        self.browser_worker = None
         
     def setup_logging(self):
         """Configura sistema de logging"""
@@ -81,7 +82,13 @@ class ImperioAutomationSystem:
                 'enabled': True,
                 'capture_times': ['06:00', '10:00', '14:00', '18:00', '22:00'],
                 'capture_interval_minutes': 0,  # 0 = usar apenas horários fixos
+                'hot_refresh_minutes': 0,  # Rifas ativas com vendas recentes (0 = desligado)
+                'hot_recent_days': 1,
                 'use_headless': True,
+                'capture_details': True,
+                'warm_browser': True,
+                'browser_max_captures': 20,
+                'browser_max_rss_mb': 1500,
                 'capture_on_startup': True,
                 'retry_on_failure': True,
                 'max_retries': 3,
@@ -117,18 +124,44 @@ class ImperioAutomationSystem:
         
         try:
             # Importa e executa captura
-            from capture_corrected import ImperioRapidinhaSCaptureUnlimited
+            from capture_corrected import ImperioCapturaCorrected
             
-            capture = ImperioRapidinhaSCaptureUnlimited(str(self.config_file))
-            result = capture.run(headless=headless, capture_details=False)
+            # Relatórios de rifas encerradas vêm do cache, então os detalhes ficam baratos
+            capture_details = config['automation'].get('capture_details', True)
+            
+            if self.browser_worker:
+                result, capture = self.browser_worker.run_capture(headless, capture_details)
+            else:
+                capture = ImperioCapturaCorrected(str(self.config_file))
+                result = capture.run(headless=headless, capture_details=capture_details)
+            
+            if result and capture.attached:
+                # Outra origem (servidor web/CLI) já estava capturando: mesmo arquivo
+                self.last_capture_time = datetime.now()
+                self.logger.info(f"🔗 Captura em andamento reaproveitada: {result}")
+                self.ingest_captures()
+                return True
             
             if result:
                 self.capture_count += 1
                 self.last_capture_time = datetime.now()
                 self.logger.info(f"✅ Captura #{self.capture_count} concluída: {result}")
                 
-                # Atualiza manifest
-                self.update_manifest()
+                cache_stats = capture.metrics.get('cache_relatorios')
+                if cache_stats:
+                    self.logger.info(
+                        f"Cache de relatórios: {cache_stats['hits']} hits, {cache_stats['misses']} misses"
+                    )
+                
+                if self.browser_worker:
+                    worker_stats = self.browser_worker.stats()
+                    self.logger.info(
+                        f"Navegador quente: {worker_stats['capturas_no_navegador']} capturas, "
+                        f"{worker_stats['rss_mb']} MB, {worker_stats['reciclagens']} reciclagens"
+                    )
+                
+                # Atualiza o banco de analytics (o manifest já saiu do save_data)
+                self.ingest_captures()
                 
                 # Notifica se configurado
                 if config['notifications']['enabled'] and config['notifications']['notify_on_success']:
@@ -140,6 +173,7 @@ class ImperioAutomationSystem:
                 
         except Exception as e:
             self.logger.error(f"❌ Erro na captura: {e}")
+            self.record_capture_failure(e)
             
             # Retry se configurado
             if config['automation']['retry_on_failure']:
@@ -159,41 +193,89 @@ class ImperioAutomationSystem:
             
             return False
     
-    def update_manifest(self):
-        """Atualiza arquivo manifest com lista de capturas"""
-        manifest_file = self.data_dir / 'manifest.json'
+    def run_hot_refresh(self):
+        """Camada quente: atualiza só os relatórios das rifas ativas com vendas recentes"""
+        from capture_lock import CaptureLock
         
-        # Lista todos os arquivos de captura
-        capture_files = sorted(self.data_dir.glob('captura_*.json'), reverse=True)
+        # Varredura completa (ou captura manual) em andamento já traz tudo atualizado
+        if CaptureLock(self.base_dir / 'data' / 'locks' / 'capture.lock').busy():
+            self.logger.info("Camada quente ignorada: captura em andamento")
+            return False
         
-        manifest = {
-            'updated': datetime.now().isoformat(),
-            'total_files': len(capture_files),
-            'files': []
-        }
+        config = self.load_config()
+        headless = config['automation']['use_headless']
         
-        for file in capture_files[:100]:  # Limita a 100 mais recentes no manifest
-            try:
-                # Lê resumo do arquivo
-                with open(file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    
-                manifest['files'].append({
-                    'filename': file.name,
-                    'path': str(file.relative_to(self.base_dir)),
-                    'timestamp': data['captura']['timestamp'],
-                    'timestamp_unix': data['captura'].get('timestamp_unix', 0),
-                    'total_rifas': data['resumo_geral']['total_rifas'],
-                    'arrecadado_total': data['resumo_geral']['arrecadado_total'],
-                    'size_kb': file.stat().st_size / 1024
-                })
-            except Exception as e:
-                self.logger.warning(f"Erro ao ler {file}: {e}")
+        try:
+            if self.browser_worker:
+                result, capture = self.browser_worker.run_capture(headless, True, tier='quente')
+            else:
+                from capture_corrected import ImperioCapturaCorrected
+                capture = ImperioCapturaCorrected(str(self.config_file))
+                result = capture.run(headless=headless, tier='quente')
+        except Exception as e:
+            self.logger.error(f"❌ Erro na camada quente: {e}")
+            return False
+        
+        if capture.skipped:
+            self.logger.info("Camada quente: nenhuma rifa ativa com vendas recentes")
+        elif result:
+            self.last_capture_time = datetime.now()
+            self.logger.info(f"🔥 Camada quente atualizada: {result}")
+            self.ingest_captures()
+        return bool(result)
+    
+    def start_browser_worker(self):
+        """Modo daemon: mantém um navegador quente entre as capturas agendadas"""
+        config = self.load_config()
+        automation = config['automation']
+        
+        if not automation.get('warm_browser', True):
+            return None
         
-        with open(manifest_file, 'w', encoding='utf-8') as f:
-            json.dump(manifest, f, indent=2)
+        from capture_worker import WarmBrowserWorker
         
-        self.logger.info("Manifest atualizado")
+        self.browser_worker = WarmBrowserWorker(
+            str(self.config_file),
+            max_captures=automation.get('browser_max_captures', 20),
+            max_rss_mb=automation.get('browser_max_rss_mb', 1500),
+            user_data_dir=str(self.base_dir / 'data' / 'browser_profile'),
+            log=self.logger.info
+        )
+        self.logger.info("Navegador quente ativado para as capturas agendadas")
+        return self.browser_worker
+    
+    def stop_browser_worker(self):
+        if self.browser_worker:
+            self.browser_worker.close()
+            self.browser_worker = None
+    
+    def capture_manifest(self):
+        from capture_manifest import CaptureManifest
+        return CaptureManifest(self.data_dir, self.base_dir, log=self.logger.info)
+    
+    def ingest_captures(self):
+        """Carrega no banco de analytics (SQLite) as capturas ainda não ingeridas"""
+        try:
+            from app.services.ingestion import IngestionStore
+            
+            store = IngestionStore(self.base_dir / 'data' / 'analytics.db')
+            count = store.ingest_pending(self.data_dir, log=self.logger.info)
+            store.close()
+            if count:
+                self.logger.info(f"Banco de analytics: {count} capturas ingeridas")
+        except Exception as e:
+            self.logger.warning(f"Erro na ingestão das capturas: {e}")
+    
+    def record_capture_failure(self, error):
+        """Conta a execução que falhou no banco de analytics (taxa de sucesso do dashboard)"""
+        try:
+            from app.services.ingestion import IngestionStore
+            
+            store = IngestionStore(self.base_dir / 'data' / 'analytics.db')
+            store.record_failure(error)
+            store.close()
+        except Exception as e:
+            self.logger.warning(f"Erro ao registrar a falha da captura: {e}")
     
     def schedule_captures(self):
         """Agenda capturas automáticas"""
@@ -218,6 +300,12 @@ class ImperioAutomationSystem:
             schedule.every(interval).minutes.do(self.run_capture)
             self.logger.info(f"Captura agendada a cada {interval} minutos")
         
+        # Camada quente entre as varreduras completas
+        hot_interval = config['automation'].get('hot_refresh_minutes', 0)
+        if hot_interval > 0:
+            schedule.every(hot_interval).minutes.do(self.run_hot_refresh)
+            self.logger.info(f"Camada quente (rifas ativas com vendas) a cada {hot_interval} minutos")
+        
         # Agenda limpeza diária
         schedule.every().day.at("03:00").do(self.cleanup_old_data)
         
@@ -270,6 +358,14 @@ class ImperioAutomationSystem:
             def handle_latest_data(self):
                 """Retorna dados mais recentes"""
                 try:
+                    from capture_latest import load_latest_data
+                    
+                    data = load_latest_data(self.automation_system.data_dir)
+                    if data:
+                        self.send_json_response(data)
+                        return
+                    
+                    # Dados anteriores ao ponteiro latest.json
                     capture_files = sorted(
                         self.automation_system.data_dir.glob('captura_*.json'), 
                         reverse=True
@@ -288,14 +384,7 @@ class ImperioAutomationSystem:
             
             def handle_manifest(self):
                 """Retorna manifest"""
-                manifest_file = self.automation_system.data_dir / 'manifest.json'
-                
-                if manifest_file.exists():
-                    with open(manifest_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    self.send_json_response(data)
-                else:
-                    self.send_json_response({'files': []})
+                self.send_json_response(self.automation_system.capture_manifest().read())
             
             def handle_status(self):
                 """Retorna status do sistema"""
@@ -325,7 +414,20 @@ class ImperioAutomationSystem:
                     self.send_error(404)
             
             def handle_start_capture(self):
-                """Inicia captura manual"""
+                """Inicia captura manual (ou se acopla à que já está rodando)"""
+                from capture_lock import CaptureLock
+                
+                lock = CaptureLock(self.automation_system.base_dir / 'data' / 'locks' / 'capture.lock')
+                if lock.busy():
+                    state = lock.read_state()
+                    self.send_json_response({
+                        'status': 'Captura já em andamento',
+                        'message': 'Uma captura já está rodando; o resultado dela será usado',
+                        'started': state.get('started'),
+                        'pid': state.get('pid')
+                    })
+                    return
+                
                 # Executa em thread separada
                 thread = threading.Thread(
                     target=self.automation_system.run_capture,
@@ -458,6 +560,7 @@ class ImperioAutomationSystem:
         
         cutoff_date = datetime.now() - timedelta(days=keep_days)
         removed_count = 0
+        removed_files = []
         
         for file in self.data_dir.glob('captura_*.json'):
             try:
@@ -472,13 +575,16 @@ class ImperioAutomationSystem:
                         file.unlink()
                     
                     removed_count += 1
+                    removed_files.append(file.name)
                     
             except Exception as e:
                 self.logger.error(f"Erro ao processar {file}: {e}")
         
         if removed_count > 0:
             self.logger.info(f"Removidos {removed_count} arquivos antigos")
-            self.update_manifest()
+            from capture_latest import discount_latest
+            discount_latest(self.data_dir, removed_count)
+            self.capture_manifest().remove(removed_files)
     
     def compress_file(self, file_path):
         """Comprime arquivo antes de arquivar"""
@@ -549,14 +655,11 @@ class ImperioAutomationSystem:
             stats['data_size_mb'] += file.stat().st_size / 1024 / 1024
         
         # Lê estatísticas do manifest
-        manifest_file = self.data_dir / 'manifest.json'
-        if manifest_file.exists():
-            with open(manifest_file, 'r') as f:
-                manifest = json.load(f)
-                if manifest['files']:
-                    latest = manifest['files'][0]
-                    stats['total_rifas'] = latest['total_rifas']
-                    stats['total_revenue'] = latest['arrecadado_total']
+        manifest = self.capture_manifest().read()
+        if manifest['files']:
+            latest = manifest['files'][0]
+            stats['total_rifas'] = latest['total_rifas']
+            stats['total_revenue'] = latest['arrecadado_total']
         
         return stats
     
@@ -659,12 +762,17 @@ def main():
             automation.start_api_server()
             automation.start_dashboard_server()
             
+            automation.start_browser_worker()
+            
             config = automation.load_config()
             if config['automation']['capture_on_startup']:
                 automation.run_capture()
             
             automation.schedule_captures()
-            automation.run_scheduler()  # Bloqueia aqui
+            try:
+                automation.run_scheduler()  # Bloqueia aqui
+            finally:
+                automation.stop_browser_worker()
             
         elif sys.argv[1] == '--help':
             print("Uso:")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark ponta a ponta da captura - Império Rapidinhas
+Sobe o servidor simulado (mock_imperio_server.py) em outro processo e roda
+ImperioCapturaCorrected contra ele em um diretório temporário: login,
+lista paginada, relatórios e gravação dos arquivos.
+
+Uso:
+    python benchmarks/bench_capture_e2e.py --rifas 2000 --rows 90 --latency-ms 30 --concurrency 8
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_server(base_url, timeout=15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"{base_url}/__stats", timeout=1).read()
+            return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+def server_stats(base_url):
+    with urllib.request.urlopen(f"{base_url}/__stats", timeout=5) as response:
+        return json.loads(response.read())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark ponta a ponta contra o servidor simulado')
+    parser.add_argument('--rifas', type=int, default=2000)
+    parser.add_argument('--per-page', type=int, default=50)
+    parser.add_argument('--rows', type=int, default=60)
+    parser.add_argument('--latency-ms', type=float, default=20)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests-per-second', type=float, default=200)
+    parser.add_argument('--adaptive', action='store_true', help='Liga o controle adaptativo (AIMD) a partir de --concurrency/--requests-per-second')
+    parser.add_argument('--engine', default='http', choices=['http', 'selenium'])
+    parser.add_argument('--no-details', action='store_true', help='Só a lista de rifas')
+    args = parser.parse_args()
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen([
+        sys.executable, str(ROOT_DIR / 'mock_imperio_server.py'),
+        '--port', str(port), '--rifas', str(args.rifas), '--per-page', str(args.per_page),
+        '--rows', str(args.rows), '--latency-ms', str(args.latency_ms), '--error-rate', str(args.error_rate)
+    ], stdout=subprocess.DEVNULL)
+
+    try:
+        if not wait_for_server(base_url):
+            print("❌ Servidor simulado não respondeu")
+            sys.exit(1)
+
+        workdir = tempfile.mkdtemp(prefix='imperio_bench_')
+        os.chdir(workdir)
+        Path('config').mkdir()
+        with open('config/config.json', 'w', encoding='utf-8') as f:
+            json.dump({
+                'imperio': {'username': 'bench', 'password': 'bench', 'base_url': base_url},
+                'capture': {
+                    'timeout': 30,
+                    'wait_between_actions': 0,
+                    'engine': args.engine,
+                    'http_login': True,
+                    'concurrency': args.concurrency,
+                    'requests_per_second': args.requests_per_second,
+                    'adaptive': args.adaptive,
+                    'max_concurrency': max(16, args.concurrency),
+                    'max_requests_per_second': max(20, args.requests_per_second),
+                    'cache_enabled': False,
+                    'max_pages': args.rifas // args.per_page + 2
+                }
+            }, f, indent=2)
+
+        from capture_corrected import ImperioCapturaCorrected
+
+        capture = ImperioCapturaCorrected('config/config.json')
+        start = time.perf_counter()
+        filepath = capture.run(headless=True, capture_details=not args.no_details)
+        elapsed = time.perf_counter() - start
+
+        stats = server_stats(base_url)
+        reports = stats['relatorios']
+
+        print("\n" + "=" * 60)
+        print("📏 BENCHMARK PONTA A PONTA")
+        print("=" * 60)
+        print(f"   Resultado: {'✅ ' + str(filepath) if filepath else '❌ captura falhou'}")
+        print(f"   Rifas capturadas: {len(capture.rifas_data)} de {args.rifas}")
+        print(f"   Tempo total: {elapsed:.1f}s")
+        print(f"   Rifas/s: {len(capture.rifas_data) / elapsed:.1f} | relatórios/s: {reports / elapsed:.1f}")
+        print(f"   Requisições: {stats['requests']} (erros injetados: {stats['erros_injetados']}, logins: {stats['logins']})")
+        if capture.controller:
+            adaptive = capture.controller.summary()
+            print(f"   Ritmo final: {adaptive['concorrencia_final']} em paralelo, {adaptive['taxa_final_rps']} req/s "
+                  f"({adaptive['aumentos']} aumentos, {adaptive['reducoes']} reduções)")
+        print(f"   Arquivos em: {workdir}")
+
+        if not filepath:
+            sys.exit(1)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Benchmark offline do parsing da captura - Império Rapidinhas
+Reproduz as fixtures de HTML gravadas pelo diagnóstico (python
+diagnostic_tool.py --fixtures) pelo mesmo caminho do motor HTTP da captura:
+BeautifulSoup + parse_rifas_html (lista) e, nos relatórios, report_sales_table
++ table_hash + fill_report (o título pelo breadcrumb, como na primeira
+captura de uma rifa).
+Mede linhas/s e memória alocada por página; com --compare falha quando o
+resultado piora além da tolerância em relação a uma execução salva.
+
+Uso:
+    python benchmarks/bench_capture_parse.py [--fixtures data/fixtures]
+    python benchmarks/bench_capture_parse.py --synthetic --save baseline.json
+    python benchmarks/bench_capture_parse.py --synthetic --compare baseline.json
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bs4 import BeautifulSoup
+
+from capture_cache import table_hash
+from capture_http import parse_rifas_html, report_sales_table, fill_title
+from capture_fixtures import load_fixtures, synthetic_list_page, synthetic_report_page
+from capture_parsing import fill_report, new_report
+
+
+def parse_list(entry, html):
+    rifas = parse_rifas_html(BeautifulSoup(html, 'html.parser'), 1, 'bench')
+    return len(rifas)
+
+
+def parse_report(entry, html):
+    """Mesmos passos do ImperioHttpCapture.capture_detailed_report sem cache"""
+    rifa_info = {'data_token': entry.get('token', ''), 'titulo': ''}
+    table, soup = report_sales_table(html)
+    if table is None:
+        return 0
+    table_hash(table)
+
+    fill_title(soup or BeautifulSoup(html, 'html.parser'), rifa_info)
+    report = new_report(rifa_info['data_token'], entry.get('url', ''), rifa_info)
+    fill_report(report, table)
+    return len(report['dados_tabela'])
+
+
+PARSERS = {
+    'lista': parse_list,
+    'relatorio': parse_report
+}
+
+
+def synthetic_fixtures(list_pages=5, reports=40, days=90):
+    """Fixtures geradas no layout do painel, para rodar sem gravações"""
+    fixtures = []
+    for page in range(list_pages):
+        fixtures.append(({'tipo': 'lista', 'url': f'/admin/rifas?page={page + 1}'}, synthetic_list_page(page * 50 + 1, 50)))
+    for i in range(reports):
+        entry = {'tipo': 'relatorio', 'token': f'tok{i:06d}', 'url': f'/admin/rifas/relatorios/tok{i:06d}'}
+        fixtures.append((entry, synthetic_report_page(f'{i}º RAPIDINHA', days, seed=i)))
+    return fixtures
+
+
+def measure(kind, fixtures, repeat):
+    """Melhor tempo de CPU de `repeat` passadas + pico de memória médio por página"""
+    parser = PARSERS[kind]
+
+    best = None
+    rows = 0
+    for _ in range(repeat):
+        start = time.process_time()
+        rows = sum(parser(entry, html) for entry, html in fixtures)
+        elapsed = time.process_time() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    # Passada separada: tracemalloc distorce o tempo
+    peaks = []
+    tracemalloc.start()
+    for entry, html in fixtures:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        parser(entry, html)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    return {
+        'paginas': len(fixtures),
+        'linhas': rows,
+        'tempo_s': round(best, 4),
+        'linhas_por_s': round(rows / best) if best else 0,
+        'paginas_por_s': round(len(fixtures) / best, 1) if best else 0,
+        'alocado_kb_por_pagina': round(sum(peaks) / len(peaks) / 1024, 1) if peaks else 0
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Lista de regressões (mais lento ou mais memória além da tolerância)"""
+    regressions = []
+    for kind, current in results.items():
+        previous = baseline.get(kind)
+        if not previous:
+            continue
+        if current['linhas_por_s'] < previous['linhas_por_s'] * (1 - tolerance):
+            regressions.append(f"{kind}: {current['linhas_por_s']:,} linhas/s (antes {previous['linhas_por_s']:,})")
+        if current['alocado_kb_por_pagina'] > previous['alocado_kb_por_pagina'] * (1 + tolerance):
+            regressions.append(
+                f"{kind}: {current['alocado_kb_por_pagina']} KB/página (antes {previous['alocado_kb_por_pagina']})"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark offline do parsing da captura')
+    parser.add_argument('--fixtures', default='data/fixtures', help='Diretório das fixtures gravadas')
+    parser.add_argument('--synthetic', action='store_true', help='Usa páginas sintéticas em vez das gravadas')
+    parser.add_argument('--repeat', type=int, default=5, help='Passadas de medição (vale a melhor)')
+    parser.add_argument('--save', help='Salva o resultado em JSON')
+    parser.add_argument('--compare', help='Compara com um resultado salvo e falha se regredir')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Tolerância da comparação (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    fixtures = synthetic_fixtures() if args.synthetic else [
+        fixture for kind in PARSERS for fixture in load_fixtures(args.fixtures, kind)
+    ]
+    if not fixtures:
+        print(f"❌ Nenhuma fixture em {args.fixtures}")
+        print("💡 Grave com: python diagnostic_tool.py --fixtures (ou use --synthetic)")
+        sys.exit(1)
+
+    results = {}
+    for kind in PARSERS:
+        selected = [(entry, html) for entry, html in fixtures if entry['tipo'] == kind]
+        if selected:
+            results[kind] = measure(kind, selected, args.repeat)
+
+    print(f"📏 Parsing offline ({'sintético' if args.synthetic else args.fixtures}), melhor de {args.repeat}")
+    for kind, result in results.items():
+        print(
+            f"   {kind:<10} {result['paginas']:4d} páginas {result['linhas']:7,} linhas | "
+            f"{result['linhas_por_s']:10,} linhas/s {result['paginas_por_s']:8.1f} páginas/s | "
+            f"{result['alocado_kb_por_pagina']:8.1f} KB/página"
+        )
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Resultado salvo em: {args.save}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\n❌ Regressões:")
+            for regression in regressions:
+                print(f"   {regression}")
+            sys.exit(1)
+        print("\n✅ Sem regressões")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark do parsing da tabela de vendas - Império Rapidinhas
+Compara o caminho célula a célula (parse_report_rows + summarize_report) com
+o parsing colunar (capture_columns) em uma tabela sintética, e confere que
+parse_report_table dá as mesmas linhas dos dois lados do limite de linhas
+do colunar, inclusive com células fora da forma canônica.
+
+Uso: python benchmarks/bench_report_columns.py [linhas] [repetições]
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import capture_parsing
+from capture_parsing import parse_report_rows, parse_report_table, summarize_report
+import capture_columns
+
+HEADERS = ['data', 'tícket médio', 'vendas', 'qtd. títulos', 'total']
+
+
+def money(cents):
+    reais = f"{cents // 100:,}".replace(',', '.')
+    return f"R$ {reais},{cents % 100:02d}"
+
+
+def synthetic_rows(count, seed=42):
+    """Linhas no formato do painel, com algumas células inválidas"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        titulos = rng.randint(0, 5000)
+        rows.append([
+            f"{i % 28 + 1:02d}/{i % 12 + 1:02d}/2025",
+            money(rng.randint(50, 5000)),
+            str(rng.randint(0, 800)),
+            f"{titulos} {rng.randint(0, 100)}%",
+            money(rng.randint(0, 10 ** 8))
+        ])
+        if i % 997 == 0:
+            rows[-1][2] = '-'
+    return rows
+
+
+# Células que o colunar não reproduz: a tabela inteira tem de ir célula a célula
+EDGE_CELLS = [
+    ('total', '12,345'), ('total', 'R$ 0,001'), ('total', 'R$ 1,2,3'), ('total', '٣'),
+    ('total', 'R$ 99.999.999.999.999,99'), ('total', '-'), ('total', ''), ('total', None),
+    ('ticket', 'R$ ,5'), ('ticket', 'R$ 7,'), ('vendas', '1_000'), ('vendas', '٣'),
+    ('vendas', ' +7 '), ('titulos', '٣ 10%'), ('titulos', '\u00a012 5%'), ('data', '\u00a001/01/2025')
+]
+
+
+def check_parity(rows):
+    """parse_report_table igual abaixo e acima de COLUNAR_MIN_ROWS, célula a célula"""
+    index = {'data': 0, 'ticket': 1, 'vendas': 2, 'titulos': 3, 'total': 4}
+    cases = [rows]
+    for column, value in EDGE_CELLS:
+        case = [list(row) for row in rows]
+        case[len(case) // 2][index[column]] = value
+        cases.append(case)
+
+    threshold = capture_parsing.COLUMNAR_MIN_ROWS
+    try:
+        for case in cases:
+            capture_parsing.COLUMNAR_MIN_ROWS = 0
+            columnar_rows, _ = parse_report_table(HEADERS, case)
+            capture_parsing.COLUMNAR_MIN_ROWS = len(case) + 1
+            cell_rows, _ = parse_report_table(HEADERS, case)
+            if columnar_rows != cell_rows:
+                return False
+    finally:
+        capture_parsing.COLUMNAR_MIN_ROWS = threshold
+    return True
+
+
+def per_cell(rows):
+    dados = parse_report_rows(HEADERS, rows)
+    return dados, summarize_report(dados)
+
+
+def columnar(rows):
+    columns = capture_columns.parse_report_columns(HEADERS, rows)
+    return capture_columns.rows_from_columns(columns), capture_columns.summarize_columns(columns)
+
+
+def columnar_summary_only(rows):
+    columns = capture_columns.parse_report_columns(HEADERS, rows)
+    return None, capture_columns.summarize_columns(columns)
+
+
+def best_of(func, rows, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(rows)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    if not capture_columns.available():
+        print("❌ pyarrow não instalado: parsing colunar indisponível")
+        sys.exit(1)
+
+    rows = synthetic_rows(count)
+    columnar(rows[:10])  # aquece os kernels do Arrow
+
+    print(f"📏 {count:,} linhas, melhor de {repeat}")
+
+    base_time, (base_rows, base_summary) = best_of(per_cell, rows, repeat)
+    col_time, (col_rows, col_summary) = best_of(columnar, rows, repeat)
+    sum_time, _ = best_of(columnar_summary_only, rows, repeat)
+
+    if base_rows != col_rows:
+        print("❌ Linhas divergentes entre os dois caminhos")
+        sys.exit(1)
+
+    if not check_parity(rows[:2000]):
+        print("❌ parse_report_table muda o resultado conforme o tamanho da tabela")
+        sys.exit(1)
+    print(f"✅ Paridade conferida com {len(EDGE_CELLS)} células fora da forma canônica")
+
+    for label, elapsed in [
+        ('célula a célula', base_time),
+        ('colunar (dicts)', col_time),
+        ('colunar (só resumo)', sum_time)
+    ]:
+        print(f"   {label:<22} {elapsed * 1000:8.1f} ms  {count / elapsed:12,.0f} linhas/s  {base_time / elapsed:5.2f}x")
+
+    print(f"\n💰 Arrecadado: float {base_summary['arrecadado_total']!r} | centavos {col_summary['arrecadado_total']!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Cache de Relatórios - Império Rapidinhas
+Guarda em disco o relatório parseado de cada rifa (chave: data-token) para
+não buscar de novo rifas já encerradas, cujos números não mudam mais. Das
+rifas ativas guarda o hash da tabela e os validadores HTTP (ETag,
+Last-Modified), para não parsear de novo uma tabela que não mudou.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from capture_parsing import STATUS_FINALIZADOS, new_report
+
+
+def content_hash(text):
+    """Hash barato do conteúdo cru de uma tabela"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def table_hash(table):
+    """Hash do texto das células da tabela de vendas ({headers, rows, footer})
+
+    Os dois motores extraem essa mesma estrutura (Selenium pelo innerText,
+    HTTP pelo BeautifulSoup); com os espaços normalizados, o hash gravado
+    por um vale para o outro quando a rifa troca de motor.
+    """
+    def normalize(text):
+        return ' '.join(str(text).split())
+
+    cells = [
+        [normalize(h).lower() for h in table.get('headers', [])],
+        [[normalize(cell) for cell in row] for row in table.get('rows', [])],
+        normalize(table.get('footer', ''))
+    ]
+    return content_hash(json.dumps(cells, ensure_ascii=False))
+
+
+def reuse_report(previous, rifa_info, url):
+    """Relatório novo com as linhas/resumo já parseados da captura anterior"""
+    report = new_report(rifa_info.get('data_token'), url, rifa_info)
+    report['titulo'] = report['titulo'] or previous.get('titulo', '')
+    report['dados_tabela'] = previous.get('dados_tabela', [])
+    report['resumo'] = dict(previous.get('resumo', report['resumo']))
+    if previous.get('hash_tabela'):
+        report['hash_tabela'] = previous['hash_tabela']
+    return report
+
+
+class ChangeStats:
+    """Contadores de parsing: tabelas parseadas, reaproveitadas por hash e 304"""
+
+    KINDS = ('parseados', 'hash_igual', 'nao_modificado')
+
+    def __init__(self):
+        self.counts = dict.fromkeys(self.KINDS, 0)
+        self.lock = threading.Lock()
+
+    def count(self, kind):
+        with self.lock:
+            self.counts[kind] += 1
+
+    def summary(self):
+        with self.lock:
+            counts = dict(self.counts)
+        total = sum(counts.values())
+        skipped = counts['hash_igual'] + counts['nao_modificado']
+        return dict(counts, parse_evitado=skipped, taxa_evitado=round(skipped / total, 3) if total else 0.0)
+
+
+class ReportCache:
+    """Cache persistente de relatórios detalhados por data-token
+
+    Rifas encerradas (Finalizado/Concluído) são servidas do cache enquanto a
+    entrada estiver dentro do TTL; rifas ativas são sempre buscadas de novo.
+    Cada token tem seu arquivo em `cache_dir`, lido na primeira consulta e
+    regravado só quando a entrada muda: o custo de save acompanha o que mudou
+    na captura, não o tamanho do cache.
+    """
+
+    def __init__(self, cache_dir='data/cache/reports', ttl_hours=720, legacy_file='data/cache/reports.json'):
+        self.cache_dir = Path(cache_dir)
+        self.legacy_file = Path(legacy_file) if legacy_file else None
+        self.ttl_seconds = ttl_hours * 3600 if ttl_hours else None
+        self.entries = {}
+        self.dirty = set()
+        self.files = set()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.load()
+
+    def shard_file(self, token):
+        """Arquivo da entrada de um token (hash: o token vai no nome com segurança)"""
+        return self.cache_dir / f"{content_hash(str(token))}.json"
+
+    def load(self):
+        """Lista as entradas em disco; o conteúdo é lido sob demanda
+
+        O cache antigo (um único reports.json) é dividido por token no
+        próximo save.
+        """
+        if self.cache_dir.is_dir():
+            self.files = {p.name for p in self.cache_dir.glob('*.json')}
+
+        if not self.legacy_file or not self.legacy_file.exists():
+            return
+        try:
+            with open(self.legacy_file, 'r', encoding='utf-8') as f:
+                legacy = json.load(f).get('reports', {})
+        except Exception:
+            legacy = {}
+        for token, entry in legacy.items():
+            self.entries.setdefault(token, entry)
+            self.dirty.add(token)
+
+    def entry(self, token):
+        """Entrada do token (lida do disco na primeira vez; None se não houver)"""
+        with self.lock:
+            if token in self.entries:
+                return self.entries[token]
+
+        path = self.shard_file(token)
+        entry = None
+        if path.name in self.files:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except Exception:
+                entry = None
+
+        with self.lock:
+            return self.entries.setdefault(token, entry)
+
+    def save(self):
+        """Grava as entradas alteradas, cada uma de forma atômica (tmp + rename)"""
+        with self.lock:
+            changed = {token: self.entries[token] for token in self.dirty}
+            self.dirty = set()
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            for token, entry in changed.items():
+                path = self.shard_file(token)
+                tmp_file = path.with_suffix('.tmp')
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(entry, f, ensure_ascii=False)
+                os.replace(tmp_file, path)
+                with self.lock:
+                    self.files.add(path.name)
+                changed[token] = None
+        except Exception:
+            # O que não foi gravado volta para o próximo save
+            with self.lock:
+                self.dirty.update(t for t, e in changed.items() if e is not None)
+            raise
+
+        if self.legacy_file and self.legacy_file.exists():
+            self.legacy_file.unlink()
+
+    def is_expired(self, entry):
+        if self.ttl_seconds is None:
+            return False
+        return time.time() - entry.get('cached_at', 0) > self.ttl_seconds
+
+    def get(self, rifa_info):
+        """Retorna o relatório em cache se a rifa estiver encerrada, senão None"""
+        entry = self.entry(rifa_info.get('data_token'))
+
+        usable = (
+            entry is not None
+            and rifa_info.get('status') in STATUS_FINALIZADOS
+            and entry.get('status') in STATUS_FINALIZADOS
+            and not self.is_expired(entry)
+        )
+
+        with self.lock:
+            if usable:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        return entry['report'] if usable else None
+
+    def previous(self, rifa_info):
+        """Entrada da captura anterior, de qualquer status (sem contar hit/miss)
+
+        Usada para comparar o hash da tabela e montar a requisição condicional.
+        """
+        return self.entry(rifa_info.get('data_token'))
+
+    def put(self, rifa_info, report, validators=None):
+        """Guarda o relatório recém-capturado junto com o status da rifa
+
+        `validators` são os cabeçalhos ETag/Last-Modified da resposta HTTP.
+        Entrada igual à anterior (rifa ativa sem vendas novas) não é regravada.
+        """
+        token = rifa_info['data_token']
+        entry = {
+            'status': rifa_info.get('status', 'Desconhecido'),
+            'cached_at': time.time(),
+            'report': report
+        }
+        if validators:
+            entry['validators'] = validators
+
+        previous = self.entry(token)
+        if previous is not None and dict(previous, cached_at=None) == dict(entry, cached_at=None):
+            return
+
+        with self.lock:
+            self.entries[token] = entry
+            self.dirty.add(token)
+
+    def stats(self):
+        """Contadores de acerto/erro da captura atual"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0,
+            'entries': len(self.files | {self.shard_file(t).name for t, e in self.entries.items() if e})
+        }
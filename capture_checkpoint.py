@@ -0,0 +1,176 @@
+"""
+Checkpoint em NDJSON da captura - Império Rapidinhas
+Cada rifa da lista e cada relatório concluído viram uma linha JSON gravada
+assim que ficam prontos. Se o navegador cair no meio, a captura pode ser
+retomada (--resume) buscando só os tokens que faltam, e o arquivo final é
+montado a partir do checkpoint sem carregar todos os relatórios na memória.
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+# Campos da rifa atualizados pelo relatório (reaplicados na retomada)
+RIFA_TOTALS = ['titulo', 'vendas_total', 'titulos_total', 'arrecadado_total', 'ticket_medio', 'recusadas']
+
+
+def _indented(value, level):
+    """json.dumps com indent=2 já deslocado para o nível de aninhamento"""
+    return json.dumps(value, ensure_ascii=False, indent=2).replace('\n', '\n' + '  ' * level)
+
+
+class CaptureCheckpoint:
+    """Arquivo NDJSON de uma captura em andamento"""
+
+    def __init__(self, checkpoint_file='data/checkpoints/captura_em_andamento.ndjson', account=''):
+        self.checkpoint_file = Path(checkpoint_file)
+        self.account = account
+        self.handle = None
+        self.lock = threading.Lock()
+
+    def exists(self):
+        return self.checkpoint_file.exists()
+
+    def open(self, mode):
+        if self.handle:
+            self.handle.close()
+        self.checkpoint_file.parent.mkdir(parents=True, exist_ok=True)
+        self.handle = open(self.checkpoint_file, mode, encoding='utf-8')
+
+    def append(self, record):
+        """Grava um registro e descarrega o buffer (sobrevive à queda do processo)"""
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self.lock:
+            if self.handle is None:
+                self.open('a')
+            self.handle.write(line)
+            self.handle.flush()
+
+    def start(self, rifas):
+        """Inicia um checkpoint novo com a lista de rifas capturada"""
+        self.open('w')
+        self.append({'tipo': 'inicio', 'conta': self.account, 'timestamp': time.time()})
+        for rifa in rifas:
+            self.append({'tipo': 'rifa', 'rifa': rifa})
+
+    def append_report(self, rifa, report):
+        """Registra um relatório concluído e os totais que ele deu à rifa"""
+        self.append({
+            'tipo': 'relatorio',
+            'token': rifa['data_token'],
+            'rifa': {key: rifa[key] for key in RIFA_TOTALS if key in rifa},
+            'relatorio': report
+        })
+
+    def records(self):
+        """Percorre o checkpoint devolvendo (offset, registro)
+
+        Uma última linha incompleta (crash no meio da escrita) é ignorada.
+        """
+        with open(self.checkpoint_file, 'rb') as f:
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line:
+                    return
+                try:
+                    yield offset, json.loads(line)
+                except ValueError:
+                    continue
+
+    def load(self):
+        """Lê o checkpoint para retomar: (rifas com totais, tokens já concluídos)
+
+        Os relatórios em si ficam no disco; só a lista de rifas vai para a memória.
+        """
+        if not self.exists():
+            return [], set()
+
+        rifas = []
+        by_token = {}
+        done = set()
+
+        for _, record in self.records():
+            kind = record.get('tipo')
+            if kind == 'inicio' and record.get('conta') != self.account:
+                return [], set()
+            if kind == 'rifa':
+                rifa = record['rifa']
+                rifas.append(rifa)
+                if rifa.get('data_token'):
+                    by_token[rifa['data_token']] = rifa
+            elif kind == 'relatorio':
+                done.add(record['token'])
+                if record['token'] in by_token:
+                    by_token[record['token']].update(record.get('rifa') or {})
+
+        return rifas, done
+
+    def report_offsets(self):
+        """Posição no arquivo do último relatório de cada token"""
+        offsets = {}
+        if not self.exists():
+            return offsets
+
+        for offset, record in self.records():
+            if record.get('tipo') == 'relatorio':
+                offsets[record['token']] = offset
+        return offsets
+
+    def iter_reports(self, tokens):
+        """Relatórios do checkpoint na ordem de `tokens`, lidos um por vez"""
+        with self.lock:
+            if self.handle:
+                self.handle.flush()
+
+        offsets = self.report_offsets()
+        if not offsets:
+            return
+
+        with open(self.checkpoint_file, 'rb') as src:
+            for token in dict.fromkeys(tokens):
+                if token not in offsets:
+                    continue
+                src.seek(offsets[token])
+                yield token, json.loads(src.readline())['relatorio']
+
+    def write_capture(self, filepath, head, tokens):
+        """Monta o captura_*.json a partir do checkpoint, um relatório por vez
+
+        `head` são as chaves pequenas (captura, resumo_geral, rifas); os
+        relatórios são copiados do NDJSON na ordem de `tokens`. O resultado
+        é idêntico a um json.dump(..., indent=2) do dicionário completo.
+        """
+        filepath = Path(filepath)
+        tmp_file = filepath.with_suffix('.tmp')
+        written = 0
+
+        with open(tmp_file, 'w', encoding='utf-8') as out:
+            out.write('{\n')
+            for key, value in head.items():
+                out.write(f'  {json.dumps(key)}: {_indented(value, 1)},\n')
+
+            out.write('  "relatorios_detalhados": {')
+            for token, report in self.iter_reports(tokens):
+                out.write(',\n' if written else '\n')
+                out.write(f'    {json.dumps(token, ensure_ascii=False)}: {_indented(report, 2)}')
+                written += 1
+            out.write('\n  }\n}' if written else '}\n}')
+
+        os.replace(tmp_file, filepath)
+        return written
+
+    def close(self):
+        with self.lock:
+            if self.handle:
+                self.handle.close()
+                self.handle = None
+
+    def clear(self):
+        """Remove o checkpoint depois que a captura foi salva"""
+        self.close()
+        try:
+            self.checkpoint_file.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,167 @@
+"""
+Parsing colunar das tabelas de vendas - Império Rapidinhas
+Converte o texto cru de uma tabela inteira em colunas tipadas de uma vez,
+com os kernels vetorizados do Arrow (o mesmo motor de strings do pandas),
+guardando valores monetários em centavos inteiros. As linhas em dict de
+dados_tabela e o resumo do relatório saem dessas colunas.
+
+O resultado precisa ser idêntico ao do caminho célula a célula
+(parse_money/parse_quantity/parse_int), e os dois só coincidem para células
+em forma canônica: ASCII imprimível, dinheiro como '-?reais(,cc)' (pontos de
+milhar à parte, até 13 dígitos de reais) e inteiros sem '_'. Se alguma
+célula fugir disso, parse_report_columns levanta NonCanonicalTable e a
+tabela inteira segue célula a célula.
+"""
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = pc = None
+
+from capture_parsing import map_report_columns
+
+# Campo de saída e tipo de cada coluna mapeada por map_report_columns
+REPORT_COLUMNS = [
+    ('data', 'data', 'text'),
+    ('ticket', 'ticket_medio', 'money'),
+    ('vendas', 'vendas', 'int'),
+    ('titulos', 'qtd_titulos', 'quantity'),
+    ('total', 'total', 'money')
+]
+
+# Texto em que \d, \s e strip() do Python e do RE2 (Arrow) coincidem
+ASCII_TEXT = r'^[\t\n\r -~]*$'
+
+# int() do Python aceita '1_000'; o kernel colunar não
+ASCII_NO_UNDERSCORE = r'^[\t\n\r -^`-~]*$'
+
+# Dinheiro já sem símbolos e pontos: float(...) e centavos/100 dão o mesmo valor
+CANONICAL_MONEY = r'^-?[0-9]{0,13}(,[0-9]{0,2})?$'
+
+
+class NonCanonicalTable(ValueError):
+    """Há célula cujo parsing colunar divergiria do célula a célula"""
+
+
+def available():
+    """O parsing colunar depende do pyarrow (opcional)"""
+    return pc is not None
+
+
+def _strings(values):
+    return pc.fill_null(pa.array(values, pa.string()), '')
+
+
+def _digits_to_int(digits):
+    """Cadeias só de dígitos (ou vazias/nulas) em int64; vazio vale 0"""
+    return pc.cast(pc.binary_join_element_wise('0', pc.fill_null(digits, ''), ''), pa.int64())
+
+
+def _signed(sign, values):
+    return pc.if_else(pc.equal(pc.fill_null(sign, ''), '-'), pc.negate(values), values)
+
+
+def _require(strings, pattern):
+    if not pc.all(pc.match_substring_regex(strings, pattern)).as_py():
+        raise NonCanonicalTable(pattern)
+
+
+def money_cents(values):
+    """Coluna monetária ('R$ 1.234,56') em centavos int64"""
+    strings = _strings(values)
+    _require(strings, ASCII_TEXT)
+    clean = pc.replace_substring_regex(strings, r'[^\d,-]', '')
+    _require(clean, CANONICAL_MONEY)
+    parts = pc.extract_regex(clean, r'^(?P<sign>-?)(?P<reais>\d*)(?:,(?P<frac>\d{0,2}))?')
+
+    reais = _digits_to_int(pc.struct_field(parts, 'reais'))
+    fraction = pc.binary_join_element_wise(pc.fill_null(pc.struct_field(parts, 'frac'), ''), '00', '')
+    cents = pc.cast(pc.utf8_slice_codeunits(fraction, 0, 2), pa.int64())
+
+    return _signed(pc.struct_field(parts, 'sign'), pc.add(pc.multiply(reais, 100), cents))
+
+
+def quantities(values):
+    """Coluna de quantidade ('93 93%') em int64"""
+    strings = _strings(values)
+    _require(strings, ASCII_TEXT)
+    parts = pc.extract_regex(strings, r'^\s*(?P<n>\d+)')
+    return _digits_to_int(pc.struct_field(parts, 'n'))
+
+
+def integers(values):
+    """Coluna inteira estrita (célula inválida = 0) em int64"""
+    strings = _strings(values)
+    _require(strings, ASCII_NO_UNDERSCORE)
+    parts = pc.extract_regex(strings, r'^\s*(?P<sign>[+-]?)(?P<n>\d+)\s*$')
+    return _signed(pc.struct_field(parts, 'sign'), _digits_to_int(pc.struct_field(parts, 'n')))
+
+
+PARSERS = {
+    'money': money_cents,
+    'quantity': quantities,
+    'int': integers
+}
+
+
+def parse_report_columns(headers, rows):
+    """Tabela de vendas (texto) em colunas tipadas
+
+    Retorna {campo: pyarrow.Array}; colunas monetárias ficam em centavos.
+    Só entram as linhas completas e com data, como em parse_report_rows.
+    Levanta NonCanonicalTable se alguma célula não estiver em forma canônica.
+    """
+    col_map = map_report_columns(headers)
+    if col_map['data'] < 0:
+        return {}
+
+    rows = [cells for cells in rows if len(cells) >= len(headers)]
+    dates = _strings([cells[col_map['data']] for cells in rows])
+    _require(dates, ASCII_TEXT)
+    dates = pc.utf8_trim_whitespace(dates)
+    keep = pc.not_equal(dates, '')
+
+    columns = {'data': pc.filter(dates, keep)}
+    for key, field, kind in REPORT_COLUMNS[1:]:
+        if col_map[key] >= 0:
+            column = PARSERS[kind]([cells[col_map[key]] for cells in rows])
+            columns[field] = pc.filter(column, keep)
+
+    return columns
+
+
+def rows_from_columns(columns):
+    """Linhas de dados_tabela (dicts) a partir das colunas; centavos viram reais"""
+    fields = []
+    values = []
+    for _, field, kind in REPORT_COLUMNS:
+        if field not in columns:
+            continue
+        fields.append(field)
+        if kind == 'money':
+            values.append((columns[field].to_numpy() / 100).tolist())
+        else:
+            values.append(columns[field].to_pylist())
+
+    return [dict(zip(fields, row)) for row in zip(*values)]
+
+
+def _total(columns, field):
+    if field not in columns or not len(columns[field]):
+        return 0
+    return pc.sum(columns[field]).as_py()
+
+
+def summarize_columns(columns, recusadas=0):
+    """Resumo do relatório somando as colunas (dinheiro somado em centavos)"""
+    titulos_total = _total(columns, 'qtd_titulos')
+    arrecadado_total = _total(columns, 'total') / 100 if 'total' in columns else 0
+
+    return {
+        'vendas_total': _total(columns, 'vendas'),
+        'titulos_total': titulos_total,
+        'arrecadado_total': arrecadado_total,
+        'dias_com_vendas': len(columns.get('data', [])),
+        'ticket_medio_geral': arrecadado_total / titulos_total if titulos_total > 0 else 0,
+        'recusadas': recusadas
+    }
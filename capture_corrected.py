@@ -9,14 +9,41 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
-from selenium.common.exceptions import NoAlertPresentException, TimeoutException, NoSuchElementException
+from selenium.common.exceptions import NoAlertPresentException, TimeoutException
+from bs4 import BeautifulSoup
+import copy
+import heapq
 import json
 import time
-import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import os
 from pathlib import Path
 import sys
+import threading
+from urllib.parse import urlparse
+
+from capture_parsing import (
+    parse_money, parse_quantity, new_rifa_info, fill_rifa_from_cells, fill_rifa_from_text,
+    title_from_breadcrumb, sales_table, fill_report, new_report
+)
+from capture_http import ImperioHttpCapture
+from capture_throttle import HostRateLimiter, AIMDController
+from capture_lock import CaptureLock
+from capture_tiers import hot_tokens, latest_capture_file
+from capture_driver_pool import WebDriverPool, seed_cookies
+from capture_session import SessionStore
+from capture_cache import ReportCache, ChangeStats, table_hash, reuse_report
+from capture_checkpoint import CaptureCheckpoint
+from capture_history import CaptureHistory
+from capture_latest import update_latest
+from capture_pagination import PaginationMemory, detect_pagination, page_url
+from capture_profile import (
+    PageLoadStats, ProfileHistory, apply_scrape_options, block_resources, blocked_patterns
+)
+from capture_waits import (
+    ReadinessWaiter, document_ready, element_present, url_left,
+    alert_present, first_token_changed, any_of
+)
 
 # Força UTF-8 no Windows
 if sys.platform == 'win32':
@@ -24,15 +51,124 @@ if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
+RIFA_CHECKBOX_CSS = "input[type='checkbox'][name='rifa[]']"
+
+# Extratores em JavaScript: leem a página inteira em um único execute_script,
+# evitando uma ida e volta ao WebDriver por checkbox/célula
+RIFAS_LIST_SCRIPT = """
+const text = el => (el.innerText || el.textContent || '').trim();
+return Array.from(document.querySelectorAll("input[type='checkbox'][name='rifa[]']")).map(cb => {
+    const row = cb.closest('tr');
+    const container = row || cb.closest('div');
+    return {
+        value: cb.getAttribute('value') || '',
+        token: cb.getAttribute('data-token') || '',
+        cells: row ? Array.from(row.querySelectorAll('td')).slice(0, 4).map(text) : null,
+        text: !row && container ? text(container) : ''
+    };
+});
+"""
+
+REPORT_TABLES_SCRIPT = """
+const text = el => (el.innerText || el.textContent || '').trim();
+return {
+    breadcrumb: Array.from(document.querySelectorAll('.breadcrumb li')).map(text),
+    tables: Array.from(document.querySelectorAll('table.table')).map(table => {
+        const tbody = table.querySelector('tbody');
+        const tfoot = table.querySelector('tfoot');
+        return {
+            headers: Array.from(table.querySelectorAll('thead th')).map(text),
+            rows: tbody ? Array.from(tbody.querySelectorAll('tr')).map(
+                tr => Array.from(tr.querySelectorAll('td')).map(text)
+            ) : [],
+            footer: tfoot ? text(tfoot) : ''
+        };
+    })
+};
+"""
+
+_chromedriver_path = None
+
+
+class CaptureCancelled(Exception):
+    """Captura interrompida a pedido (cancel_event sinalizado)"""
+
+
+def chromedriver_path():
+    """Caminho do chromedriver, resolvido pelo webdriver_manager uma vez por processo"""
+    global _chromedriver_path
+    if _chromedriver_path is None:
+        _chromedriver_path = ChromeDriverManager().install()
+    return _chromedriver_path
+
+
 class ImperioCapturaCorrected:
     def __init__(self, config_file='./config/config.json'):
         """Inicializa o sistema corrigido"""
         self.config = self.load_config(config_file)
         self.driver = None
+        self.headless = False
         self.data_dir = Path('data/captures')
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.rifas_data = []
-        self.detailed_reports = {}
+        self.completed_tokens = set()
+        self.saved_capture = None
+        self.http = None
+        self.user_data_dir = self.config.get('capture', {}).get('user_data_dir')
+        self.metrics = {}
+        self.progress_callback = None
+        self.cancel_event = None
+        self.reports_done = 0
+        self.reports_total = 0
+        self.list_pages_done = 0
+        self.progress_lock = threading.Lock()
+        self.report_cache = None
+        self.history = None
+        self.pagination_memory = PaginationMemory(Path('data/cache/pagination.json'))
+        account = f"{self.config['imperio'].get('username', '')}@{self.config['imperio']['base_url']}"
+        self.session_store = SessionStore(Path('data/session/session.json'), account=account)
+        self.checkpoint = CaptureCheckpoint(Path('data/checkpoints/captura_em_andamento.ndjson'), account=account)
+        self.capture_lock = CaptureLock(Path('data/locks/capture.lock'), account=account, log=self.log)
+        self.attached = False
+        self.skipped = False
+        self.hot_base = None
+        self.hot_target = None
+        self.hot_pending = []
+        self.tier = 'completa'
+        self.change_stats = ChangeStats()
+        
+        capture_config = self.config.get('capture', {})
+        if capture_config.get('cache_enabled', True):
+            self.report_cache = ReportCache(
+                Path('data/cache/reports'),
+                ttl_hours=capture_config.get('cache_ttl_hours', 720)
+            )
+        if capture_config.get('storage', 'full') == 'delta':
+            self.history = CaptureHistory(
+                Path('data/history'),
+                base_every=capture_config.get('history_base_every', 24)
+            )
+        self.waiter = ReadinessWaiter(
+            timeout=self.config.get('capture', {}).get('wait_timeout', 10),
+            log=self.log
+        )
+        self.page_stats = PageLoadStats(self.browser_profile())
+        self.profile_history = ProfileHistory(Path('data/cache/profile_stats.json'))
+        
+        # Ritmo das requisições: fixo ou ajustado pelo controle adaptativo (AIMD)
+        concurrency = max(1, int(capture_config.get('concurrency', 4)))
+        self.rate_limiter = HostRateLimiter(capture_config.get('requests_per_second', 4), burst=concurrency)
+        self.controller = None
+        if capture_config.get('adaptive', True):
+            self.controller = AIMDController(
+                concurrency=concurrency,
+                rate=capture_config.get('requests_per_second', 4),
+                max_concurrency=capture_config.get('max_concurrency', 16),
+                max_rate=capture_config.get('max_requests_per_second', 20),
+                latency_target=capture_config.get('latency_target_s', 2.0),
+                limiter=self.rate_limiter,
+                log=self.log
+            )
         
     def load_config(self, config_file):
         """Carrega configurações com validação completa"""
@@ -47,7 +183,26 @@ class ImperioCapturaCorrected:
             },
             'capture': {
                 'timeout': 30,
-                'wait_between_actions': 2
+                'wait_between_actions': 2,
+                'engine': 'http',
+                'concurrency': 4,
+                'requests_per_second': 4,
+                'adaptive': True,
+                'max_concurrency': 16,
+                'max_requests_per_second': 20,
+                'latency_target_s': 2.0,
+                'browser_pool_size': 1,
+                'browser_task_timeout': 90,
+                'wait_timeout': 10,
+                'cache_enabled': True,
+                'cache_ttl_hours': 720,
+                'max_pages': 200,
+                'browser_profile': 'full',
+                'block_resources': ['images', 'fonts', 'media', 'styles', 'third_party'],
+                'allow_resources': [],
+                'http_login': False,
+                'storage': 'full',
+                'history_base_every': 24
             }
         }
         
@@ -90,9 +245,14 @@ class ImperioCapturaCorrected:
         timestamp = datetime.now().strftime('%H:%M:%S')
         print(f"[{timestamp}] {message}")
     
-    def setup_driver(self, headless=False):
-        """Configura o driver do Chrome"""
-        self.log("🔧 Configurando navegador...")
+    def browser_profile(self):
+        """Perfil do navegador: 'full' (página completa, padrão) ou 'scrape' (enxuto, opcional)"""
+        return self.config.get('capture', {}).get('browser_profile', 'full')
+    
+    def create_driver(self, headless=False, profile=None, user_data_dir=None):
+        """Cria uma instância do Chrome com as opções da captura"""
+        capture_config = self.config.get('capture', {})
+        profile = profile or self.browser_profile()
         
         options = webdriver.ChromeOptions()
         options.add_experimental_option('excludeSwitches', ['enable-logging'])
@@ -104,15 +264,44 @@ class ImperioCapturaCorrected:
         
         if headless:
             options.add_argument('--headless')
+        
+        # Perfil persistente: cache HTTP do Chrome sobrevive entre execuções
+        if user_data_dir:
+            Path(user_data_dir).mkdir(parents=True, exist_ok=True)
+            options.add_argument(f'--user-data-dir={Path(user_data_dir).resolve()}')
+        
+        if profile == 'scrape':
+            apply_scrape_options(options)
+        
+        service = Service(chromedriver_path())
+        driver = webdriver.Chrome(service=service, options=options)
+        
+        timeout = capture_config.get('timeout', 30)
+        driver.set_page_load_timeout(timeout)
+        
+        if profile == 'scrape':
+            # Só o HTML importa: imagens, fontes, mídia, CSS e rastreadores não são baixados
+            try:
+                block_resources(driver, blocked_patterns(
+                    capture_config.get('block_resources'),
+                    capture_config.get('allow_resources')
+                ))
+            except Exception as e:
+                self.log(f"⚠️ Bloqueio de recursos indisponível: {e}")
+        
+        return driver
+    
+    def setup_driver(self, headless=False):
+        """Configura o driver do Chrome"""
+        self.log("🔧 Configurando navegador...")
+        self.headless = headless
+        
+        if headless:
             self.log("Modo headless ativado")
+        self.log(f"Perfil do navegador: {self.browser_profile()}")
         
         try:
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=options)
-            
-            timeout = self.config.get('capture', {}).get('timeout', 30)
-            self.driver.set_page_load_timeout(timeout)
-            
+            self.driver = self.create_driver(headless, user_data_dir=self.user_data_dir)
             self.log("✅ Navegador configurado!")
         except Exception as e:
             self.log(f"❌ Erro ao configurar navegador: {e}")
@@ -125,11 +314,39 @@ class ImperioCapturaCorrected:
             alert_text = alert.text
             self.log(f"📢 Alert: '{alert_text}'")
             alert.accept()
-            time.sleep(1)
+            self.record_feedback('alert')
+            self.waiter.wait(self.driver, document_ready, 'alert', legacy_delay=1)
             return True
         except NoAlertPresentException:
             return False
     
+    def report_progress(self, etapa, **info):
+        """Publica o progresso (fila de capturas do servidor web) e atende cancelamentos
+
+        Levanta CaptureCancelled quando cancel_event foi sinalizado; por isso
+        é chamado apenas entre uma página/relatório e outro.
+        """
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise CaptureCancelled("Captura cancelada")
+        if self.progress_callback:
+            self.progress_callback(dict(info, etapa=etapa))
+    
+    def list_page_done(self, total_pages=None):
+        """Mais uma página da lista processada (HTTP ou Selenium)"""
+        with self.progress_lock:
+            self.list_pages_done += 1
+            done = self.list_pages_done
+        self.report_progress('lista', pagina=done, total_paginas=total_pages)
+    
+    def record_feedback(self, event, latency=None):
+        """Informa o controle adaptativo (quando ligado) sobre uma página/requisição"""
+        if self.controller:
+            self.controller.record(event, latency)
+    
+    def record_page(self, driver):
+        """Soma bytes e tempo de carregamento da página atual às métricas"""
+        self.page_stats.record(driver)
+    
     def wait_and_find(self, by, value, timeout=10):
         """Aguarda e encontra elemento"""
         try:
@@ -146,7 +363,17 @@ class ImperioCapturaCorrected:
         
         try:
             self.driver.get(f"{self.config['imperio']['base_url']}/auth")
-            time.sleep(3)
+            # Formulário de login, ou redirecionamento para o painel (navegador quente já logado)
+            self.waiter.wait(
+                self.driver, any_of(element_present("[name='username']"), url_left('/auth')),
+                'login_form', legacy_delay=3
+            )
+            self.record_page(self.driver)
+            
+            # Navegador reaproveitado ainda logado: /auth redireciona para o painel
+            if '/auth' not in self.driver.current_url and 'admin' in self.driver.current_url:
+                self.log("✅ Navegador já autenticado")
+                return True
             
             # Aguarda campos de login
             username_field = self.wait_and_find(By.NAME, "username")
@@ -165,8 +392,10 @@ class ImperioCapturaCorrected:
             login_button = self.driver.find_element(By.XPATH, "//button[@type='submit']")
             login_button.click()
             
-            time.sleep(3)
+            # Aguarda sair da tela de login (ou um alert de erro)
+            self.waiter.wait(self.driver, any_of(url_left('/auth'), alert_present), 'login_submit', legacy_delay=3)
             self.handle_alert()
+            self.waiter.wait(self.driver, document_ready, 'login_redirect')
             
             # Verifica sucesso do login
             if "admin" in self.driver.current_url or "dashboard" in self.driver.current_url:
@@ -178,52 +407,194 @@ class ImperioCapturaCorrected:
             
         return False
     
-    def parse_money(self, text):
-        """Converte string monetária para float"""
-        if not text:
-            return 0.0
+    def http_engine_enabled(self):
+        """Motor HTTP ligado na configuração (padrão)"""
+        return self.config.get('capture', {}).get('engine', 'http') == 'http'
+    
+    def build_http_engine(self, cookies, user_agent=None):
+        """Cria o motor HTTP autenticado pelos cookies informados"""
+        capture_config = self.config.get('capture', {})
+        concurrency = self.controller.max_concurrency if self.controller else capture_config.get('concurrency', 4)
         
-        clean = re.sub(r'[^\d,.-]', '', str(text))
-        if not clean:
-            return 0.0
-            
-        clean = clean.replace('.', '').replace(',', '.')
+        engine = ImperioHttpCapture(
+            self.config['imperio']['base_url'],
+            timeout=capture_config.get('timeout', 30),
+            pool_size=max(10, int(concurrency)),
+            user_agent=user_agent,
+            log=self.log,
+            rate_limiter=self.rate_limiter,
+            controller=self.controller,
+            change_stats=self.change_stats
+        )
+        engine.load_cookies(cookies)
+        return engine
+    
+    def setup_http_engine(self):
+        """Transfere os cookies do login para o motor HTTP (Selenium vira fallback)"""
+        if not self.http_engine_enabled():
+            self.log("ℹ️ Motor HTTP desativado, usando apenas Selenium")
+            return None
         
         try:
-            return float(clean)
-        except:
-            return 0.0
+            self.http = self.build_http_engine(self.driver.get_cookies(), self.driver_user_agent())
+            self.log("✅ Sessão transferida para o motor HTTP")
+        except Exception as e:
+            self.log(f"⚠️ Motor HTTP indisponível, usando Selenium: {e}")
+            self.http = None
+        
+        return self.http
     
-    def parse_quantity(self, text):
-        """Extrai quantidade de strings como '93 93%' ou '93'"""
-        if not text:
-            return 0
+    def http_login(self):
+        """Login direto pelo motor HTTP, sem abrir o Chrome (capture.http_login)"""
+        if not (self.http_engine_enabled() and self.config.get('capture', {}).get('http_login', False)):
+            return False
+        
+        self.log("🔐 Fazendo login via HTTP...")
+        engine = self.build_http_engine([])
+        
+        try:
+            if not engine.login(self.config['imperio']['username'], self.config['imperio']['password']):
+                raise Exception("credenciais recusadas")
+        except Exception as e:
+            engine.close()
+            self.log(f"⚠️ Login HTTP falhou ({e}), usando o navegador")
+            return False
+        
+        self.http = engine
+        self.session_store.save(engine.export_cookies(), engine.session.headers.get('User-Agent'))
+        self.log("✅ Login realizado via HTTP!")
+        return True
+    
+    def driver_user_agent(self):
+        """User-agent real do navegador (para o HTTP parecer o mesmo cliente)"""
+        try:
+            return self.driver.execute_script('return navigator.userAgent')
+        except Exception:
+            return None
+    
+    def restore_session(self):
+        """Reaproveita os cookies do último login se ainda forem válidos
+
+        Com o motor HTTP a validação é uma requisição simples e o Chrome nem
+        precisa ser aberto; no modo só-Selenium os cookies vão para o driver.
+        """
+        cookies = self.session_store.cookies
+        if not cookies:
+            return False
         
-        match = re.match(r'(\d+)', str(text).strip())
-        if match:
-            return int(match.group(1))
+        self.log("🔑 Verificando sessão salva...")
         
-        return 0
+        try:
+            if self.http_engine_enabled():
+                engine = self.build_http_engine(cookies, self.session_store.user_agent)
+                if not engine.check_session():
+                    engine.close()
+                    raise Exception("sessão expirada")
+                self.http = engine
+            else:
+                if not self.driver:
+                    self.setup_driver(self.headless)
+                seed_cookies(self.driver, self.config['imperio']['base_url'], cookies)
+                self.driver.get(f"{self.config['imperio']['base_url']}/admin/rifas")
+                self.waiter.wait_page(self.driver, RIFA_CHECKBOX_CSS, 'session_check')
+                if '/auth' in self.driver.current_url:
+                    raise Exception("sessão expirada")
+        except Exception as e:
+            self.log(f"ℹ️ Sessão salva não serve ({e}), fazendo login...")
+            self.session_store.invalidate()
+            return False
+        
+        self.session_store.mark_reused()
+        self.log("✅ Sessão reaproveitada, login dispensado")
+        return True
     
+    def save_session(self):
+        """Guarda os cookies do login para as próximas capturas"""
+        try:
+            self.session_store.save(self.driver.get_cookies(), self.driver_user_agent())
+        except Exception as e:
+            self.log(f"⚠️ Não foi possível salvar a sessão: {e}")
+    
+    def ensure_driver(self):
+        """Abre o Chrome sob demanda (sessão reaproveitada sem navegador)"""
+        if self.driver:
+            return self.driver
+        
+        try:
+            self.setup_driver(self.headless)
+            cookies = self.http.export_cookies() if self.http else self.session_store.cookies
+            seed_cookies(self.driver, self.config['imperio']['base_url'], cookies)
+        except Exception as e:
+            self.log(f"❌ Navegador indisponível para fallback: {e}")
+            return None
+        
+        return self.driver
+    
+    def parse_money(self, text):
+        """Converte string monetária para float"""
+        return parse_money(text)
+
+    def parse_quantity(self, text):
+        """Extrai quantidade de strings como '93 93%' ou '93'"""
+        return parse_quantity(text)
+
     def capture_rifas_list(self):
         """ETAPA 1: Captura lista de rifas com checkboxes e data-tokens"""
         self.log("\n📋 ETAPA 1: Capturando lista de rifas...")
+
+        if self.http:
+            try:
+                rifas = self.http.capture_rifas_list(
+                    max_pages=self.max_list_pages(),
+                    concurrency=self.config.get('capture', {}).get('concurrency', 4),
+                    memory=self.pagination_memory,
+                    on_page=self.list_page_done
+                )
+                if rifas:
+                    self.rifas_data = rifas
+                    self.log(f"\n✅ Total de rifas capturadas: {len(rifas)}")
+                    return rifas
+                self.log("⚠️ Lista não encontrada no HTML, usando Selenium...")
+            except CaptureCancelled:
+                raise
+            except Exception as e:
+                self.log(f"⚠️ Falha na lista via HTTP, usando Selenium: {e}")
+
+        if not self.ensure_driver():
+            return []
         
+        return self.capture_rifas_list_selenium()
+
+    def capture_rifas_list_selenium(self):
+        """ETAPA 1 via Selenium: percorre a lista pelo número da página
+
+        Quando a URL das páginas não é identificável, volta a clicar no botão
+        de próxima página.
+        """
         self.driver.get(f"{self.config['imperio']['base_url']}/admin/rifas")
-        time.sleep(3)
+        self.waiter.wait_page(self.driver, RIFA_CHECKBOX_CSS, 'rifas_list', legacy_delay=3)
+        self.record_page(self.driver)
         self.handle_alert()
         
         rifas = []
+        seen_tokens = set()
+        pagination = None
+        max_pages = self.max_list_pages()
         page = 1
         
         while True:
             self.log(f"\n📄 Processando página {page}...")
+            self.list_page_done(pagination.get('total_pages') if pagination else None)
             
             try:
-                # Busca checkboxes - elemento chave para identificar rifas
-                checkboxes = self.driver.find_elements(By.CSS_SELECTOR, "input[type='checkbox'][name='rifa[]']")
+                # Busca checkboxes (elemento chave das rifas) e suas linhas em uma única chamada
+                checkboxes = self.driver.execute_script(RIFAS_LIST_SCRIPT) or []
                 
                 if not checkboxes:
+                    if pagination and page > 1:
+                        self.log("✅ Todas as páginas processadas!")
+                        break
+                    
                     self.log("⚠️ Nenhum checkbox encontrado na página")
                     
                     # Tenta buscar de outras formas
@@ -245,82 +616,37 @@ class ImperioCapturaCorrected:
                 
                 self.log(f"✅ Encontrados {len(checkboxes)} checkboxes")
                 
+                # Página repetida: o servidor ignorou o número da página
+                if page > 1 and all(cb.get('token') in seen_tokens for cb in checkboxes):
+                    self.log("ℹ️ Página repetida, fim da lista")
+                    break
+                
                 # Para cada checkbox, extrai informações
                 for i, checkbox in enumerate(checkboxes):
                     try:
-                        rifa_info = {
-                            'index': len(rifas) + 1,
-                            'checkbox_value': checkbox.get_attribute('value') or '',
-                            'data_token': checkbox.get_attribute('data-token') or '',
-                            'timestamp_captura': datetime.now().isoformat(),
-                            'id': '',
-                            'titulo': '',
-                            'status': 'Desconhecido'
-                        }
+                        rifa_info = new_rifa_info(
+                            len(rifas) + 1,
+                            checkbox.get('value'),
+                            checkbox.get('token'),
+                            datetime.now().isoformat()
+                        )
                         
                         # Validação do data-token
                         if not rifa_info['data_token']:
                             self.log(f"   ⚠️ Checkbox {i+1} sem data-token, pulando...")
                             continue
                         
-                        # Tenta extrair mais informações do container pai
-                        try:
-                            # Busca a linha da tabela (TR) que contém o checkbox
-                            row = checkbox.find_element(By.XPATH, "./ancestor::tr[1]")
-                            cells = row.find_elements(By.TAG_NAME, "td")
-                            
-                            # Geralmente a estrutura é:
-                            # TD 0: Checkbox
-                            # TD 1: ID
-                            # TD 2: Título
-                            # TD 3: Status
-                            # ... outras colunas
-                            
-                            if len(cells) >= 3:
-                                # ID (segunda coluna)
-                                if len(cells) > 1:
-                                    id_text = cells[1].text.strip()
-                                    if id_text:
-                                        rifa_info['id'] = id_text
-                                
-                                # Título (terceira coluna)
-                                if len(cells) > 2:
-                                    titulo_text = cells[2].text.strip()
-                                    if titulo_text:
-                                        rifa_info['titulo'] = titulo_text
-                                
-                                # Status (quarta coluna)
-                                if len(cells) > 3:
-                                    status_text = cells[3].text.strip()
-                                    if status_text:
-                                        rifa_info['status'] = status_text
-                            
-                        except Exception as e:
-                            # Se falhar, tenta extrair do texto geral
-                            try:
-                                container = checkbox.find_element(By.XPATH, "./ancestor::*[self::tr or self::div][1]")
-                                text = container.text
-                                
-                                # Extrai ID
-                                id_match = re.search(r'#(\d{4,})', text)
-                                if id_match:
-                                    rifa_info['id'] = f"#{id_match.group(1)}"
-                                
-                                # Extrai título
-                                title_match = re.search(r'(\d+º?\s*RAPIDINHA.*?R\$[\d.,]+)', text, re.IGNORECASE)
-                                if title_match:
-                                    rifa_info['titulo'] = title_match.group(1)
-                                
-                                # Extrai status
-                                if 'ativo' in text.lower():
-                                    rifa_info['status'] = 'Ativo'
-                                elif 'concluído' in text.lower() or 'concluido' in text.lower():
-                                    rifa_info['status'] = 'Concluído'
-                                elif 'finalizado' in text.lower():
-                                    rifa_info['status'] = 'Finalizado'
-                            except:
-                                pass
+                        # Linha da tabela (TD 0 checkbox, TD 1 ID, TD 2 título, TD 3 status)
+                        # ou, sem TR, o texto geral do container
+                        if checkbox.get('cells') is not None:
+                            fill_rifa_from_cells(rifa_info, checkbox['cells'])
+                        else:
+                            fill_rifa_from_text(rifa_info, checkbox.get('text', ''))
+                        
+                        if rifa_info['data_token'] in seen_tokens:
+                            continue
                         
+                        seen_tokens.add(rifa_info['data_token'])
                         rifas.append(rifa_info)
                         self.log(f"   ✅ [{len(rifas)}] Token: {rifa_info['data_token'][:20]}... | ID: {rifa_info.get('id', 'N/A')}")
                         
@@ -331,6 +657,29 @@ class ImperioCapturaCorrected:
                 self.log(f"❌ Erro ao processar página {page}: {e}")
                 break
             
+            # Limite de segurança
+            if page >= max_pages:
+                self.log(f"⚠️ Limite de páginas atingido ({max_pages})")
+                break
+            
+            # Descobre uma vez o padrão de URL das páginas
+            if page == 1:
+                pagination = self.detect_list_pagination(self.driver.page_source, self.driver.current_url)
+            
+            # Acesso direto pelo número da página
+            if pagination:
+                total_pages = pagination.get('total_pages')
+                if total_pages and page >= total_pages:
+                    self.log("✅ Todas as páginas processadas!")
+                    break
+                
+                page += 1
+                self.driver.get(page_url(pagination['template'], page))
+                self.waiter.wait_page(self.driver, RIFA_CHECKBOX_CSS, 'pagination', legacy_delay=4)
+                self.record_page(self.driver)
+                self.handle_alert()
+                continue
+            
             # Busca botão de próxima página
             try:
                 # Tenta encontrar link/botão "Próxima" ou ">"
@@ -361,10 +710,9 @@ class ImperioCapturaCorrected:
                         break
                 
                 if next_button:
-                    self.driver.execute_script("arguments[0].scrollIntoView(true);", next_button)
-                    time.sleep(1)
-                    self.driver.execute_script("arguments[0].click();", next_button)
-                    time.sleep(3)
+                    previous_token = checkboxes[0].get('token')
+                    self.driver.execute_script("arguments[0].scrollIntoView(true); arguments[0].click();", next_button)
+                    self.waiter.wait(self.driver, first_token_changed(previous_token), 'pagination', legacy_delay=4)
                     page += 1
                     continue
                 else:
@@ -374,151 +722,138 @@ class ImperioCapturaCorrected:
             except Exception as e:
                 self.log(f"ℹ️ Fim da paginação: {e}")
                 break
-            
-            # Limite de segurança
-            if page > 50:
-                self.log("⚠️ Limite de páginas atingido (50)")
-                break
+        
+        if rifas:
+            if pagination:
+                self.pagination_memory.remember(pagination['strategy'], pagination['template'], page)
+            else:
+                self.pagination_memory.remember('click')
         
         self.rifas_data = rifas
         self.log(f"\n✅ Total de rifas capturadas: {len(rifas)}")
         return rifas
     
-    def extract_title_from_breadcrumb(self):
+    def max_list_pages(self):
+        """Limite de segurança de páginas da lista"""
+        return int(self.config.get('capture', {}).get('max_pages', 200))
+    
+    def detect_list_pagination(self, html, current_url):
+        """Padrão de URL/total de páginas da lista, ou o padrão lembrado"""
+        try:
+            pagination = detect_pagination(BeautifulSoup(html, 'html.parser'), current_url)
+        except Exception:
+            pagination = None
+        
+        if not pagination and self.pagination_memory.template:
+            pagination = {
+                'strategy': self.pagination_memory.strategy,
+                'template': self.pagination_memory.template_for(self.config['imperio']['base_url']),
+                'total_pages': None
+            }
+        
+        if pagination:
+            total = pagination.get('total_pages') or '?'
+            self.log(f"🔢 Paginação direta ({pagination['strategy']}): {total} páginas")
+        
+        return pagination
+    
+    def extract_title_from_breadcrumb(self, driver=None):
         """Extrai título do breadcrumb da página"""
+        driver = driver or self.driver
         try:
-            breadcrumb = self.driver.find_element(By.CSS_SELECTOR, ".breadcrumb")
+            breadcrumb = driver.find_element(By.CSS_SELECTOR, ".breadcrumb")
             if breadcrumb:
                 items = breadcrumb.find_elements(By.CSS_SELECTOR, "li")
-                for item in reversed(items):
-                    text = item.text.strip()
-                    if 'RAPIDINHA' in text.upper():
-                        return text
+                return title_from_breadcrumb([item.text for item in items])
         except:
             pass
         
         return ""
     
     def capture_detailed_report(self, rifa_info):
-        """ETAPA 2: Captura relatório detalhado usando data-token"""
+        """ETAPA 2: Captura relatório detalhado usando data-token
+
+        Usa o motor HTTP quando disponível e cai para o Selenium se a página
+        não puder ser lida diretamente.
+        """
         token = rifa_info.get('data_token')
         if not token:
             return None
+
+        if self.http:
+            try:
+                report_data = self.http.capture_detailed_report(rifa_info, self.previous_entry(rifa_info))
+                self.log_report_summary(report_data)
+                return report_data
+            except Exception as e:
+                self.log(f"      ⚠️ HTTP falhou ({e}), usando Selenium...")
+
+        if not self.ensure_driver():
+            return None
         
+        return self.capture_detailed_report_selenium(rifa_info)
+
+    def previous_entry(self, rifa_info):
+        """Entrada do cache da captura anterior (hash da tabela, ETag)"""
+        if not self.report_cache:
+            return None
+        return self.report_cache.previous(rifa_info)
+    
+    def log_report_summary(self, report_data):
+        """Loga o resumo de um relatório capturado"""
+        if report_data['dados_tabela']:
+            resumo = report_data['resumo']
+            self.log(f"      📊 Resumo: {resumo['vendas_total']} vendas | {resumo['titulos_total']} títulos | R$ {resumo['arrecadado_total']:,.2f}")
+        else:
+            self.log("      ⚠️ Nenhum dado encontrado na tabela")
+
+    def capture_detailed_report_selenium(self, rifa_info, driver=None):
+        """ETAPA 2 via Selenium: abre o relatório no navegador"""
+        driver = driver or self.driver
+        token = rifa_info.get('data_token')
         url = f"{self.config['imperio']['base_url']}/admin/rifas/relatorios/{token}"
         
         try:
             self.log(f"   📊 Acessando relatório: {url}")
-            self.driver.get(url)
-            time.sleep(2)
+            started = time.monotonic()
+            driver.get(url)
+            if self.waiter.wait_page(driver, 'table.table', 'report', legacy_delay=2):
+                self.record_feedback('ok', time.monotonic() - started)
+            else:
+                self.record_feedback('timeout')
+            self.record_page(driver)
+            
+            # Breadcrumb e tabelas extraídos em uma única chamada
+            page = driver.execute_script(REPORT_TABLES_SCRIPT) or {}
             
             # Extrai título do breadcrumb se não tiver
             if not rifa_info.get('titulo'):
-                titulo = self.extract_title_from_breadcrumb()
+                titulo = title_from_breadcrumb(page.get('breadcrumb', []))
                 if titulo:
                     rifa_info['titulo'] = titulo
                     self.log(f"      ✅ Título encontrado: {titulo}")
             
-            report_data = {
-                'token': token,
-                'url': url,
-                'titulo': rifa_info.get('titulo', ''),
-                'id': rifa_info.get('id', ''),
-                'checkbox_value': rifa_info.get('checkbox_value', ''),
-                'dados_tabela': [],
-                'resumo': {
-                    'vendas_total': 0,
-                    'titulos_total': 0,
-                    'arrecadado_total': 0.0,
-                    'ticket_medio_geral': 0.0,
-                    'dias_com_vendas': 0,
-                    'recusadas': 0
-                }
-            }
+            # Tabela igual à da captura anterior não é parseada de novo (o hash
+            # das células é o mesmo do motor HTTP)
+            table = sales_table(page.get('tables', []))
+            digest = table_hash(table) if table else None
+            previous = (self.previous_entry(rifa_info) or {}).get('report')
+            if digest and previous and previous.get('hash_tabela') == digest:
+                self.change_stats.count('hash_igual')
+                report_data = reuse_report(previous, rifa_info, url)
+                self.log_report_summary(report_data)
+                return report_data
             
-            # Procura pela tabela de vendas
-            tables = self.driver.find_elements(By.CSS_SELECTOR, "table.table")
+            report_data = new_report(token, url, rifa_info)
+            self.change_stats.count('parseados')
             
-            for table in tables:
-                headers_elements = table.find_elements(By.CSS_SELECTOR, "thead th")
-                if not headers_elements:
-                    continue
-                
-                headers = [h.text.strip().lower() for h in headers_elements]
-                
-                # Verifica se é a tabela correta (tem colunas de data e vendas)
-                if any('data' in h for h in headers) and any('vendas' in h for h in headers):
-                    self.log("      ✅ Tabela de vendas encontrada")
-                    
-                    # Mapeia índices das colunas
-                    col_map = {
-                        'data': next((i for i, h in enumerate(headers) if 'data' in h), -1),
-                        'ticket': next((i for i, h in enumerate(headers) if 'ticket' in h or 'tícket' in h), -1),
-                        'vendas': next((i for i, h in enumerate(headers) if 'vendas' in h), -1),
-                        'titulos': next((i for i, h in enumerate(headers) if 'qtd' in h or 'título' in h), -1),
-                        'total': next((i for i, h in enumerate(headers) if 'total' in h), -1)
-                    }
-                    
-                    # Processa linhas
-                    tbody = table.find_element(By.TAG_NAME, "tbody")
-                    rows = tbody.find_elements(By.TAG_NAME, "tr")
-                    
-                    for row in rows:
-                        cells = row.find_elements(By.TAG_NAME, "td")
-                        if len(cells) >= len(headers):
-                            row_data = {}
-                            
-                            if col_map['data'] >= 0:
-                                row_data['data'] = cells[col_map['data']].text.strip()
-                            
-                            if col_map['ticket'] >= 0:
-                                row_data['ticket_medio'] = self.parse_money(cells[col_map['ticket']].text)
-                            
-                            if col_map['vendas'] >= 0:
-                                try:
-                                    row_data['vendas'] = int(cells[col_map['vendas']].text.strip())
-                                except:
-                                    row_data['vendas'] = 0
-                            
-                            if col_map['titulos'] >= 0:
-                                row_data['qtd_titulos'] = self.parse_quantity(cells[col_map['titulos']].text)
-                            
-                            if col_map['total'] >= 0:
-                                row_data['total'] = self.parse_money(cells[col_map['total']].text)
-                            
-                            if row_data.get('data'):
-                                report_data['dados_tabela'].append(row_data)
-                    
-                    # Processa footer para recusadas
-                    try:
-                        tfoot = table.find_element(By.TAG_NAME, "tfoot")
-                        footer_text = tfoot.text
-                        recusadas_match = re.search(r'recusadas:\s*(\d+)', footer_text, re.IGNORECASE)
-                        if recusadas_match:
-                            report_data['resumo']['recusadas'] = int(recusadas_match.group(1))
-                    except:
-                        pass
-                    
-                    break
+            # Tabela de vendas: tem colunas de data e vendas
+            if table:
+                self.log("      ✅ Tabela de vendas encontrada")
+                report_data['hash_tabela'] = digest
+                fill_report(report_data, table)
             
-            # Calcula resumo
-            if report_data['dados_tabela']:
-                vendas_total = sum(r.get('vendas', 0) for r in report_data['dados_tabela'])
-                titulos_total = sum(r.get('qtd_titulos', 0) for r in report_data['dados_tabela'])
-                arrecadado_total = sum(r.get('total', 0) for r in report_data['dados_tabela'])
-                
-                report_data['resumo'] = {
-                    'vendas_total': vendas_total,
-                    'titulos_total': titulos_total,
-                    'arrecadado_total': arrecadado_total,
-                    'dias_com_vendas': len(report_data['dados_tabela']),
-                    'ticket_medio_geral': arrecadado_total / titulos_total if titulos_total > 0 else 0,
-                    'recusadas': report_data['resumo'].get('recusadas', 0)
-                }
-                
-                self.log(f"      📊 Resumo: {vendas_total} vendas | {titulos_total} títulos | R$ {arrecadado_total:,.2f}")
-            else:
-                self.log("      ⚠️ Nenhum dado encontrado na tabela")
+            self.log_report_summary(report_data)
             
             return report_data
             
@@ -537,35 +872,309 @@ class ImperioCapturaCorrected:
         self.log(f"\n📈 ETAPA 2: Capturando relatórios detalhados de {len(self.rifas_data)} rifas...")
         self.log("=" * 60)
         
-        for i, rifa in enumerate(self.rifas_data):
-            self.log(f"\n[{i+1}/{len(self.rifas_data)}] Processando rifa: {rifa.get('titulo', 'Sem título')} (Token: {rifa['data_token'][:20]}...)")
+        # Retomada: relatórios já gravados no checkpoint não são buscados de novo
+        rifas = [r for r in self.rifas_data if r.get('data_token') not in self.completed_tokens]
+        if self.completed_tokens:
+            self.log(f"⏩ {len(self.rifas_data) - len(rifas)} relatórios já estavam no checkpoint")
+        
+        self.reports_total = len(self.rifas_data)
+        self.reports_done = len(self.rifas_data) - len(rifas)
+        self.report_progress('relatorios', atual=self.reports_done, total=self.reports_total)
+        
+        # Rifas encerradas já conhecidas saem do cache
+        pending = self.apply_cached_reports(rifas)
+        
+        try:
+            if not pending:
+                pass
+            elif self.http:
+                self.capture_reports_concurrently(pending)
+            elif self.browser_pool_size() > 1:
+                self.capture_reports_with_pool(pending)
+            else:
+                for i, rifa in enumerate(pending):
+                    self.log(f"\n[{i+1}/{len(pending)}] Processando rifa: {rifa.get('titulo', 'Sem título')} (Token: {rifa['data_token'][:20]}...)")
+                    
+                    report = self.capture_detailed_report(rifa)
+                    self.merge_report(rifa, report)
+                    
+                    self.pace_browser()
+        finally:
+            self.save_report_cache()
+    
+    def pace_browser(self):
+        """Pausa entre relatórios no Selenium sequencial
+
+        Com o controle adaptativo o intervalo vem da taxa atual do rate
+        limiter (que cai com alerts/timeouts e sobe com páginas rápidas);
+        sem ele, mantém a pausa fixa de wait_between_actions.
+        """
+        if self.controller:
+            self.rate_limiter.acquire(urlparse(self.config['imperio']['base_url']).netloc)
+        else:
+            time.sleep(self.config.get('capture', {}).get('wait_between_actions', 2))
+    
+    def apply_cached_reports(self, rifas):
+        """Mescla relatórios em cache das rifas encerradas e retorna as pendentes"""
+        if not self.report_cache:
+            return [rifa for rifa in rifas if rifa.get('data_token')]
+        
+        pending = []
+        for rifa in rifas:
+            if not rifa.get('data_token'):
+                continue
             
-            report = self.capture_detailed_report(rifa)
+            report = self.report_cache.get(rifa)
+            if report:
+                self.merge_report(rifa, report, from_cache=True)
+            else:
+                pending.append(rifa)
+        
+        stats = self.report_cache.stats()
+        self.log(f"🗃️ Cache de relatórios: {stats['hits']} hits | {stats['misses']} misses")
+        return pending
+    
+    def save_report_cache(self):
+        """Persiste o cache e registra hits/misses nas métricas"""
+        if not self.report_cache:
+            return
+        
+        try:
+            self.report_cache.save()
+        except Exception as e:
+            self.log(f"⚠️ Erro ao salvar cache de relatórios: {e}")
+        
+        self.metrics['cache_relatorios'] = self.report_cache.stats()
+    
+    def capture_reports_concurrently(self, rifas):
+        """Baixa relatórios via HTTP com um pool de workers
+
+        O ritmo é controlado pelo rate limiter do motor HTTP; relatórios que
+        falharem no HTTP são refeitos em seguida via Selenium, um por vez.
+        Com o controle adaptativo o pool tem max_concurrency threads, mas só
+        a concorrência atual do controlador fica em voo ao mesmo tempo.
+        """
+        if self.controller:
+            concurrency = self.controller.max_concurrency
+            self.log(f"⚡ Modo paralelo adaptativo: {self.controller.concurrency} workers (até {concurrency})")
+        else:
+            concurrency = max(1, int(self.config.get('capture', {}).get('concurrency', 4)))
+            self.log(f"⚡ Modo paralelo: {concurrency} workers")
+        
+        def fetch(rifa):
+            if not rifa.get('data_token'):
+                return None, None
+            try:
+                previous = self.previous_entry(rifa)
+                if self.controller:
+                    with self.controller.slot():
+                        return self.http.capture_detailed_report(rifa, previous), None
+                return self.http.capture_detailed_report(rifa, previous), None
+            except Exception as e:
+                return None, e
+        
+        fallback = []
+        
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(fetch, rifa) for rifa in rifas]
+            
+            try:
+                self.merge_fetched(rifas, futures, fallback)
+            except CaptureCancelled:
+                # Relatórios que ainda não começaram nem chegam a ser baixados
+                for future in futures:
+                    future.cancel()
+                raise
+        
+        if fallback and self.ensure_driver():
+            self.log(f"\n🔁 Refazendo {len(fallback)} relatórios via Selenium...")
+            if self.browser_pool_size() > 1 and len(fallback) > 1:
+                self.capture_reports_with_pool(fallback)
+            else:
+                for rifa in fallback:
+                    self.merge_report(rifa, self.capture_detailed_report_selenium(rifa))
+    
+    def merge_fetched(self, rifas, futures, fallback):
+        """Mescla os relatórios baixados em paralelo; falhas HTTP vão para `fallback`"""
+        # Na ordem original da lista para manter o resultado determinístico
+        for i, (rifa, future) in enumerate(zip(rifas, futures)):
+            report, error = future.result()
+            self.log(f"\n[{i+1}/{len(rifas)}] Rifa: {rifa.get('titulo', 'Sem título')} (Token: {rifa.get('data_token', '')[:20]}...)")
+            
+            if error is not None:
+                self.log(f"      ⚠️ HTTP falhou ({error}), será refeita via Selenium")
+                fallback.append(rifa)
+                continue
             
             if report:
-                # Adiciona o relatório ao dicionário
-                token = rifa['data_token']
-                self.detailed_reports[token] = report
-                
-                # Atualiza informações da rifa com dados do relatório
-                if report.get('titulo') and not rifa.get('titulo'):
-                    rifa['titulo'] = report['titulo']
-                
-                if 'resumo' in report:
-                    rifa['vendas_total'] = report['resumo']['vendas_total']
-                    rifa['titulos_total'] = report['resumo']['titulos_total']
-                    rifa['arrecadado_total'] = report['resumo']['arrecadado_total']
-                    rifa['ticket_medio'] = report['resumo']['ticket_medio_geral']
-                    rifa['recusadas'] = report['resumo'].get('recusadas', 0)
-            
-            # Pequena pausa entre requisições
-            time.sleep(self.config.get('capture', {}).get('wait_between_actions', 2))
+                self.log_report_summary(report)
+            self.merge_report(rifa, report)
     
-    def save_data(self):
-        """Salva todos os dados capturados"""
+    def browser_pool_size(self):
+        """Quantidade de navegadores paralelos configurada"""
+        return max(1, int(self.config.get('capture', {}).get('browser_pool_size', 1)))
+    
+    def capture_reports_with_pool(self, rifas):
+        """Captura relatórios via Selenium distribuindo as rifas entre N navegadores"""
+        capture_config = self.config.get('capture', {})
+        pool = WebDriverPool(
+            lambda: self.create_driver(self.headless),
+            self.config['imperio']['base_url'],
+            size=min(self.browser_pool_size(), len(rifas)),
+            task_timeout=capture_config.get('browser_task_timeout', 90),
+            log=self.log
+        )
+        
+        try:
+            pool.start(self.driver)
+            reports = pool.map(
+                lambda driver, rifa: self.capture_detailed_report_selenium(rifa, driver=driver),
+                rifas
+            )
+        finally:
+            # O slot 0 pode ter sido reciclado; mantém o driver vivo como principal
+            self.driver = pool.close()
+        
+        for rifa, report in zip(rifas, reports):
+            self.merge_report(rifa, report)
+    
+    @property
+    def detailed_reports(self):
+        """Relatórios mesclados nesta captura, por token
+
+        Não ficam na memória: vêm do checkpoint enquanto a captura roda e do
+        arquivo salvo (ou do histórico em deltas) depois de save_data.
+        """
+        if self.checkpoint.exists():
+            tokens = [r.get('data_token') for r in self.rifas_data]
+            return dict(self.checkpoint.iter_reports(tokens))
+        if self.saved_capture is None:
+            return {}
+        if self.history:
+            data = self.history.rebuild(self.saved_capture)
+        else:
+            with open(self.saved_capture, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        return data.get('relatorios_detalhados', {})
+    
+    def merge_report(self, rifa, report, from_cache=False):
+        """Adiciona o relatório e atualiza os totais da rifa"""
+        if not report:
+            self.report_processed()
+            return
+        
+        token = rifa['data_token']
+        
+        if self.report_cache and not from_cache:
+            validators = self.http.validators.get(token) if self.http else None
+            self.report_cache.put(rifa, report, validators)
+        
+        # Atualiza informações da rifa com dados do relatório
+        if report.get('titulo') and not rifa.get('titulo'):
+            rifa['titulo'] = report['titulo']
+        
+        if 'resumo' in report:
+            rifa['vendas_total'] = report['resumo']['vendas_total']
+            rifa['titulos_total'] = report['resumo']['titulos_total']
+            rifa['arrecadado_total'] = report['resumo']['arrecadado_total']
+            rifa['ticket_medio'] = report['resumo']['ticket_medio_geral']
+            rifa['recusadas'] = report['resumo'].get('recusadas', 0)
+        
+        # O relatório vai direto para o checkpoint em disco, não fica na memória
+        self.checkpoint.append_report(rifa, report)
+        self.completed_tokens.add(token)
+        self.report_processed()
+    
+    def report_processed(self):
+        """Mais um relatório concluído (com ou sem dados)"""
+        self.reports_done += 1
+        self.report_progress('relatorios', atual=self.reports_done, total=self.reports_total)
+    
+    def resume_from_checkpoint(self):
+        """Carrega lista de rifas e relatórios concluídos de uma captura interrompida"""
+        rifas, done = self.checkpoint.load()
+        if not rifas:
+            self.log("ℹ️ Nenhum checkpoint para retomar, iniciando captura nova")
+            return False
+        
+        self.rifas_data = rifas
+        self.completed_tokens = done
+        self.log(f"⏯️ Retomando captura: {len(done)}/{len(rifas)} relatórios já concluídos")
+        return True
+    
+    def prepare_hot_refresh(self):
+        """Parte da última captura e deixa pendentes só as rifas quentes
+
+        As demais rifas ficam marcadas como concluídas, então
+        capture_all_reports só busca as rifas ativas que venderam nos últimos
+        `hot_recent_days` dias. Os relatórios buscados vão para um checkpoint
+        próprio (o da varredura completa, retomável com --resume, fica
+        intacto) e save_hot_refresh os grava na própria última captura.
+        """
+        if self.history:
+            entry = self.history.latest()
+            data = copy.deepcopy(self.history.rebuild()) if entry else None
+            self.hot_target = entry['id'] if entry else None
+        else:
+            self.hot_target = latest_capture_file(self.data_dir)
+            data = None
+            if self.hot_target:
+                with open(self.hot_target, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+        
+        if not data:
+            self.log("ℹ️ Nenhuma captura anterior: a camada quente espera a varredura completa")
+            return False
+        
+        recent_days = self.config.get('automation', {}).get('hot_recent_days', 1)
+        hot = set(hot_tokens(data, recent_days))
+        if not hot:
+            self.log(f"ℹ️ Nenhuma rifa ativa com vendas nos últimos {recent_days} dia(s)")
+            return False
+        
+        self.hot_base = data
+        self.rifas_data = data.get('rifas', [])
+        self.hot_pending = [r.get('data_token') for r in self.rifas_data if r.get('data_token') in hot]
+        self.completed_tokens = {r.get('data_token') for r in self.rifas_data} - hot
+        
+        self.checkpoint = CaptureCheckpoint(Path('data/checkpoints/camada_quente.ndjson'), account=self.checkpoint.account)
+        self.checkpoint.start(self.rifas_data)
+        
+        self.log(f"🔥 Camada quente: atualizando {len(hot)} de {len(self.rifas_data)} rifas")
+        return True
+    
+    def save_hot_refresh(self):
+        """Grava os relatórios quentes na última captura, no lugar (sem snapshot novo)"""
         timestamp = datetime.now()
+        data = self.hot_base
         
-        # Calcula resumo geral
+        reports = data.setdefault('relatorios_detalhados', {})
+        reports.update(self.checkpoint.iter_reports(self.hot_pending))
+        
+        resumo = self.build_summary()
+        data['resumo_geral'] = resumo
+        captura = data.setdefault('captura', {})
+        captura['atualizado_em'] = timestamp.isoformat()
+        captura['atualizacoes_quentes'] = captura.get('atualizacoes_quentes', 0) + 1
+        
+        if self.history:
+            entry = self.history.replace_latest(data)
+            filepath = self.history.history_dir / entry['arquivo']
+            history_id = entry['id']
+        else:
+            filepath = Path(self.hot_target)
+            tmp_file = filepath.with_suffix('.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            tmp_file.replace(filepath)
+            history_id = None
+        
+        update_latest(self.data_dir, filepath, captura, resumo, history_id=history_id, new_file=False)
+        self.log(f"\n🔥 Última captura atualizada pela camada quente: {filepath}")
+        return filepath
+    
+    def build_summary(self):
+        """Resumo geral a partir dos totais das rifas"""
         resumo = {
             'total_rifas': len(self.rifas_data),
             'rifas_ativas': len([r for r in self.rifas_data if r.get('status') == 'Ativo']),
@@ -579,29 +1188,50 @@ class ImperioCapturaCorrected:
         
         if resumo['titulos_total'] > 0:
             resumo['ticket_medio_geral'] = resumo['arrecadado_total'] / resumo['titulos_total']
+        return resumo
+    
+    def save_data(self):
+        """Salva todos os dados capturados"""
+        timestamp = datetime.now()
+        
+        # Calcula resumo geral
+        resumo = self.build_summary()
         
-        # Estrutura completa
-        data = {
+        # Estrutura completa (relatórios vêm do checkpoint, um por vez)
+        head = {
             'captura': {
                 'timestamp': timestamp.isoformat(),
                 'timestamp_unix': timestamp.timestamp(),
                 'data': timestamp.strftime('%Y-%m-%d'),
                 'hora': timestamp.strftime('%H:%M:%S'),
-                'versao': 'corrected_1.0'
+                'versao': 'corrected_1.0',
+                'camada': self.tier,
+                'metricas': self.metrics
             },
             'resumo_geral': resumo,
-            'rifas': self.rifas_data,
-            'relatorios_detalhados': self.detailed_reports
+            'rifas': self.rifas_data
         }
         
-        # Salva arquivo principal
-        filename = f"captura_{timestamp.strftime('%Y%m%d_%H%M%S')}.json"
-        filepath = self.data_dir / filename
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        tokens = [r.get('data_token') for r in self.rifas_data]
         
-        self.log(f"\n💾 Dados salvos em: {filepath}")
+        if self.history:
+            # Modo delta: só o que mudou desde a captura anterior (base periódica)
+            entry = self.history.append(
+                head, timestamp.strftime('%Y%m%d_%H%M%S'),
+                reports=self.checkpoint.iter_reports(tokens)
+            )
+            self.saved_capture = entry['id']
+            filepath = self.history.history_dir / entry['arquivo']
+            self.log(f"\n💾 Captura gravada no histórico ({entry['tipo']}): {filepath}")
+        else:
+            # Salva arquivo principal
+            filename = f"captura_{timestamp.strftime('%Y%m%d_%H%M%S')}.json"
+            filepath = self.data_dir / filename
+            
+            self.checkpoint.write_capture(filepath, head, tokens)
+            self.saved_capture = filepath
+            
+            self.log(f"\n💾 Dados salvos em: {filepath}")
         
         # Salva resumo simplificado
         summary_filename = f"resumo_{timestamp.strftime('%Y%m%d_%H%M%S')}.json"
@@ -610,11 +1240,11 @@ class ImperioCapturaCorrected:
         summary_data = {
             'timestamp': timestamp.isoformat(),
             'resumo': resumo,
-            'top_rifas': sorted(
-                [r for r in self.rifas_data if r.get('arrecadado_total', 0) > 0],
-                key=lambda x: x.get('arrecadado_total', 0),
-                reverse=True
-            )[:10]
+            'top_rifas': heapq.nlargest(
+                10,
+                (r for r in self.rifas_data if r.get('arrecadado_total', 0) > 0),
+                key=lambda x: x.get('arrecadado_total', 0)
+            )
         }
         
         with open(summary_filepath, 'w', encoding='utf-8') as f:
@@ -622,8 +1252,71 @@ class ImperioCapturaCorrected:
         
         self.log(f"📊 Resumo salvo em: {summary_filepath}")
         
+        update_latest(
+            self.data_dir, filepath, head['captura'], resumo, summary_filepath,
+            history_id=timestamp.strftime('%Y%m%d_%H%M%S') if self.history else None
+        )
+        
         return filepath
     
+    def log_wait_summary(self):
+        """Registra nas métricas o tempo gasto em esperas e o economizado"""
+        summary = self.waiter.summary()
+        self.metrics['esperas'] = summary
+        
+        self.log(
+            f"\n⏱️ Esperas: {summary['tempo_esperado_s']:.1f}s em {summary['total_esperas']} páginas "
+            f"(sleeps fixos somariam {summary['tempo_fixo_anterior_s']:.1f}s) | "
+            f"economia: {summary['tempo_economizado_s']:.1f}s"
+        )
+        return summary
+    
+    def log_change_summary(self):
+        """Registra quantas tabelas foram parseadas e quantas foram reaproveitadas"""
+        summary = self.change_stats.summary()
+        if not summary['parseados'] and not summary['parse_evitado']:
+            return None
+        
+        self.metrics['deteccao_mudancas'] = summary
+        self.log(
+            f"🧮 Parsing: {summary['parseados']} tabelas parseadas | "
+            f"{summary['parse_evitado']} evitadas ({summary['hash_igual']} hash igual, "
+            f"{summary['nao_modificado']} HTTP 304)"
+        )
+        return summary
+    
+    def log_adaptive_summary(self):
+        """Registra nas métricas os ajustes do controle adaptativo"""
+        if not self.controller:
+            return None
+        
+        summary = self.controller.summary()
+        self.metrics['controle_adaptativo'] = summary
+        
+        congestion = {k: v for k, v in summary['eventos'].items() if k != 'ok'}
+        self.log(
+            f"🎚️ Ritmo adaptativo: {summary['concorrencia_final']} em paralelo, "
+            f"{summary['taxa_final_rps']} req/s | {summary['aumentos']} aumentos, "
+            f"{summary['reducoes']} reduções | eventos: {congestion or 'nenhum'}"
+        )
+        return summary
+    
+    def log_browser_summary(self):
+        """Registra bytes/tempo por página do perfil usado e o histórico por perfil"""
+        summary = self.page_stats.summary()
+        if not summary['paginas']:
+            return None
+        
+        self.metrics['navegador'] = summary
+        self.profile_history.add(self.page_stats)
+        
+        self.log(
+            f"🌐 Navegador ({summary['perfil']}): {summary['paginas']} páginas | "
+            f"{summary['bytes_por_pagina'] / 1024:.1f} KB/página | "
+            f"{summary['load_ms_medio']:.0f} ms/página"
+        )
+        return summary
+    
     def display_summary(self):
         """Exibe resumo dos dados capturados"""
         print("\n" + "="*80)
@@ -663,9 +1356,51 @@ class ImperioCapturaCorrected:
                 print(f"      Arrecadado: R$ {rifa.get('arrecadado_total', 0):,.2f}")
                 print(f"      Vendas: {rifa.get('vendas_total', 0):,}")
                 print(f"      Status: {rifa.get('status', 'Desconhecido')}")
+        
+        # Tabelas de relatório que não precisaram ser parseadas
+        changes = self.metrics.get('deteccao_mudancas')
+        if changes:
+            print(f"\n🧮 PARSING DOS RELATÓRIOS:")
+            print(f"   Parseados: {changes['parseados']}")
+            print(f"   Sem mudança (hash igual): {changes['hash_igual']}")
+            print(f"   Não modificados (HTTP 304): {changes['nao_modificado']}")
+        
+        # Comparação entre perfis do navegador (antes/depois do perfil scrape)
+        profiles = self.profile_history.comparison()
+        if profiles:
+            print(f"\n🌐 CARREGAMENTO POR PERFIL DO NAVEGADOR:")
+            for profile, stats in profiles.items():
+                marker = ' (atual)' if profile == self.page_stats.profile else ''
+                print(
+                    f"   {profile}{marker}: {stats['bytes_por_pagina'] / 1024:.1f} KB/página, "
+                    f"{stats['load_ms_medio']:.0f} ms/página em {stats['capturas']} capturas"
+                )
+    
+    def run(self, headless=False, capture_details=True, keep_driver=False, resume=False, tier='completa'):
+        """Executa captura completa
+
+        Com keep_driver=True o navegador não é fechado no fim, para ser
+        reaproveitado pela próxima captura (worker do modo daemon). Com
+        resume=True continua a captura interrompida a partir do checkpoint.
+        
+        Uma captura por vez entre processos (agendador, servidor web, CLI):
+        se já houver uma em andamento, espera por ela e retorna o mesmo
+        arquivo, com self.attached = True. Com tier='quente' só os
+        relatórios das rifas ativas com vendas recentes são atualizados.
+        """
+        self.tier = tier
+        try:
+            result, self.attached = self.capture_lock.run(
+                lambda: self.run_exclusive(headless, capture_details, keep_driver, resume),
+                on_wait=lambda state: self.report_progress('aguardando_outra_captura')
+            )
+        except CaptureCancelled:
+            self.log("\n⏹️ Captura cancelada")
+            return None
+        return Path(result) if result else None
     
-    def run(self, headless=False, capture_details=True):
-        """Executa captura completa"""
+    def run_exclusive(self, headless=False, capture_details=True, keep_driver=False, resume=False):
+        """Captura completa já com a trava de captura única em mãos"""
         print("\n🎰 SISTEMA DE CAPTURA CORRIGIDO - IMPÉRIO RAPIDINHAS")
         print("="*80)
         print("📌 Fluxo correto:")
@@ -674,15 +1409,40 @@ class ImperioCapturaCorrected:
         print("="*80)
         
         try:
-            # Setup
-            self.setup_driver(headless)
+            self.headless = headless
+            self.report_progress('login')
+            
+            # Sessão salva ainda válida dispensa o login (e o Chrome, no modo HTTP)
+            if not self.restore_session() and not self.http_login():
+                # Setup
+                if not self.driver:
+                    self.setup_driver(headless)
+                
+                # Login
+                if not self.login():
+                    raise Exception("Falha no login")
+                
+                self.save_session()
+                
+                # Motor HTTP reaproveita a sessão autenticada
+                self.setup_http_engine()
             
-            # Login
-            if not self.login():
-                raise Exception("Falha no login")
+            self.metrics['sessao'] = self.session_store.stats()
             
-            # ETAPA 1: Captura lista de rifas
-            rifas = self.capture_rifas_list()
+            # ETAPA 1: Captura lista de rifas (ou retoma a do checkpoint)
+            if self.tier == 'quente':
+                # Camada quente: lista e relatórios frios vêm da última captura
+                if not self.prepare_hot_refresh():
+                    # Nada a fazer não é falha: o navegador quente continua
+                    self.skipped = True
+                    return None
+                rifas = self.rifas_data
+            elif resume and self.resume_from_checkpoint():
+                rifas = self.rifas_data
+            else:
+                rifas = self.capture_rifas_list()
+                if rifas:
+                    self.checkpoint.start(rifas)
             
             if not rifas:
                 self.log("\n⚠️ Nenhuma rifa foi capturada!")
@@ -698,8 +1458,16 @@ class ImperioCapturaCorrected:
             else:
                 self.log("\n⚠️ Captura de detalhes desativada")
             
+            # Instrumentação das esperas e do carregamento das páginas
+            self.log_wait_summary()
+            self.log_browser_summary()
+            self.log_adaptive_summary()
+            self.log_change_summary()
+            
             # Salva resultados
-            filepath = self.save_data()
+            self.report_progress('salvando')
+            filepath = self.save_hot_refresh() if self.tier == 'quente' else self.save_data()
+            self.checkpoint.clear()
             
             # Exibe resumo
             self.display_summary()
@@ -708,16 +1476,29 @@ class ImperioCapturaCorrected:
             
             return filepath
             
+        except CaptureCancelled:
+            self.log("\n⏹️ Captura cancelada")
+            if self.checkpoint.exists() and self.tier != 'quente':
+                self.log("💡 Progresso salvo no checkpoint: rode com --resume para continuar")
+            return None
+            
         except Exception as e:
             self.log(f"\n❌ Erro durante captura: {e}")
             import traceback
             traceback.print_exc()
+            if self.checkpoint.exists() and self.tier != 'quente':
+                self.log("💡 Progresso salvo no checkpoint: rode com --resume para continuar")
             return None
             
         finally:
-            if self.driver:
+            self.checkpoint.close()
+            if self.http:
+                self.http.close()
+            
+            if self.driver and not keep_driver:
                 self.log("\n🔚 Fechando navegador...")
                 self.driver.quit()
+                self.driver = None
 
 def main():
     """Função principal"""
@@ -726,8 +1507,9 @@ def main():
     # Verifica argumentos
     headless = '--headless' in sys.argv
     no_details = '--no-details' in sys.argv
+    resume = '--resume' in sys.argv
     
-    capture.run(headless=headless, capture_details=not no_details)
+    capture.run(headless=headless, capture_details=not no_details, resume=resume)
     
     if not headless:
         input("\nPressione ENTER para fechar...")
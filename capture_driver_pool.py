@@ -0,0 +1,187 @@
+"""
+Pool de Navegadores - Império Rapidinhas
+Vários WebDrivers em paralelo compartilhando a sessão de um único login,
+com verificação de saúde e reciclagem de drivers travados
+"""
+import queue
+import threading
+import time
+
+
+def seed_cookies(driver, base_url, cookies):
+    """Injeta cookies (formato do Selenium) em um driver ainda não autenticado"""
+    # Cookies só podem ser adicionados estando no domínio
+    driver.get(base_url)
+    driver.delete_all_cookies()
+
+    for cookie in cookies:
+        cookie = {k: v for k, v in cookie.items() if k in ('name', 'value', 'path', 'domain', 'secure', 'httpOnly', 'expiry')}
+        if 'expiry' in cookie:
+            cookie['expiry'] = int(cookie['expiry'])
+        try:
+            driver.add_cookie(cookie)
+        except Exception:
+            cookie.pop('domain', None)
+            driver.add_cookie(cookie)
+
+
+class DriverSlot:
+    """Um WebDriver do pool e o estado da tarefa em execução"""
+
+    def __init__(self, index, driver, owned=True):
+        self.index = index
+        self.driver = driver
+        self.owned = owned
+        self.task_started = None
+        self.tasks_done = 0
+        self.recycled = 0
+        self.lock = threading.Lock()
+
+
+class WebDriverPool:
+    """Distribui tarefas entre N WebDrivers autenticados pelos mesmos cookies
+
+    O driver principal (que fez login) entra como slot 0; os demais são
+    criados pela `driver_factory` e recebem os cookies dele. Um watchdog
+    encerra drivers cuja tarefa passa de `task_timeout`, o que destrava a
+    thread e faz o slot ser reciclado.
+    """
+
+    def __init__(self, driver_factory, base_url, size=2, task_timeout=90, log=None):
+        self.driver_factory = driver_factory
+        self.base_url = base_url.rstrip('/')
+        self.size = max(1, int(size))
+        self.task_timeout = task_timeout
+        self.log = log or print
+        self.cookies = []
+        self.slots = []
+        self.stopping = threading.Event()
+        self.watchdog = None
+
+    def start(self, primary_driver):
+        """Cria os drivers extras semeados com os cookies do driver principal"""
+        self.cookies = primary_driver.get_cookies()
+        self.slots = [DriverSlot(0, primary_driver, owned=False)]
+
+        for index in range(1, self.size):
+            try:
+                self.slots.append(DriverSlot(index, self.new_driver()))
+            except Exception as e:
+                self.log(f"⚠️ Navegador {index + 1} não iniciou: {e}")
+
+        self.log(f"🧭 Pool com {len(self.slots)} navegadores")
+
+        self.watchdog = threading.Thread(target=self.watch, daemon=True)
+        self.watchdog.start()
+        return self
+
+    def new_driver(self):
+        """Cria um WebDriver e injeta os cookies da sessão autenticada"""
+        driver = self.driver_factory()
+        self.seed(driver)
+        return driver
+
+    def seed(self, driver):
+        """Aplica os cookies do login em um driver novo"""
+        seed_cookies(driver, self.base_url, self.cookies)
+
+    def is_healthy(self, slot):
+        """Verifica se o driver ainda responde"""
+        try:
+            slot.driver.execute_script('return document.readyState')
+            return True
+        except Exception:
+            return False
+
+    def recycle(self, slot):
+        """Encerra o driver do slot e coloca um novo, já autenticado"""
+        self.log(f"♻️ Reciclando navegador {slot.index + 1}...")
+        try:
+            slot.driver.quit()
+        except Exception:
+            pass
+
+        slot.driver = self.new_driver()
+        slot.owned = True
+        slot.recycled += 1
+
+    def watch(self):
+        """Watchdog: derruba drivers presos além do task_timeout"""
+        while not self.stopping.wait(1):
+            now = time.monotonic()
+            for slot in self.slots:
+                started = slot.task_started
+                if started is not None and now - started > self.task_timeout:
+                    self.log(f"⏱️ Navegador {slot.index + 1} travado há {now - started:.0f}s, encerrando...")
+                    slot.task_started = None
+                    try:
+                        slot.driver.quit()
+                    except Exception:
+                        pass
+
+    def run_task(self, slot, func, item):
+        """Executa uma tarefa registrando o início para o watchdog"""
+        slot.task_started = time.monotonic()
+        try:
+            return func(slot.driver, item)
+        except Exception as e:
+            self.log(f"⚠️ Navegador {slot.index + 1}: {e}")
+            return None
+        finally:
+            slot.task_started = None
+            slot.tasks_done += 1
+
+    def worker(self, slot, tasks, results, func):
+        while True:
+            try:
+                position, item = tasks.get_nowait()
+            except queue.Empty:
+                return
+
+            result = self.run_task(slot, func, item)
+
+            # Falhou e o driver não responde: recicla e tenta mais uma vez
+            if result is None and not self.is_healthy(slot):
+                try:
+                    self.recycle(slot)
+                    result = self.run_task(slot, func, item)
+                except Exception as e:
+                    self.log(f"❌ Não foi possível reciclar navegador {slot.index + 1}: {e}")
+                    results[position] = None
+                    # Devolve as tarefas restantes aos outros slots
+                    return
+
+            results[position] = result
+
+    def map(self, func, items):
+        """Executa func(driver, item) para cada item, em paralelo no pool
+
+        Retorna os resultados na mesma ordem dos itens (None quando falhou).
+        """
+        tasks = queue.Queue()
+        for position, item in enumerate(items):
+            tasks.put((position, item))
+
+        results = [None] * len(items)
+        threads = [
+            threading.Thread(target=self.worker, args=(slot, tasks, results, func), daemon=True)
+            for slot in self.slots
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return results
+
+    def close(self):
+        """Encerra os drivers criados pelo pool e devolve o driver do slot 0"""
+        self.stopping.set()
+
+        for slot in self.slots[1:]:
+            try:
+                slot.driver.quit()
+            except Exception:
+                pass
+
+        return self.slots[0].driver if self.slots else None
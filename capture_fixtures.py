@@ -0,0 +1,106 @@
+"""
+Fixtures de HTML da captura - Império Rapidinhas
+Grava páginas reais da lista de rifas e dos relatórios para reproduzir o
+parsing offline (benchmarks/bench_capture_parse.py), sem login no painel
+"""
+import json
+import os
+import time
+from pathlib import Path
+
+MANIFEST_FILE = 'manifest.json'
+KINDS = ('lista', 'relatorio')
+
+
+class FixtureRecorder:
+    """Salva HTML por tipo de página com um manifest (URL, tamanho, data)"""
+
+    def __init__(self, fixtures_dir='data/fixtures'):
+        self.fixtures_dir = Path(fixtures_dir)
+        self.manifest = load_manifest(self.fixtures_dir)
+
+    def record(self, kind, url, html, **meta):
+        """Grava uma página; `kind` é 'lista' ou 'relatorio'"""
+        if kind not in KINDS:
+            raise ValueError(f"Tipo de fixture inválido: {kind}")
+
+        count = sum(1 for f in self.manifest['fixtures'] if f['tipo'] == kind)
+        filename = f"{kind}/{kind}_{count + 1:03d}.html"
+        path = self.fixtures_dir / filename
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(html)
+
+        entry = dict(meta, tipo=kind, arquivo=filename, url=url, bytes=len(html.encode('utf-8')), gravado=time.time())
+        self.manifest['fixtures'].append(entry)
+        self.save()
+        return path
+
+    def save(self):
+        self.fixtures_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.fixtures_dir / (MANIFEST_FILE + '.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, self.fixtures_dir / MANIFEST_FILE)
+
+
+def load_manifest(fixtures_dir):
+    manifest_file = Path(fixtures_dir) / MANIFEST_FILE
+    if not manifest_file.exists():
+        return {'fixtures': []}
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_fixtures(fixtures_dir, kind=None):
+    """Lista de (entrada do manifest, HTML) gravados, opcionalmente por tipo"""
+    fixtures_dir = Path(fixtures_dir)
+    fixtures = []
+    for entry in load_manifest(fixtures_dir)['fixtures']:
+        if kind and entry['tipo'] != kind:
+            continue
+        with open(fixtures_dir / entry['arquivo'], 'r', encoding='utf-8') as f:
+            fixtures.append((entry, f.read()))
+    return fixtures
+
+
+def money_text(cents):
+    """Valor no formato do painel: 'R$ 1.234,56'"""
+    reais = f"{cents // 100:,}".replace(',', '.')
+    return f"R$ {reais},{cents % 100:02d}"
+
+
+def synthetic_list_page(start, count, pagination=''):
+    """HTML de uma página da lista no layout do painel (checkbox + data-token)"""
+    rows = []
+    for i in range(start, start + count):
+        status = 'Ativo' if i % 5 == 0 else 'Finalizado'
+        rows.append(
+            f'<tr><td><input type="checkbox" name="rifa[]" value="{i}" data-token="tok{i:06d}"></td>'
+            f'<td>#{10000 + i}</td><td>{i}º RAPIDINHA R$ 1.000,00</td><td>{status}</td></tr>'
+        )
+    return (
+        '<html><body><form name="form_rifas"><table class="table"><thead><tr>'
+        '<th></th><th>ID</th><th>Título</th><th>Status</th></tr></thead><tbody>'
+        + ''.join(rows) + f'</tbody></table></form>{pagination}</body></html>'
+    )
+
+
+def synthetic_report_page(title, days, seed=0):
+    """HTML de um relatório com a tabela de vendas diária"""
+    rows = []
+    for day in range(days):
+        value = (seed * 7919 + day * 104729) % 10 ** 7
+        vendas = (seed + day * 31) % 400
+        titulos = vendas * 3
+        rows.append(
+            f'<tr><td>{day % 28 + 1:02d}/{day // 28 % 12 + 1:02d}/2025</td><td>{money_text(value // max(titulos, 1))}</td>'
+            f'<td>{vendas}</td><td>{titulos} {day % 100}%</td><td>{money_text(value)}</td></tr>'
+        )
+    return (
+        f'<html><body><ol class="breadcrumb"><li>Home</li><li>Rifas</li><li>{title}</li></ol>'
+        '<table class="table"><thead><tr><th>Data</th><th>Tícket médio</th><th>Vendas</th>'
+        '<th>Qtd. títulos</th><th>Total</th></tr></thead><tbody>' + ''.join(rows)
+        + f'</tbody><tfoot><tr><td colspan="5">Recusadas: {seed % 7}</td></tr></tfoot></table></body></html>'
+    )
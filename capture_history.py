@@ -0,0 +1,380 @@
+"""
+Histórico de capturas com deltas - Império Rapidinhas
+Em vez de repetir a lista inteira e todas as tabelas a cada captura, grava
+uma base completa de tempos em tempos e, entre uma base e outra, só o que
+mudou em cada rifa (linhas novas, totais alterados, mudança de status) em
+relação à captura anterior. rebuild() remonta qualquer captura do histórico.
+"""
+import json
+import os
+import time
+from pathlib import Path
+
+INDEX_FILE = 'index.json'
+
+# Campos da rifa que mudam a cada captura sem que os dados mudem; vão uma vez
+# por delta (valor mais comum + exceções), fora do diff de cada rifa
+VOLATILE_FIELDS = ('timestamp_captura',)
+
+# Posição da rifa na lista (1, 2, ...): muda para todas quando entra uma rifa
+# nova no topo, então sai da ordem do delta; só as exceções são gravadas
+POSITION_FIELD = 'index'
+
+
+def rifa_key(rifa):
+    """Chave estável da rifa entre capturas"""
+    return rifa.get('data_token') or f"#{rifa.get('checkbox_value') or rifa.get('index')}"
+
+
+def diff_fields(old, new, skip=()):
+    """Campos alterados/novos e campos removidos entre dois dicts"""
+    changed = {k: v for k, v in new.items() if k not in skip and old.get(k, object()) != v}
+    removed = [k for k in old if k not in skip and k not in new]
+    return changed, removed
+
+
+def apply_fields(target, changed, removed):
+    target.update(changed)
+    for key in removed:
+        target.pop(key, None)
+    return target
+
+
+def diff_report(old, new):
+    """Delta de um relatório: campos do topo + linhas a partir da 1ª divergente
+
+    A tabela diária só cresce no fim (e o último dia muda enquanto a rifa
+    está ativa), então basta guardar o prefixo comum e as linhas seguintes.
+    """
+    if old is None:
+        return {'completo': new}
+
+    changed, removed = diff_fields(old, new, skip=('dados_tabela',))
+    old_rows = old.get('dados_tabela', [])
+    new_rows = new.get('dados_tabela', [])
+
+    common = 0
+    for old_row, new_row in zip(old_rows, new_rows):
+        if old_row != new_row:
+            break
+        common += 1
+
+    delta = {}
+    if changed:
+        delta['campos'] = changed
+    if removed:
+        delta['removidos'] = removed
+    if common != len(old_rows) or common != len(new_rows):
+        delta['linhas_desde'] = common
+        delta['linhas'] = new_rows[common:]
+    return delta
+
+
+def diff_volatile(rifas, skip_keys=()):
+    """Campos voláteis das rifas: valor mais comum de cada um e as exceções"""
+    volatile = {}
+    for field in VOLATILE_FIELDS:
+        values = {rifa_key(r): r[field] for r in rifas if field in r and rifa_key(r) not in skip_keys}
+        counts = {}
+        for value in values.values():
+            counts[value] = counts.get(value, 0) + 1
+        common = max(counts, key=counts.get) if counts else None
+
+        volatile[field] = {
+            'valor': common,
+            'excecoes': {key: value for key, value in values.items() if value != common},
+            'ausentes': [rifa_key(r) for r in rifas if field not in r and rifa_key(r) not in skip_keys]
+        }
+    return volatile
+
+
+def apply_volatile(rifa, key, volatile):
+    for field, change in volatile.items():
+        if key in change['ausentes']:
+            rifa.pop(field, None)
+        else:
+            rifa[field] = change['excecoes'].get(key, change['valor'])
+    return rifa
+
+
+def diff_positions(rifas, skip_keys=()):
+    """'index' das rifas que não batem com a posição na lista (None = sem index)"""
+    return {
+        rifa_key(r): r.get(POSITION_FIELD)
+        for position, r in enumerate(rifas, 1)
+        if rifa_key(r) not in skip_keys and r.get(POSITION_FIELD) != position
+    }
+
+
+def apply_position(rifa, key, position, positions):
+    index = positions.get(key, position)
+    if index is None:
+        rifa.pop(POSITION_FIELD, None)
+    else:
+        rifa[POSITION_FIELD] = index
+    return rifa
+
+
+def apply_report(old, delta):
+    if 'completo' in delta:
+        return delta['completo']
+
+    report = dict(old)
+    apply_fields(report, delta.get('campos', {}), delta.get('removidos', []))
+    if 'linhas_desde' in delta:
+        report['dados_tabela'] = old.get('dados_tabela', [])[:delta['linhas_desde']] + delta['linhas']
+    return report
+
+
+class CaptureHistory:
+    """Base periódica + deltas encadeados, com índice em data/history/index.json"""
+
+    def __init__(self, history_dir='data/history', base_every=24):
+        self.history_dir = Path(history_dir)
+        self.base_every = max(1, int(base_every))
+        self.index_file = self.history_dir / INDEX_FILE
+        self.entries = self.load_index()
+        self._state_id = None
+        self._state = None
+
+    def load_index(self):
+        if not self.index_file.exists():
+            return []
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get('capturas', [])
+        except Exception:
+            return []
+
+    def write_json(self, path, data):
+        """Gravação atômica (arquivo temporário + rename); retorna o JSON gravado"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = path.with_suffix('.tmp')
+        text = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_file, path)
+        return text
+
+    def write_json_stream(self, path, head, key, items, tail=None):
+        """Como write_json, mas o objeto `key` sai de `items` ((chave, valor)) um por vez
+
+        `tail` é gravado depois de `items` ser consumido (pode ser preenchido
+        durante a iteração).
+        """
+        def dumps(value):
+            return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = path.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write('{')
+            for name, value in head.items():
+                f.write(f'{dumps(name)}:{dumps(value)},')
+            f.write(f'{dumps(key)}:{{')
+            for i, (name, value) in enumerate(items):
+                f.write(f'{"," if i else ""}{dumps(name)}:{dumps(value)}')
+            f.write('}')
+            for name, value in (tail or {}).items():
+                f.write(f',{dumps(name)}:{dumps(value)}')
+            f.write('}')
+        os.replace(tmp_file, path)
+
+    def read_json(self, name):
+        with open(self.history_dir / name, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def deltas_since_base(self):
+        count = 0
+        for entry in reversed(self.entries):
+            if entry['tipo'] == 'base':
+                return count
+            count += 1
+        return None
+
+    def append(self, data, capture_id=None, reports=None):
+        """Grava uma captura (dict completo, formato do captura_*.json)
+
+        `reports` ((token, relatório), ex.: CaptureCheckpoint.iter_reports)
+        substitui data['relatorios_detalhados']: os relatórios são gravados
+        (ou comparados com a captura anterior) um por vez, sem montar o dict
+        inteiro. Retorna a entrada do índice. Vira base quando não há base
+        ou quando a última já acumulou `base_every` deltas.
+        """
+        capture_id = capture_id or time.strftime('%Y%m%d_%H%M%S')
+        since_base = self.deltas_since_base()
+        previous = self.entries[-1] if self.entries else None
+
+        head = {k: v for k, v in data.items() if k != 'relatorios_detalhados'}
+        if reports is None:
+            reports = data.get('relatorios_detalhados', {}).items()
+
+        if previous is None or since_base is None or since_base + 1 >= self.base_every:
+            kind = 'base'
+            filename = f"base_{capture_id}.json"
+            self.write_json_stream(self.history_dir / filename, head, 'relatorios_detalhados', reports)
+        else:
+            kind = 'delta'
+            filename = f"delta_{capture_id}.json"
+            old = self.rebuild(previous['id'])
+            order = []
+            self.write_json_stream(
+                self.history_dir / filename, self.diff_head(old, head), 'relatorios',
+                self.diff_reports(old.get('relatorios_detalhados', {}), reports, order),
+                tail={'ordem_relatorios': order}
+            )
+
+        entry = {
+            'id': capture_id,
+            'tipo': kind,
+            'arquivo': filename,
+            'timestamp': data.get('captura', {}).get('timestamp'),
+            'timestamp_unix': data.get('captura', {}).get('timestamp_unix', time.time()),
+            'total_rifas': data.get('resumo_geral', {}).get('total_rifas', 0),
+            'arrecadado_total': data.get('resumo_geral', {}).get('arrecadado_total', 0)
+        }
+        self.entries.append(entry)
+        self.write_json(self.index_file, {'updated': time.time(), 'capturas': self.entries})
+        return entry
+
+    def replace_latest(self, data):
+        """Regrava a captura mais recente (mesmo id e tipo) com `data` atualizado
+
+        Usado pela camada quente, que atualiza a última captura em vez de
+        gravar uma nova. Retorna a entrada do índice.
+        """
+        entry = self.entries.pop()
+        self._state_id, self._state = None, None
+        try:
+            replaced = self.append(data, entry['id'])
+        except Exception:
+            self.entries.append(entry)
+            raise
+
+        # Virou base (ou delta) com outro nome: o arquivo antigo ficaria órfão
+        if replaced['arquivo'] != entry['arquivo']:
+            (self.history_dir / entry['arquivo']).unlink(missing_ok=True)
+        return replaced
+
+    def diff(self, old, new):
+        """Delta entre duas capturas completas"""
+        delta = self.diff_head(old, new)
+        order = []
+        delta['relatorios'] = dict(
+            self.diff_reports(old.get('relatorios_detalhados', {}), new.get('relatorios_detalhados', {}).items(), order)
+        )
+        delta['ordem_relatorios'] = order
+        return delta
+
+    def diff_head(self, old, new):
+        """Parte do delta fora dos relatórios (captura, resumo, rifas, extras)"""
+        old_rifas = {rifa_key(r): r for r in old.get('rifas', [])}
+
+        rifas = {}
+        for rifa in new.get('rifas', []):
+            key = rifa_key(rifa)
+            if key not in old_rifas:
+                rifas[key] = {'completa': rifa}
+                continue
+            changed, removed = diff_fields(old_rifas[key], rifa, skip=VOLATILE_FIELDS + (POSITION_FIELD,))
+            if changed or removed:
+                rifas[key] = {'campos': changed, 'removidos': removed}
+
+        complete = {k for k, r in rifas.items() if 'completa' in r}
+
+        return {
+            'captura': new.get('captura', {}),
+            'resumo_geral': new.get('resumo_geral', {}),
+            'ordem': [rifa_key(r) for r in new.get('rifas', [])],
+            'rifas': rifas,
+            'volateis': diff_volatile(new.get('rifas', []), skip_keys=complete),
+            'posicoes': diff_positions(new.get('rifas', []), skip_keys=complete),
+            'extras': {k: v for k, v in new.items() if k not in ('captura', 'resumo_geral', 'rifas', 'relatorios_detalhados')}
+        }
+
+    def diff_reports(self, old_reports, reports, order):
+        """(token, delta) dos relatórios alterados, um por vez; `order` recebe todos os tokens"""
+        for token, report in reports:
+            order.append(token)
+            delta = diff_report(old_reports.get(token), report)
+            if delta:
+                yield token, delta
+
+    def apply(self, old, delta):
+        """Aplica um delta sobre a captura anterior"""
+        old_rifas = {rifa_key(r): r for r in old.get('rifas', [])}
+        volatile = delta.get('volateis', {})
+        positions = delta.get('posicoes')
+        rifas = []
+        for position, key in enumerate(delta['ordem'], 1):
+            change = delta['rifas'].get(key)
+            if change and 'completa' in change:
+                rifas.append(change['completa'])
+                continue
+
+            rifa = dict(old_rifas[key])
+            if change:
+                apply_fields(rifa, change['campos'], change['removidos'])
+            if positions is not None:
+                # Deltas antigos, sem 'posicoes', trazem o index nos campos
+                apply_position(rifa, key, position, positions)
+            rifas.append(apply_volatile(rifa, key, volatile))
+
+        old_reports = old.get('relatorios_detalhados', {})
+        reports = {}
+        for token in delta['ordem_relatorios']:
+            change = delta['relatorios'].get(token)
+            reports[token] = apply_report(old_reports.get(token, {}), change) if change else old_reports[token]
+
+        data = {
+            'captura': delta['captura'],
+            'resumo_geral': delta['resumo_geral'],
+            'rifas': rifas,
+            'relatorios_detalhados': reports
+        }
+        data.update(delta.get('extras', {}))
+        return data
+
+    def rebuild(self, capture_id=None):
+        """Remonta a captura `capture_id` (padrão: a mais recente) a partir da base
+
+        O dict retornado é reaproveitado pelo próximo append; não o altere.
+        """
+        if not self.entries:
+            return None
+
+        position = len(self.entries) - 1
+        if capture_id is not None:
+            position = next((i for i, e in enumerate(self.entries) if e['id'] == capture_id), None)
+            if position is None:
+                raise KeyError(capture_id)
+
+        # Parte da base ou da última captura remontada, se estiver no caminho
+        # (remontar o histórico em ordem, como a ingestão faz, fica linear)
+        start = position
+        data = None
+        while data is None:
+            entry = self.entries[start]
+            if entry['id'] == self._state_id:
+                data = self._state
+            elif entry['tipo'] == 'base':
+                data = self.read_json(entry['arquivo'])
+            else:
+                start -= 1
+
+        for entry in self.entries[start + 1:position + 1]:
+            data = self.apply(data, self.read_json(entry['arquivo']))
+
+        self._state_id, self._state = self.entries[position]['id'], data
+        return data
+
+    def at(self, when):
+        """Captura vigente no instante `when` (datetime ou timestamp unix)"""
+        when = when.timestamp() if hasattr(when, 'timestamp') else when
+        candidates = [e for e in self.entries if e.get('timestamp_unix', 0) <= when]
+        if not candidates:
+            return None
+        return self.rebuild(candidates[-1]['id'])
+
+    def latest(self):
+        return self.entries[-1] if self.entries else None
@@ -0,0 +1,473 @@
+"""
+Motor de Captura HTTP - Império Rapidinhas
+Reaproveita a sessão autenticada do navegador em um cliente HTTP com pool de
+conexões e lê o HTML das páginas diretamente, sem renderizar no Chrome
+"""
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urljoin, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup
+
+from capture_cache import table_hash, reuse_report
+from capture_pagination import detect_pagination, page_url
+from capture_parsing import (
+    new_rifa_info, fill_rifa_from_cells, fill_rifa_from_text, title_from_breadcrumb,
+    sales_table, fill_report, new_report
+)
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+TABLE_RE = re.compile(r'<table\b.*?</table>', re.S | re.I)
+
+
+class SessionExpiredError(Exception):
+    """A sessão não é mais válida (servidor redirecionou para /auth)"""
+
+
+class ReportNotRenderedError(Exception):
+    """O HTML não trouxe a tabela de vendas (página depende de JavaScript)"""
+
+
+def cell_text(element):
+    """Texto de uma célula normalizado como o .text do Selenium"""
+    return ' '.join(element.get_text(' ', strip=True).split())
+
+
+def parse_rifas_html(soup, start_index=1, timestamp=None):
+    """Extrai as rifas (checkbox + data-token + colunas) de uma página da lista"""
+    timestamp = timestamp or datetime.now().isoformat()
+    rifas = []
+
+    for checkbox in soup.select("input[type='checkbox'][name='rifa[]']"):
+        rifa_info = new_rifa_info(
+            start_index + len(rifas),
+            checkbox.get('value'),
+            checkbox.get('data-token'),
+            timestamp
+        )
+
+        if not rifa_info['data_token']:
+            continue
+
+        row = checkbox.find_parent('tr')
+        if row is not None:
+            cells = [cell_text(td) for td in row.find_all('td')]
+            fill_rifa_from_cells(rifa_info, cells)
+        else:
+            container = checkbox.find_parent(['tr', 'div'])
+            if container is not None:
+                fill_rifa_from_text(rifa_info, container.get_text(' ', strip=True))
+
+        rifas.append(rifa_info)
+
+    return rifas
+
+
+def fill_title(soup, rifa_info):
+    """Título da rifa pelo breadcrumb, quando a lista não trouxe"""
+    if not rifa_info.get('titulo'):
+        items = [li.get_text(' ', strip=True) for li in soup.select('.breadcrumb li')]
+        titulo = title_from_breadcrumb(items)
+        if titulo:
+            rifa_info['titulo'] = titulo
+
+
+def extract_tables(soup):
+    """Tabelas da página no mesmo formato do REPORT_TABLES_SCRIPT do Selenium"""
+    tables = []
+    for table in soup.select('table.table'):
+        tbody = table.find('tbody')
+        tfoot = table.find('tfoot')
+        tables.append({
+            'headers': [cell_text(th) for th in table.select('thead th')],
+            'rows': [
+                [cell_text(td) for td in tr.find_all('td')] for tr in tbody.find_all('tr')
+            ] if tbody is not None else [],
+            'footer': tfoot.get_text(' ', strip=True) if tfoot is not None else ''
+        })
+    return tables
+
+
+def report_sales_table(html):
+    """Tabela de vendas do HTML e a árvore DOM da página, se precisou montar
+
+    O resto da página (token CSRF, horário, menus) muda a cada acesso e não
+    entra no hash; só o HTML das tabelas vira árvore DOM. A página inteira
+    só é parseada se a tabela não aparecer nesses trechos.
+    """
+    table = sales_table(extract_tables(BeautifulSoup(''.join(TABLE_RE.findall(html)), 'html.parser')))
+    if table is not None:
+        return table, None
+    soup = BeautifulSoup(html, 'html.parser')
+    return sales_table(extract_tables(soup)), soup
+
+
+def conditional_headers(previous):
+    """If-None-Match/If-Modified-Since a partir dos validadores guardados"""
+    validators = (previous or {}).get('validators') or {}
+    headers = {}
+    if validators.get('etag'):
+        headers['If-None-Match'] = validators['etag']
+    if validators.get('last_modified'):
+        headers['If-Modified-Since'] = validators['last_modified']
+    return headers
+
+
+def response_validators(response):
+    validators = {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified')
+    }
+    return {k: v for k, v in validators.items() if v}
+
+
+def response_event(response):
+    """Classifica a resposta para o controle adaptativo: 'ok', '429' ou '5xx'
+
+    Considera também as tentativas que o Retry do urllib3 já refez.
+    """
+    statuses = [response.status_code]
+    retries = getattr(response.raw, 'retries', None)
+    if retries is not None:
+        statuses.extend(h.status for h in retries.history if h.status)
+
+    if 429 in statuses:
+        return '429'
+    if any(status >= 500 for status in statuses):
+        return '5xx'
+    return 'ok'
+
+
+def retry_error_event(error):
+    """Evento de um RetryError: o status que esgotou as tentativas ('429' ou '5xx')"""
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    match = re.search(r'too many (\d{3}) error responses', str(reason or error))
+    return '429' if match and match.group(1) == '429' else '5xx'
+
+
+class ImperioHttpCapture:
+    """Captura via requests usando os cookies da sessão do navegador"""
+
+    def __init__(self, base_url, timeout=30, pool_size=10, user_agent=None, log=None,
+                 rate_limiter=None, controller=None, change_stats=None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.log = log or print
+        self.rate_limiter = rate_limiter
+        self.controller = controller
+        self.change_stats = change_stats
+        self.validators = {}
+        self.on_page = None
+
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = user_agent or DEFAULT_USER_AGENT
+
+        retry = Retry(
+            total=2,
+            backoff_factor=0.5,
+            status_forcelist=[429, 502, 503, 504],
+            allowed_methods=['GET']
+        )
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def load_cookies(self, cookies):
+        """Copia cookies no formato do Selenium (lista de dicts)"""
+        host = urlparse(self.base_url).hostname
+        for cookie in cookies:
+            self.session.cookies.set(
+                cookie['name'],
+                cookie['value'],
+                domain=cookie.get('domain') or host,
+                path=cookie.get('path', '/')
+            )
+
+    def login(self, username, password):
+        """Login pelo formulário de /auth, sem navegador (capture.http_login)
+
+        Envia os campos ocultos do formulário (token CSRF) junto com as
+        credenciais. Retorna True quando o servidor sai da tela de login.
+        """
+        response = self.session.get(self.url('/auth'), timeout=self.timeout)
+        soup = BeautifulSoup(response.text, 'html.parser')
+
+        field = soup.find('input', {'name': 'username'})
+        form = field.find_parent('form') if field else None
+        if form is None:
+            return '/auth' not in urlparse(response.url).path
+
+        data = {i['name']: i.get('value', '') for i in form.find_all('input') if i.get('name')}
+        data.update(username=username, password=password)
+
+        action = urljoin(response.url, form.get('action') or response.url)
+        response = self.session.post(action, data=data, timeout=self.timeout)
+        return '/auth' not in urlparse(response.url).path
+
+    def export_cookies(self):
+        """Cookies da sessão no formato do Selenium"""
+        cookies = []
+        for cookie in self.session.cookies:
+            entry = {
+                'name': cookie.name,
+                'value': cookie.value,
+                'domain': cookie.domain,
+                'path': cookie.path,
+                'secure': cookie.secure
+            }
+            if cookie.expires:
+                entry['expiry'] = int(cookie.expires)
+            cookies.append(entry)
+        return cookies
+
+    def check_session(self):
+        """Requisição barata para saber se os cookies ainda estão autenticados"""
+        try:
+            response = self.session.get(
+                self.url('/admin/rifas'),
+                timeout=self.timeout,
+                allow_redirects=False,
+                stream=True
+            )
+            response.close()
+        except requests.RequestException:
+            return False
+
+        location = response.headers.get('Location', '')
+        return response.status_code == 200 and '/auth' not in location
+
+    def url(self, path):
+        """Monta URL absoluta a partir de um caminho relativo ao base_url"""
+        return urljoin(self.base_url + '/', path.lstrip('/'))
+
+    def get(self, url, **kwargs):
+        """GET autenticado; levanta SessionExpiredError se cair no /auth"""
+        if self.rate_limiter:
+            self.rate_limiter.acquire(urlparse(url).netloc)
+
+        started = time.monotonic()
+        try:
+            response = self.session.get(url, timeout=self.timeout, **kwargs)
+        except requests.Timeout:
+            self.feedback('timeout')
+            raise
+        except requests.exceptions.RetryError as e:
+            self.feedback(retry_error_event(e))
+            raise
+
+        self.feedback(response_event(response), time.monotonic() - started)
+
+        if '/auth' in urlparse(response.url).path and '/auth' not in urlparse(url).path:
+            raise SessionExpiredError(f"Sessão expirada ao acessar {url}")
+
+        response.raise_for_status()
+        return response
+
+    def feedback(self, event, latency=None):
+        """Informa o controle adaptativo (AIMD) sobre o resultado da requisição"""
+        if self.controller:
+            self.controller.record(event, latency)
+
+    def fetch_soup(self, url):
+        """Baixa a página e devolve o HTML já parseado"""
+        response = self.get(url)
+        return BeautifulSoup(response.text, 'html.parser')
+
+    def find_next_page_url(self, soup, current_url):
+        """Procura o link de próxima página ('Próxima' ou '>') não desabilitado"""
+        for link in soup.find_all('a', href=True):
+            text = link.get_text(strip=True)
+            if 'Próxima' not in text and text not in ('>', '›', '»'):
+                continue
+
+            parent = link.parent
+            if parent is not None and 'disabled' in (parent.get('class') or []):
+                continue
+
+            href = link['href']
+            if href.startswith('#') or href.lower().startswith('javascript'):
+                continue
+
+            return urljoin(current_url, href)
+
+        return None
+
+    def capture_rifas_list(self, max_pages=200, concurrency=4, memory=None, on_page=None):
+        """ETAPA 1 via HTTP: lê a primeira página e busca as demais pelo número
+
+        O padrão de URL e o total de páginas vêm dos links de paginação da
+        primeira página (ou da estratégia lembrada em `memory`); sem padrão
+        identificável, segue os links de "próxima" um a um. `on_page(total)`
+        é chamado a cada página baixada (total de páginas ou None).
+        """
+        self.on_page = on_page
+        first_url = self.url('/admin/rifas')
+        self.log("\n📄 Processando página 1 (HTTP)...")
+
+        soup = self.fetch_soup(first_url)
+        first_page = parse_rifas_html(soup)
+
+        if not first_page:
+            # Lista vazia ou renderizada via JavaScript: deixa o Selenium decidir
+            return []
+
+        self.log(f"✅ Encontradas {len(first_page)} rifas")
+
+        pagination = detect_pagination(soup, first_url)
+        self.page_done(pagination.get('total_pages') if pagination else None)
+        if not pagination and memory and memory.template:
+            pagination = {
+                'strategy': memory.strategy,
+                'template': memory.template_for(self.base_url),
+                'total_pages': None
+            }
+
+        if pagination:
+            total = pagination.get('total_pages') or '?'
+            self.log(f"🔢 Paginação direta ({pagination['strategy']}): {total} páginas")
+            pages = self.fetch_pages_by_number(pagination, first_page, max_pages, concurrency)
+        else:
+            pages = self.follow_next_links(soup, first_url, first_page, max_pages)
+
+        rifas = []
+        seen_tokens = set()
+        for page_rifas in pages:
+            for rifa in page_rifas:
+                if rifa['data_token'] in seen_tokens:
+                    continue
+                seen_tokens.add(rifa['data_token'])
+                rifa['index'] = len(rifas) + 1
+                rifas.append(rifa)
+
+        if memory:
+            if pagination:
+                memory.remember(pagination['strategy'], pagination['template'], len(pages))
+            else:
+                memory.remember('next_link')
+
+        return rifas
+
+    def fetch_list_page(self, url, total_pages=None):
+        """Baixa e parseia uma página da lista"""
+        rifas = parse_rifas_html(self.fetch_soup(url))
+        self.page_done(total_pages)
+        return rifas
+
+    def page_done(self, total_pages=None):
+        if self.on_page:
+            self.on_page(total_pages)
+
+    def fetch_pages_by_number(self, pagination, first_page, max_pages, concurrency):
+        """Busca as páginas 2..N em paralelo; retorna a lista de rifas por página"""
+        template = pagination['template']
+        total_pages = pagination.get('total_pages')
+        pages = [first_page]
+        concurrency = max(1, int(concurrency))
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            if total_pages:
+                last_page = min(total_pages, max_pages)
+                if total_pages > max_pages:
+                    self.log(f"⚠️ Limite de páginas atingido ({max_pages})")
+                urls = [page_url(template, n) for n in range(2, last_page + 1)]
+                pages.extend(executor.map(self.fetch_list_page, urls, [last_page] * len(urls)))
+                return pages
+
+            # Total desconhecido: busca em lotes até uma página vazia ou repetida
+            seen_tokens = {rifa['data_token'] for rifa in first_page}
+            next_page = 2
+
+            while next_page <= max_pages:
+                batch = range(next_page, min(next_page + concurrency, max_pages + 1))
+                results = list(executor.map(self.fetch_list_page, [page_url(template, n) for n in batch]))
+
+                for page_rifas in results:
+                    tokens = {rifa['data_token'] for rifa in page_rifas}
+                    if not tokens or tokens <= seen_tokens:
+                        return pages
+                    seen_tokens |= tokens
+                    pages.append(page_rifas)
+
+                next_page = batch.stop
+
+        return pages
+
+    def follow_next_links(self, soup, url, first_page, max_pages):
+        """Fallback: segue os links de "próxima" página sequencialmente"""
+        pages = [first_page]
+        visited = {url}
+
+        while len(pages) < max_pages:
+            url = self.find_next_page_url(soup, url)
+            if not url or url in visited:
+                break
+            visited.add(url)
+
+            self.log(f"\n📄 Processando página {len(pages) + 1} (HTTP)...")
+            soup = self.fetch_soup(url)
+            page_rifas = parse_rifas_html(soup)
+            if not page_rifas:
+                break
+            self.page_done()
+
+            self.log(f"✅ Encontradas {len(page_rifas)} rifas")
+            pages.append(page_rifas)
+        else:
+            self.log(f"⚠️ Limite de páginas atingido ({max_pages})")
+
+        return pages
+
+    def capture_detailed_report(self, rifa_info, previous=None):
+        """ETAPA 2 via HTTP: baixa e parseia o relatório de uma rifa
+
+        `previous` é a entrada do cache da captura anterior: com ela a
+        requisição é condicional (304 reaproveita o relatório) e, se o hash
+        das tabelas não mudou, o HTML nem chega a ser parseado.
+
+        Levanta exceção quando o HTML não permite extrair a tabela, para que o
+        chamador use o Selenium como fallback.
+        """
+        token = rifa_info.get('data_token')
+        url = self.url(f"/admin/rifas/relatorios/{token}")
+        previous_report = (previous or {}).get('report')
+
+        response = self.get(url, headers=conditional_headers(previous) if previous_report else None)
+
+        if response.status_code == 304 and previous_report:
+            self.count_change('nao_modificado')
+            self.validators[token] = previous.get('validators')
+            return reuse_report(previous_report, rifa_info, url)
+
+        self.validators[token] = response_validators(response)
+        table, soup = report_sales_table(response.text)
+        if table is None:
+            raise ReportNotRenderedError(f"Tabela de vendas ausente no HTML de {url}")
+
+        # Mesmo hash do Selenium: vale também para rifas capturadas pelo outro motor
+        digest = table_hash(table)
+        if previous_report and previous_report.get('hash_tabela') == digest:
+            self.count_change('hash_igual')
+            return reuse_report(previous_report, rifa_info, url)
+
+        if not rifa_info.get('titulo'):
+            fill_title(soup or BeautifulSoup(response.text, 'html.parser'), rifa_info)
+        report_data = new_report(token, url, rifa_info)
+        fill_report(report_data, table)
+
+        self.count_change('parseados')
+        report_data['hash_tabela'] = digest
+        return report_data
+
+    def count_change(self, kind):
+        if self.change_stats:
+            self.change_stats.count(kind)
+
+    def close(self):
+        """Fecha o pool de conexões"""
+        self.session.close()
@@ -0,0 +1,102 @@
+"""
+Ponteiro para a última captura - Império Rapidinhas
+save_data grava data/captures/latest.json (arquivo, timestamp, resumo) de
+forma atômica a cada captura; servidor web, API da automação e CLI leem
+esse ponteiro em vez de varrer e ordenar as pastas a cada requisição, então
+o custo não depende de quantos arquivos existem. Sem ponteiro (dados
+anteriores a ele) os leitores voltam à varredura.
+"""
+import json
+import os
+from pathlib import Path
+
+LATEST_FILE = 'latest.json'
+
+
+def read_latest(data_dir='data/captures'):
+    """Ponteiro da última captura (None se ausente ou se o arquivo apontado sumiu)"""
+    try:
+        with open(Path(data_dir) / LATEST_FILE, 'r', encoding='utf-8') as f:
+            latest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    # Path('') é '.', que sempre existe: ponteiro sem arquivo é inválido
+    arquivo = latest.get('arquivo') if isinstance(latest, dict) else None
+    if not arquivo or not Path(arquivo).is_file():
+        return None
+    return latest
+
+
+def write_latest(data_dir, latest):
+    """Substitui o ponteiro de uma vez (tmp + os.replace)"""
+    path = Path(data_dir) / LATEST_FILE
+    tmp_file = path.with_suffix('.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(latest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_file, path)
+
+
+def update_latest(data_dir, filepath, captura, resumo, summary_file=None, history_id=None, new_file=True):
+    """Aponta para a captura recém-salva e conta mais um captura_*.json (modo json)
+
+    Também acrescenta a captura ao manifest, então toda origem (daemon,
+    servidor web, CLI) e os dois formatos passam por aqui.
+    new_file=False: a captura apontada foi atualizada no lugar (camada
+    quente), então o total não muda e o resumo_*.json anterior continua.
+    """
+    data_dir = Path(data_dir)
+    try:
+        with open(data_dir / LATEST_FILE, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+        total = previous.get('total_arquivos', 0) + (1 if new_file and not history_id else 0)
+    except (OSError, ValueError):
+        # Primeiro ponteiro: conta uma vez o que já existe (inclui o recém-salvo)
+        previous = {}
+        total = len(list(data_dir.glob('captura_*.json')))
+
+    if summary_file is None and not new_file:
+        summary_file = previous.get('resumo_arquivo')
+
+    latest = {
+        'arquivo': str(Path(filepath).resolve()),
+        'formato': 'delta' if history_id else 'json',
+        'historico_id': history_id,
+        'resumo_arquivo': str(Path(summary_file).resolve()) if summary_file else None,
+        'timestamp': captura.get('timestamp'),
+        'timestamp_unix': captura.get('timestamp_unix'),
+        'camada': captura.get('camada'),
+        'resumo': resumo,
+        'total_arquivos': total
+    }
+    write_latest(data_dir, latest)
+
+    from capture_manifest import CaptureManifest
+    manifest = CaptureManifest(data_dir)
+    manifest.append(manifest.entry(latest['arquivo'], captura, resumo))
+    return latest
+
+
+def discount_latest(data_dir, removed):
+    """Desconta arquivos removidos pela limpeza do total do ponteiro"""
+    try:
+        with open(Path(data_dir) / LATEST_FILE, 'r', encoding='utf-8') as f:
+            latest = json.load(f)
+    except (OSError, ValueError):
+        return
+    latest['total_arquivos'] = max(0, latest.get('total_arquivos', 0) - removed)
+    write_latest(data_dir, latest)
+
+
+def load_latest_data(data_dir='data/captures'):
+    """Captura completa apontada pelo ponteiro (None se não houver ponteiro)"""
+    latest = read_latest(data_dir)
+    if latest is None:
+        return None
+
+    if latest['formato'] == 'delta':
+        from capture_history import CaptureHistory
+        return CaptureHistory(Path(latest['arquivo']).parent).rebuild(latest['historico_id'])
+
+    with open(latest['arquivo'], 'r', encoding='utf-8') as f:
+        return json.load(f)
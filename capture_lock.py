@@ -0,0 +1,139 @@
+"""
+Trava de captura única entre processos - Império Rapidinhas
+Agendador, API da automação, servidor web e CLI podem pedir uma captura ao
+mesmo tempo para a mesma conta. Só um deles executa: a trava é um lock de
+sistema operacional em data/locks/capture.lock (liberado automaticamente se
+o processo morrer), e quem chega depois espera a captura em andamento
+terminar e recebe o mesmo resultado, lido de capture.lock.json.
+"""
+import json
+import os
+import socket
+import time
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+class CaptureLock:
+    """Single-flight: executa a função ou se acopla à execução em andamento"""
+
+    def __init__(self, lock_file='data/locks/capture.lock', account=None, poll=1.0, log=None):
+        self.lock_file = Path(lock_file)
+        self.state_file = self.lock_file.with_name(self.lock_file.name + '.json')
+        self.account = account
+        self.poll = poll
+        self.log = log or print
+        self.handle = None
+
+    def try_acquire(self):
+        """Tenta pegar o lock sem bloquear; True se conseguiu"""
+        self.lock_file.parent.mkdir(parents=True, exist_ok=True)
+        handle = open(self.lock_file, 'a+')
+        try:
+            if fcntl:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            handle.close()
+            return False
+
+        self.handle = handle
+        return True
+
+    def release(self):
+        if self.handle is None:
+            return
+        try:
+            if fcntl:
+                fcntl.flock(self.handle.fileno(), fcntl.LOCK_UN)
+            else:
+                self.handle.seek(0)
+                msvcrt.locking(self.handle.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self.handle.close()
+            self.handle = None
+
+    def busy(self):
+        """Há uma captura em andamento (trava com outro dono)?"""
+        if self.handle is not None:
+            return True
+        if self.try_acquire():
+            self.release()
+            return False
+        return True
+
+    def read_state(self):
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def write_state(self, state):
+        tmp_file = self.state_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, self.state_file)
+
+    def run(self, func, on_wait=None):
+        """Executa `func()` com exclusividade; retorna (resultado, acoplado)
+
+        Se outra captura já estiver rodando, aguarda o fim dela (chamando
+        `on_wait(estado)` a cada verificação, que pode levantar exceção para
+        desistir) e devolve o resultado dela com acoplado=True. Se a captura
+        em andamento morrer sem concluir, esta executa a sua própria.
+        O resultado de `func` precisa ser serializável em JSON (ou Path).
+        """
+        waiting_since = None
+
+        while not self.try_acquire():
+            state = self.read_state()
+            if waiting_since is None:
+                waiting_since = time.time()
+                self.log(
+                    f"🔒 Captura já em andamento (pid {state.get('pid', '?')} em "
+                    f"{state.get('host', '?')}), aguardando o resultado dela..."
+                )
+            if on_wait:
+                on_wait(state)
+            time.sleep(self.poll)
+
+        try:
+            if waiting_since is not None:
+                state = self.read_state()
+                if state.get('status') == 'concluida' and state.get('finished', 0) >= waiting_since:
+                    self.log("🔗 Resultado compartilhado da captura que estava em andamento")
+                    return state.get('result'), True
+
+            started = time.time()
+            self.write_state({
+                'status': 'executando',
+                'pid': os.getpid(),
+                'host': socket.gethostname(),
+                'account': self.account,
+                'started': started
+            })
+
+            result = None
+            try:
+                result = func()
+            finally:
+                self.write_state({
+                    'status': 'concluida',
+                    'pid': os.getpid(),
+                    'host': socket.gethostname(),
+                    'account': self.account,
+                    'started': started,
+                    'finished': time.time(),
+                    'result': str(result) if isinstance(result, Path) else result
+                })
+            return result, False
+        finally:
+            self.release()
@@ -0,0 +1,171 @@
+"""
+Manifest incremental das capturas - Império Rapidinhas
+Cada captura salva (update_latest, modo json ou delta) acrescenta uma linha
+em data/captures/manifest.jsonl; de tempos em tempos a compactação junta
+essas linhas ao manifest.json (as `limit` capturas mais recentes + total de
+arquivos) e zera o log. Nenhum arquivo de captura é relido: o custo de
+atualizar não cresce com o histórico. rebuild() refaz tudo varrendo a pasta
+e o índice de data/history (manifest ausente ou corrompido).
+"""
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+from capture_history import CaptureHistory
+
+MANIFEST_FILE = 'manifest.json'
+LOG_FILE = 'manifest.jsonl'
+
+
+class CaptureManifest:
+    """manifest.json compactado + manifest.jsonl só com acréscimos"""
+
+    def __init__(self, data_dir='data/captures', base_dir='.', limit=100, compact_every=50, log=None,
+                 history_dir=None):
+        self.data_dir = Path(data_dir)
+        self.history_dir = Path(history_dir) if history_dir else self.data_dir.parent / 'history'
+        self.base_dir = Path(base_dir)
+        self.manifest_file = self.data_dir / MANIFEST_FILE
+        self.log_file = self.data_dir / LOG_FILE
+        self.limit = limit
+        self.compact_every = compact_every
+        self.log = log or (lambda message: None)
+
+    def entry(self, path, captura, resumo):
+        """Linha do manifest de uma captura (dados do ponteiro latest.json, sem abrir o arquivo)"""
+        path = Path(path)
+        try:
+            relative = str(path.relative_to(self.base_dir.resolve()))
+        except ValueError:
+            relative = str(path)
+
+        return {
+            'filename': path.name,
+            'path': relative,
+            'timestamp': captura.get('timestamp'),
+            'timestamp_unix': captura.get('timestamp_unix', 0),
+            'total_rifas': resumo.get('total_rifas', 0),
+            'arrecadado_total': resumo.get('arrecadado_total', 0),
+            'size_kb': path.stat().st_size / 1024
+        }
+
+    def load_compacted(self):
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def load_log(self):
+        """Linhas acrescentadas desde a última compactação (no máximo ~compact_every)"""
+        entries = []
+        try:
+            with open(self.log_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        continue  # Linha truncada por queda no meio da escrita
+        except OSError:
+            pass
+        return entries
+
+    def read(self):
+        """Manifest no formato de sempre ({'updated', 'total_files', 'files'}), mais recentes primeiro"""
+        manifest = self.load_compacted() or {'updated': None, 'total_files': 0, 'files': []}
+        appended = self.load_log()
+        if not appended:
+            return manifest
+
+        # Linha repetida = captura atualizada no lugar (camada quente): vale a última
+        updated = {}
+        for e in appended:
+            updated[e['filename']] = e
+
+        known = {e['filename'] for e in manifest['files']}
+        new = [e for e in updated.values() if e['filename'] not in known]
+        files = [updated.get(e['filename'], e) for e in manifest['files']]
+        return {
+            'updated': datetime.fromtimestamp(self.log_file.stat().st_mtime).isoformat(),
+            'total_files': manifest['total_files'] + len(new),
+            'files': (new[::-1] + files)[:self.limit]
+        }
+
+    def append(self, entry):
+        """Acrescenta (ou atualiza) uma captura; compacta a cada `compact_every` linhas"""
+        if self.load_compacted() is None:
+            self.rebuild()
+            return
+
+        appended = self.load_log()
+        if entry in appended:
+            return
+        with open(self.log_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+
+        if len(appended) + 1 >= self.compact_every:
+            self.compact()
+
+    def remove(self, filenames):
+        """Tira do manifest arquivos apagados/comprimidos pela limpeza"""
+        if self.load_compacted() is None:
+            self.rebuild()
+            return
+
+        filenames = set(filenames)
+        manifest = self.read()
+        manifest['files'] = [e for e in manifest['files'] if e['filename'] not in filenames]
+        manifest['total_files'] = max(0, manifest['total_files'] - len(filenames))
+        self.write(manifest)
+
+    def compact(self):
+        """Junta o log ao manifest.json e zera o log"""
+        self.write(self.read())
+        self.log("Manifest compactado")
+
+    def write(self, manifest):
+        manifest = dict(manifest, updated=datetime.now().isoformat())
+        tmp_file = self.manifest_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_file, self.manifest_file)
+
+        if self.log_file.exists():
+            self.log_file.unlink()
+
+    @staticmethod
+    def file_time(path):
+        """Instante da captura pelo nome (captura_AAAAMMDD_HHMMSS.json); senão, mtime"""
+        try:
+            return datetime.strptime(path.stem[len('captura_'):], '%Y%m%d_%H%M%S').timestamp()
+        except ValueError:
+            return path.stat().st_mtime
+
+    def rebuild(self):
+        """Refaz o manifest varrendo a pasta e o índice do histórico
+
+        Só as `limit` capturas mais recentes são lidas; as do histórico
+        (modo delta) saem direto do índice, sem remontar nada.
+        """
+        candidates = [(self.file_time(f), f, None) for f in self.data_dir.glob('captura_*.json')]
+        candidates += [
+            (e.get('timestamp_unix', 0), self.history_dir / e['arquivo'], e)
+            for e in CaptureHistory(self.history_dir).entries
+        ]
+        candidates.sort(key=lambda c: c[0], reverse=True)
+        files = []
+
+        for _, path, history_entry in candidates[:self.limit]:
+            try:
+                if history_entry is None:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    captura, resumo = data['captura'], data['resumo_geral']
+                else:
+                    captura, resumo = history_entry, history_entry
+                files.append(self.entry(path.resolve(), captura, resumo))
+            except Exception as e:
+                self.log(f"Erro ao ler {path}: {e}")
+
+        self.write({'total_files': len(candidates), 'files': files})
@@ -0,0 +1,139 @@
+"""
+Paginação direta da lista de rifas - Império Rapidinhas
+Descobre o padrão de URL das páginas e o total de páginas a partir da
+primeira página, para buscar as demais pelo número em vez de clicar em
+"próxima", e lembra qual estratégia funcionou para o layout do site
+"""
+import json
+import os
+import re
+import time
+from pathlib import Path
+from urllib.parse import urljoin, urlparse, parse_qs, urlencode, urlunparse
+
+PAGE_PARAMS = ['page', 'pagina', 'p', 'pg']
+PAGE_PLACEHOLDER = '{page}'
+
+
+def page_url(template, page):
+    """Monta a URL de uma página a partir do template"""
+    return template.replace(PAGE_PLACEHOLDER, str(page))
+
+
+def _query_template(url, param):
+    parts = urlparse(url)
+    query = parse_qs(parts.query, keep_blank_values=True)
+    query[param] = [PAGE_PLACEHOLDER]
+    encoded = urlencode(query, doseq=True).replace('%7Bpage%7D', PAGE_PLACEHOLDER)
+    return urlunparse(parts._replace(query=encoded))
+
+
+def _page_number_from_link(url):
+    """Identifica o número da página em um link: (estratégia, template, número)"""
+    parts = urlparse(url)
+    query = parse_qs(parts.query)
+
+    for param in PAGE_PARAMS:
+        values = query.get(param)
+        if values and values[0].isdigit():
+            return 'query', _query_template(url, param), int(values[0])
+
+    match = re.search(r'/(?:page|pagina)/(\d+)/?$', parts.path)
+    if match:
+        path = parts.path[:match.start(1)] + PAGE_PLACEHOLDER + parts.path[match.end(1):]
+        return 'path', urlunparse(parts._replace(path=path)), int(match.group(1))
+
+    return None
+
+
+def detect_pagination(soup, current_url):
+    """Lê o template de URL e o total de páginas dos links de paginação
+
+    Retorna {'strategy', 'template', 'total_pages'} ou None quando a página
+    não expõe links numerados (total_pages pode ser None se só o padrão
+    for identificável).
+    """
+    containers = soup.select('.pagination') or [soup]
+    templates = {}
+
+    for container in containers:
+        for link in container.find_all('a', href=True):
+            href = link['href']
+            if href.startswith('#') or href.lower().startswith('javascript'):
+                continue
+
+            found = _page_number_from_link(urljoin(current_url, href))
+            if not found:
+                continue
+
+            strategy, template, number = found
+            entry = templates.setdefault(template, {'strategy': strategy, 'max': 0})
+            entry['max'] = max(entry['max'], number)
+
+    total_from_text = None
+    match = re.search(r'p[áa]gina\s+\d+\s+de\s+(\d+)', soup.get_text(' '), re.IGNORECASE)
+    if match:
+        total_from_text = int(match.group(1))
+
+    if not templates:
+        return None
+
+    # O template com maior número de página é o da paginação principal
+    template, entry = max(templates.items(), key=lambda item: item[1]['max'])
+    total_pages = max(entry['max'], total_from_text or 0) or None
+
+    return {
+        'strategy': entry['strategy'],
+        'template': template,
+        'total_pages': total_pages
+    }
+
+
+class PaginationMemory:
+    """Lembra em disco a estratégia de paginação que funcionou no site"""
+
+    def __init__(self, memory_file='data/cache/pagination.json'):
+        self.memory_file = Path(memory_file)
+        self.data = {}
+
+        if self.memory_file.exists():
+            try:
+                with open(self.memory_file, 'r', encoding='utf-8') as f:
+                    self.data = json.load(f)
+            except Exception:
+                self.data = {}
+
+    @property
+    def strategy(self):
+        return self.data.get('strategy')
+
+    @property
+    def template(self):
+        return self.data.get('template')
+
+    def template_for(self, base_url):
+        """Template lembrado aplicado ao base_url atual"""
+        if not self.template:
+            return None
+        return urljoin(base_url.rstrip('/') + '/', self.template)
+
+    def remember(self, strategy, template=None, total_pages=None):
+        """Salva a estratégia usada com sucesso (template sem o host)"""
+        if template:
+            template = urlunparse(urlparse(template)._replace(scheme='', netloc=''))
+
+        self.data = {
+            'strategy': strategy,
+            'template': template,
+            'total_pages': total_pages,
+            'updated': time.time()
+        }
+
+        try:
+            self.memory_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.memory_file.with_suffix('.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, indent=2)
+            os.replace(tmp_file, self.memory_file)
+        except Exception:
+            pass
@@ -0,0 +1,267 @@
+"""
+Parsing compartilhado da captura - Império Rapidinhas
+Converte o texto cru das tabelas (lista de rifas e relatórios) nas estruturas
+salvas por save_data, independente de o texto vir do Selenium ou do HTTP
+"""
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Status considerados encerrados (números não mudam mais)
+STATUS_FINALIZADOS = ['Finalizado', 'Concluído']
+
+# A partir deste número de linhas o parsing colunar compensa o custo fixo.
+# benchmarks/bench_report_columns.py (linhas em dict, melhor de 5): 0,84x com
+# 500 linhas, 1,14x com 1.000, 1,65x com 5.000, 1,50x com 20.000. O relatório
+# diário tem uma linha por dia, então quase sempre fica célula a célula; o
+# colunar só entra em tabelas longas (rifas de anos, relatórios por hora).
+COLUMNAR_MIN_ROWS = 1000
+
+
+def parse_money(text):
+    """Converte string monetária para float"""
+    if not text:
+        return 0.0
+
+    clean = re.sub(r'[^\d,.-]', '', str(text))
+    if not clean:
+        return 0.0
+
+    clean = clean.replace('.', '').replace(',', '.')
+
+    try:
+        return float(clean)
+    except:
+        return 0.0
+
+
+def parse_quantity(text):
+    """Extrai quantidade de strings como '93 93%' ou '93'"""
+    if not text:
+        return 0
+
+    match = re.match(r'(\d+)', str(text).strip())
+    if match:
+        return int(match.group(1))
+
+    return 0
+
+
+def parse_int(text):
+    """Converte célula inteira, retornando 0 quando inválida"""
+    try:
+        return int(str(text).strip())
+    except:
+        return 0
+
+
+def new_rifa_info(index, checkbox_value, data_token, timestamp):
+    """Estrutura base de uma rifa da lista"""
+    return {
+        'index': index,
+        'checkbox_value': checkbox_value or '',
+        'data_token': data_token or '',
+        'timestamp_captura': timestamp,
+        'id': '',
+        'titulo': '',
+        'status': 'Desconhecido'
+    }
+
+
+def fill_rifa_from_cells(rifa_info, cells):
+    """Preenche ID, título e status a partir das células da linha (TR)
+
+    Estrutura usual: TD 0 checkbox | TD 1 ID | TD 2 Título | TD 3 Status
+    Retorna False quando a linha não tem colunas suficientes.
+    """
+    if len(cells) < 3:
+        return False
+
+    id_text = (cells[1] or '').strip()
+    if id_text:
+        rifa_info['id'] = id_text
+
+    titulo_text = (cells[2] or '').strip()
+    if titulo_text:
+        rifa_info['titulo'] = titulo_text
+
+    if len(cells) > 3:
+        status_text = (cells[3] or '').strip()
+        if status_text:
+            rifa_info['status'] = status_text
+
+    return True
+
+
+def fill_rifa_from_text(rifa_info, text):
+    """Fallback: extrai ID, título e status do texto geral do container"""
+    if not text:
+        return
+
+    id_match = re.search(r'#(\d{4,})', text)
+    if id_match:
+        rifa_info['id'] = f"#{id_match.group(1)}"
+
+    title_match = re.search(r'(\d+º?\s*RAPIDINHA.*?R\$[\d.,]+)', text, re.IGNORECASE)
+    if title_match:
+        rifa_info['titulo'] = title_match.group(1)
+
+    lower = text.lower()
+    if 'ativo' in lower:
+        rifa_info['status'] = 'Ativo'
+    elif 'concluído' in lower or 'concluido' in lower:
+        rifa_info['status'] = 'Concluído'
+    elif 'finalizado' in lower:
+        rifa_info['status'] = 'Finalizado'
+
+
+def title_from_breadcrumb(items):
+    """Retorna o último item do breadcrumb que contém 'RAPIDINHA'"""
+    for text in reversed(items):
+        text = (text or '').strip()
+        if 'RAPIDINHA' in text.upper():
+            return text
+    return ""
+
+
+def is_sales_table(headers):
+    """Verifica se é a tabela de vendas (tem colunas de data e vendas)"""
+    return any('data' in h for h in headers) and any('vendas' in h for h in headers)
+
+
+def map_report_columns(headers):
+    """Mapeia índices das colunas da tabela de vendas (headers em minúsculas)"""
+    return {
+        'data': next((i for i, h in enumerate(headers) if 'data' in h), -1),
+        'ticket': next((i for i, h in enumerate(headers) if 'ticket' in h or 'tícket' in h), -1),
+        'vendas': next((i for i, h in enumerate(headers) if 'vendas' in h), -1),
+        'titulos': next((i for i, h in enumerate(headers) if 'qtd' in h or 'título' in h), -1),
+        'total': next((i for i, h in enumerate(headers) if 'total' in h), -1)
+    }
+
+
+def parse_report_row(cells, col_map):
+    """Converte as células (texto) de uma linha da tabela de vendas"""
+    row_data = {}
+
+    if col_map['data'] >= 0:
+        row_data['data'] = (cells[col_map['data']] or '').strip()
+
+    if col_map['ticket'] >= 0:
+        row_data['ticket_medio'] = parse_money(cells[col_map['ticket']])
+
+    if col_map['vendas'] >= 0:
+        row_data['vendas'] = parse_int(cells[col_map['vendas']])
+
+    if col_map['titulos'] >= 0:
+        row_data['qtd_titulos'] = parse_quantity(cells[col_map['titulos']])
+
+    if col_map['total'] >= 0:
+        row_data['total'] = parse_money(cells[col_map['total']])
+
+    return row_data
+
+
+def parse_report_rows(headers, rows):
+    """Converte todas as linhas da tabela de vendas em dados_tabela"""
+    col_map = map_report_columns(headers)
+    dados_tabela = []
+
+    for cells in rows:
+        if len(cells) >= len(headers):
+            row_data = parse_report_row(cells, col_map)
+            if row_data.get('data'):
+                dados_tabela.append(row_data)
+
+    return dados_tabela
+
+
+def parse_report_table(headers, rows, recusadas=0):
+    """Linhas (dados_tabela) e resumo da tabela de vendas
+
+    Tabelas grandes passam pelo parsing colunar (capture_columns, centavos
+    inteiros); as pequenas, ou sem pyarrow instalado, seguem célula a célula.
+    """
+    if len(rows) >= COLUMNAR_MIN_ROWS:
+        import capture_columns
+        if capture_columns.available():
+            try:
+                columns = capture_columns.parse_report_columns(headers, rows)
+                return capture_columns.rows_from_columns(columns), capture_columns.summarize_columns(columns, recusadas)
+            except capture_columns.NonCanonicalTable:
+                pass  # Célula fora da forma canônica: a tabela inteira vai célula a célula
+            except Exception:
+                logger.exception("Erro no parsing colunar (%d linhas); seguindo célula a célula", len(rows))
+
+    dados_tabela = parse_report_rows(headers, rows)
+    return dados_tabela, summarize_report(dados_tabela, recusadas)
+
+
+def sales_table(tables):
+    """Tabela de vendas entre as extraídas da página, ou None
+
+    `tables` vem no formato do REPORT_TABLES_SCRIPT ({headers, rows,
+    footer}), o mesmo que o motor HTTP monta; headers voltam em minúsculas.
+    """
+    for table in tables:
+        headers = [h.strip().lower() for h in table.get('headers', [])]
+        if headers and is_sales_table(headers):
+            return dict(table, headers=headers)
+    return None
+
+
+def fill_report(report_data, table):
+    """Preenche dados_tabela/resumo do relatório a partir da tabela de vendas"""
+    recusadas = parse_recusadas(table.get('footer', ''))
+    report_data['resumo']['recusadas'] = recusadas
+
+    # Linhas e resumo calculados juntos
+    dados_tabela, resumo = parse_report_table(table['headers'], table.get('rows', []), recusadas)
+    report_data['dados_tabela'] = dados_tabela
+    if dados_tabela:
+        report_data['resumo'] = resumo
+
+
+def parse_recusadas(footer_text):
+    """Extrai o total de recusadas do rodapé da tabela"""
+    match = re.search(r'recusadas:\s*(\d+)', footer_text or '', re.IGNORECASE)
+    if match:
+        return int(match.group(1))
+    return 0
+
+
+def new_report(token, url, rifa_info):
+    """Estrutura base do relatório detalhado de uma rifa"""
+    return {
+        'token': token,
+        'url': url,
+        'titulo': rifa_info.get('titulo', ''),
+        'id': rifa_info.get('id', ''),
+        'checkbox_value': rifa_info.get('checkbox_value', ''),
+        'dados_tabela': [],
+        'resumo': {
+            'vendas_total': 0,
+            'titulos_total': 0,
+            'arrecadado_total': 0.0,
+            'ticket_medio_geral': 0.0,
+            'dias_com_vendas': 0,
+            'recusadas': 0
+        }
+    }
+
+
+def summarize_report(dados_tabela, recusadas=0):
+    """Calcula o resumo do relatório a partir das linhas da tabela"""
+    vendas_total = sum(r.get('vendas', 0) for r in dados_tabela)
+    titulos_total = sum(r.get('qtd_titulos', 0) for r in dados_tabela)
+    arrecadado_total = sum(r.get('total', 0) for r in dados_tabela)
+
+    return {
+        'vendas_total': vendas_total,
+        'titulos_total': titulos_total,
+        'arrecadado_total': arrecadado_total,
+        'dias_com_vendas': len(dados_tabela),
+        'ticket_medio_geral': arrecadado_total / titulos_total if titulos_total > 0 else 0,
+        'recusadas': recusadas
+    }
@@ -0,0 +1,142 @@
+"""
+Perfil de navegador para scraping - Império Rapidinhas
+O capturador só lê texto das tabelas, tokens e breadcrumb: o perfil
+"scrape" (opcional, capture.browser_profile = "scrape") usa carregamento
+eager e bloqueia imagens, fontes, mídia, CSS e scripts de terceiros na
+camada de rede. O padrão continua "full", a página completa. Também mede
+bytes e tempo de carregamento por página para comparar os perfis.
+"""
+import json
+import os
+import threading
+from pathlib import Path
+
+# Padrões bloqueados via CDP (Network.setBlockedURLs), por categoria
+BLOCK_PATTERNS = {
+    'images': ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico', '*.bmp'],
+    'fonts': ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot', '*fonts.googleapis.com*', '*fonts.gstatic.com*'],
+    'media': ['*.mp4', '*.webm', '*.mp3', '*.ogg', '*.wav', '*.m3u8'],
+    'styles': ['*.css'],
+    'third_party': [
+        '*googletagmanager.com*', '*google-analytics.com*', '*doubleclick.net*',
+        '*facebook.net*', '*connect.facebook.*', '*hotjar.com*', '*clarity.ms*',
+        '*tiktok.com*', '*onesignal.com*'
+    ]
+}
+
+PAGE_STATS_SCRIPT = """
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+return {
+    bytes: (nav ? nav.transferSize || 0 : 0) + resources.reduce((total, r) => total + (r.transferSize || 0), 0),
+    load_ms: nav ? Math.max(0, (nav.domContentLoadedEventEnd || nav.responseEnd) - nav.startTime) : 0,
+    resources: resources.length
+};
+"""
+
+
+def blocked_patterns(categories=None, allow=None):
+    """Lista de padrões a bloquear, sem os que casam com a whitelist"""
+    categories = categories or list(BLOCK_PATTERNS)
+    allow = allow or []
+
+    patterns = []
+    for category in categories:
+        for pattern in BLOCK_PATTERNS.get(category, []):
+            if not any(item in pattern or pattern.strip('*') in item for item in allow):
+                patterns.append(pattern)
+    return patterns
+
+
+def apply_scrape_options(options):
+    """Opções do Chrome para o perfil scrape (antes de criar o driver)"""
+    options.page_load_strategy = 'eager'
+    options.add_argument('--blink-settings=imagesEnabled=false')
+    options.add_experimental_option('prefs', {
+        'profile.managed_default_content_settings.images': 2,
+        'profile.managed_default_content_settings.media_stream': 2
+    })
+
+
+def block_resources(driver, patterns):
+    """Liga o bloqueio de URLs na camada de rede do driver já criado"""
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+
+
+class PageLoadStats:
+    """Acumula bytes transferidos e tempo de carregamento das páginas"""
+
+    def __init__(self, profile):
+        self.profile = profile
+        self.pages = 0
+        self.bytes = 0
+        self.load_ms = 0.0
+        self.lock = threading.Lock()
+
+    def record(self, driver):
+        """Lê a Performance API da página atual e soma aos totais"""
+        try:
+            stats = driver.execute_script(PAGE_STATS_SCRIPT) or {}
+        except Exception:
+            return
+
+        with self.lock:
+            self.pages += 1
+            self.bytes += int(stats.get('bytes') or 0)
+            self.load_ms += float(stats.get('load_ms') or 0)
+
+    def summary(self):
+        return {
+            'perfil': self.profile,
+            'paginas': self.pages,
+            'bytes': self.bytes,
+            'bytes_por_pagina': round(self.bytes / self.pages) if self.pages else 0,
+            'load_ms_medio': round(self.load_ms / self.pages, 1) if self.pages else 0.0
+        }
+
+
+class ProfileHistory:
+    """Totais acumulados por perfil, para comparar antes/depois entre capturas"""
+
+    def __init__(self, history_file='data/cache/profile_stats.json'):
+        self.history_file = Path(history_file)
+        self.data = {}
+
+        if self.history_file.exists():
+            try:
+                with open(self.history_file, 'r', encoding='utf-8') as f:
+                    self.data = json.load(f)
+            except Exception:
+                self.data = {}
+
+    def add(self, stats):
+        """Soma as páginas de uma captura ao perfil correspondente"""
+        if not stats.pages:
+            return
+
+        entry = self.data.setdefault(stats.profile, {'capturas': 0, 'paginas': 0, 'bytes': 0, 'load_ms': 0.0})
+        entry['capturas'] += 1
+        entry['paginas'] += stats.pages
+        entry['bytes'] += stats.bytes
+        entry['load_ms'] += stats.load_ms
+
+        try:
+            self.history_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.history_file.with_suffix('.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, indent=2)
+            os.replace(tmp_file, self.history_file)
+        except Exception:
+            pass
+
+    def comparison(self):
+        """Média por página de cada perfil já usado"""
+        return {
+            profile: {
+                'capturas': entry['capturas'],
+                'bytes_por_pagina': round(entry['bytes'] / entry['paginas']) if entry['paginas'] else 0,
+                'load_ms_medio': round(entry['load_ms'] / entry['paginas'], 1) if entry['paginas'] else 0.0
+            }
+            for profile, entry in self.data.items()
+        }
@@ -0,0 +1,97 @@
+"""
+Sessões persistentes - Império Rapidinhas
+Guarda os cookies de um login bem-sucedido para que as próximas capturas
+reaproveitem a sessão enquanto ela for válida, em vez de refazer o login
+"""
+import json
+import os
+import time
+from pathlib import Path
+
+
+class SessionStore:
+    """Cookies autenticados por conta, com contadores de reuso"""
+
+    def __init__(self, session_file='data/session/session.json', account=''):
+        self.session_file = Path(session_file)
+        self.account = account
+        self.data = self.read()
+        self.reused = False
+
+    def read(self):
+        if not self.session_file.exists():
+            return {}
+
+        try:
+            with open(self.session_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception:
+            return {}
+
+        # Sessão de outra conta/site não serve
+        if data.get('account') != self.account:
+            return {'login_count': 0, 'reuse_count': 0}
+        return data
+
+    def write(self):
+        self.session_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.session_file.with_suffix('.tmp')
+
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=2)
+
+        # Cookies de sessão: apenas o dono do arquivo deve ler
+        try:
+            os.chmod(tmp_file, 0o600)
+        except OSError:
+            pass
+
+        os.replace(tmp_file, self.session_file)
+
+    @property
+    def cookies(self):
+        return self.data.get('cookies') or []
+
+    @property
+    def user_agent(self):
+        return self.data.get('user_agent')
+
+    def save(self, cookies, user_agent=None):
+        """Registra os cookies de um login novo"""
+        now = time.time()
+        self.data.update({
+            'account': self.account,
+            'cookies': cookies,
+            'user_agent': user_agent,
+            'created_at': now,
+            'last_used': now,
+            'login_count': self.data.get('login_count', 0) + 1
+        })
+        self.reused = False
+        self.write()
+
+    def mark_reused(self):
+        """Registra que a sessão salva foi reaproveitada nesta captura"""
+        self.data['last_used'] = time.time()
+        self.data['reuse_count'] = self.data.get('reuse_count', 0) + 1
+        self.reused = True
+        self.write()
+
+    def invalidate(self):
+        """Descarta os cookies (sessão expirada), mantendo os contadores"""
+        self.data.pop('cookies', None)
+        self.write()
+
+    def stats(self):
+        """Idade da sessão e taxa de reuso para as métricas da captura"""
+        logins = self.data.get('login_count', 0)
+        reuses = self.data.get('reuse_count', 0)
+        created_at = self.data.get('created_at')
+
+        return {
+            'reutilizada': self.reused,
+            'idade_s': round(time.time() - created_at, 1) if created_at else None,
+            'logins': logins,
+            'reusos': reuses,
+            'taxa_reuso': round(reuses / (logins + reuses), 3) if logins + reuses else 0.0
+        }
@@ -0,0 +1,202 @@
+"""
+Controle de ritmo das requisições - Império Rapidinhas
+Token bucket por host para limitar requisições por segundo sem pausas fixas,
+e controle adaptativo (AIMD) de concorrência e ritmo conforme a saúde do site
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+
+class TokenBucket:
+    """Token bucket thread-safe: `rate` tokens por segundo, até `capacity` acumulados"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def acquire(self, tokens=1):
+        """Bloqueia até haver tokens disponíveis; retorna o tempo esperado"""
+        waited = 0.0
+
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+
+                delay = (tokens - self.tokens) / self.rate if self.rate > 0 else 1.0
+
+            time.sleep(delay)
+            waited += delay
+
+    def set_rate(self, rate):
+        """Muda a taxa mantendo os tokens já acumulados"""
+        with self.lock:
+            self._refill(time.monotonic())
+            self.rate = float(rate)
+
+
+class HostRateLimiter:
+    """Um TokenBucket por host, criado sob demanda"""
+
+    def __init__(self, requests_per_second, burst=None):
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, host):
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.requests_per_second, self.burst)
+            return self.buckets[host]
+
+    def acquire(self, host):
+        """Aguarda a vez de fazer uma requisição ao host"""
+        return self.bucket(host).acquire()
+
+    def set_rate(self, requests_per_second):
+        """Aplica uma nova taxa a todos os hosts (usado pelo controle adaptativo)"""
+        with self.lock:
+            self.requests_per_second = requests_per_second
+            buckets = list(self.buckets.values())
+        for bucket in buckets:
+            bucket.set_rate(requests_per_second)
+
+
+# Eventos que indicam site sobrecarregado
+CONGESTION_EVENTS = ('timeout', '429', '5xx', 'alert')
+
+
+class AIMDController:
+    """Concorrência e requisições/s com aumento aditivo e redução multiplicativa
+
+    A cada `window` respostas saudáveis (latência média até `latency_target`)
+    soma `additive_concurrency` e `additive_rate`; um timeout, 429/5xx ou
+    alert multiplica os dois por `decrease_factor`. Falhas dentro de
+    `cooldown` segundos ou das próximas `window` respostas após uma redução
+    contam como o mesmo evento, para uma rajada de falhas das requisições em
+    voo não derrubar tudo ao mínimo.
+    """
+
+    def __init__(self, concurrency=4, rate=4.0, min_concurrency=1, max_concurrency=16,
+                 min_rate=0.5, max_rate=20.0, additive_concurrency=1, additive_rate=0.5,
+                 decrease_factor=0.5, latency_target=2.0, window=10, cooldown=2.0,
+                 limiter=None, log=None):
+        self.min_concurrency = max(1, int(min_concurrency))
+        self.max_concurrency = max(self.min_concurrency, int(max_concurrency))
+        self.min_rate = float(min_rate)
+        self.max_rate = max(self.min_rate, float(max_rate))
+        self.additive_concurrency = additive_concurrency
+        self.additive_rate = additive_rate
+        self.decrease_factor = decrease_factor
+        self.latency_target = latency_target
+        self.window = window
+        self.cooldown = cooldown
+        self.limiter = limiter
+        self.log = log or print
+
+        self.concurrency = min(max(int(concurrency), self.min_concurrency), self.max_concurrency)
+        self.rate = min(max(float(rate), self.min_rate), self.max_rate)
+        self.in_flight = 0
+        self.latencies = []
+        self.events = {}
+        self.history = []
+        self.started = time.monotonic()
+        self.last_decrease = None
+        self.since_decrease = 0
+        self.condition = threading.Condition()
+
+        if self.limiter:
+            self.limiter.set_rate(self.rate)
+
+    @contextmanager
+    def slot(self):
+        """Ocupa uma das `concurrency` vagas atuais (bloqueia se não houver)"""
+        with self.condition:
+            while self.in_flight >= self.concurrency:
+                self.condition.wait()
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.in_flight -= 1
+                self.condition.notify_all()
+
+    def record(self, event='ok', latency=None):
+        """Registra o resultado de uma requisição/página ('ok' ou um evento de congestionamento)"""
+        with self.condition:
+            self.events[event] = self.events.get(event, 0) + 1
+            self.since_decrease += 1
+
+            if event in CONGESTION_EVENTS:
+                self._decrease(event)
+            elif event == 'ok' and latency is not None:
+                self.latencies.append(latency)
+                if len(self.latencies) >= self.window:
+                    average = sum(self.latencies) / len(self.latencies)
+                    self.latencies = []
+                    if average <= self.latency_target:
+                        self._increase(average)
+
+            self.condition.notify_all()
+
+    def _increase(self, average):
+        concurrency = min(self.max_concurrency, self.concurrency + self.additive_concurrency)
+        rate = min(self.max_rate, self.rate + self.additive_rate)
+        if concurrency != self.concurrency or rate != self.rate:
+            self._apply(concurrency, rate, 'aumento', f"latência média {average:.2f}s")
+
+    def _decrease(self, event):
+        now = time.monotonic()
+        if self.last_decrease is not None and (
+                now - self.last_decrease < self.cooldown or self.since_decrease <= self.window):
+            return
+        self.last_decrease = now
+        self.since_decrease = 0
+        self.latencies = []
+
+        concurrency = max(self.min_concurrency, int(self.concurrency * self.decrease_factor))
+        rate = max(self.min_rate, self.rate * self.decrease_factor)
+        self._apply(concurrency, rate, 'reducao', event)
+
+    def _apply(self, concurrency, rate, kind, reason):
+        self.concurrency = concurrency
+        self.rate = round(rate, 2)
+        if self.limiter:
+            self.limiter.set_rate(self.rate)
+
+        self.history.append({
+            't': round(time.monotonic() - self.started, 2),
+            'evento': kind,
+            'motivo': reason,
+            'concorrencia': self.concurrency,
+            'taxa_rps': self.rate
+        })
+        arrow = '⬆️' if kind == 'aumento' else '⬇️'
+        self.log(f"{arrow} Ritmo adaptativo: {self.concurrency} em paralelo, {self.rate} req/s ({reason})")
+
+    def summary(self):
+        """Estado final e histórico de ajustes para as métricas da captura"""
+        return {
+            'concorrencia_final': self.concurrency,
+            'taxa_final_rps': self.rate,
+            'aumentos': sum(1 for h in self.history if h['evento'] == 'aumento'),
+            'reducoes': sum(1 for h in self.history if h['evento'] == 'reducao'),
+            'eventos': dict(self.events),
+            'historico': self.history
+        }
@@ -0,0 +1,61 @@
+"""
+Camadas de captura - Império Rapidinhas
+A varredura completa (lista + relatórios) roda no horário de sempre; entre
+uma e outra, a camada "quente" (opcional) atualiza só os relatórios das
+rifas ativas que venderam nos últimos dias, gravando-os na própria última
+captura salva em vez de um snapshot novo. Rifas encerradas nunca são
+buscadas na camada quente.
+"""
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from capture_latest import read_latest
+
+STATUS_ATIVOS = ('Ativo', 'Ativa')
+
+
+def parse_sale_date(text):
+    """Data da linha da tabela diária ('DD/MM/AAAA', com ou sem hora)"""
+    try:
+        return datetime.strptime((text or '').strip()[:10], '%d/%m/%Y')
+    except ValueError:
+        return None
+
+
+def last_sale_date(report):
+    """Dia mais recente com vendas no relatório (None se nenhum)"""
+    dates = [
+        parse_sale_date(row.get('data'))
+        for row in (report or {}).get('dados_tabela', [])
+        if row.get('vendas', 0) > 0
+    ]
+    dates = [d for d in dates if d]
+    return max(dates) if dates else None
+
+
+def hot_tokens(data, recent_days=1, now=None):
+    """Tokens das rifas ativas com vendas nos últimos `recent_days` dias"""
+    now = now or datetime.now()
+    since = (now - timedelta(days=recent_days)).replace(hour=0, minute=0, second=0, microsecond=0)
+    reports = data.get('relatorios_detalhados', {})
+
+    tokens = []
+    for rifa in data.get('rifas', []):
+        token = rifa.get('data_token')
+        if not token or rifa.get('status') not in STATUS_ATIVOS:
+            continue
+        last_sale = last_sale_date(reports.get(token))
+        if last_sale is not None and last_sale >= since:
+            tokens.append(token)
+    return tokens
+
+
+def latest_capture_file(data_dir='data/captures'):
+    """captura_*.json mais recente (pelo ponteiro latest.json ou varrendo a pasta)"""
+    latest = read_latest(data_dir)
+    if latest and latest['formato'] == 'json':
+        return Path(latest['arquivo'])
+
+    files = sorted(Path(data_dir).glob('captura_*.json'))
+    return files[-1] if files else None
+
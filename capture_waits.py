@@ -0,0 +1,167 @@
+"""
+Esperas por prontidão - Império Rapidinhas
+Substitui os time.sleep fixos por esperas em condições da página (DOM/rede),
+registrando quanto cada espera realmente levou e o tempo economizado
+"""
+import threading
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+# Condições (recebem o driver e retornam verdadeiro quando a página está pronta)
+
+def document_ready(driver):
+    """document.readyState completo e sem requisições jQuery pendentes"""
+    return driver.execute_script(
+        "return document.readyState === 'complete' && "
+        "(typeof jQuery === 'undefined' || jQuery.active === 0);"
+    )
+
+
+def element_present(css):
+    """Existe ao menos um elemento para o seletor CSS"""
+    def condition(driver):
+        return driver.execute_script("return document.querySelector(arguments[0]) !== null;", css)
+    return condition
+
+
+def page_ready(css):
+    """Elemento presente, ou a página provadamente sem ele (voltou para /auth)
+
+    O readyState 'complete' não basta: as tabelas são montadas por JS depois
+    dele. A queda para document_ready fica no ReadinessWaiter.wait_page,
+    só depois do timeout.
+    """
+    return any_of(element_present(css), url_has('/auth'))
+
+
+def url_left(fragment):
+    """A URL atual não contém mais o fragmento (ex.: saiu de /auth)"""
+    def condition(driver):
+        return fragment not in driver.current_url
+    return condition
+
+
+def url_has(fragment):
+    """A URL atual contém o fragmento (ex.: redirecionou para /auth)"""
+    def condition(driver):
+        return fragment in driver.current_url
+    return condition
+
+
+def alert_present(driver):
+    """Há um alert aberto"""
+    try:
+        driver.switch_to.alert
+        return True
+    except Exception:
+        return False
+
+
+def first_token_changed(previous_token):
+    """O primeiro data-token da lista mudou (nova página carregada)"""
+    def condition(driver):
+        token = driver.execute_script(
+            "const cb = document.querySelector(\"input[type='checkbox'][name='rifa[]']\");"
+            "return cb ? cb.getAttribute('data-token') : null;"
+        )
+        return token is not None and token != previous_token
+    return condition
+
+
+def any_of(*conditions):
+    """Verdadeiro quando qualquer uma das condições é satisfeita"""
+    def condition(driver):
+        return any(c(driver) for c in conditions)
+    return condition
+
+
+class ReadinessWaiter:
+    """Espera condições com timeout e registra a duração real de cada espera
+
+    `legacy_delay` é o sleep fixo que a espera substitui; a diferença entre
+    ele e o tempo realmente esperado entra como tempo economizado.
+    """
+
+    def __init__(self, timeout=10, poll=0.1, log=None):
+        self.timeout = timeout
+        self.poll = poll
+        self.log = log or print
+        self.records = []
+        self.lock = threading.Lock()
+
+    def wait(self, driver, condition, label, legacy_delay=0, timeout=None):
+        """Aguarda a condição; retorna True se satisfeita antes do timeout"""
+        timeout = self.timeout if timeout is None else timeout
+
+        def safe(d):
+            try:
+                return condition(d)
+            except Exception:
+                return False
+
+        start = time.monotonic()
+        try:
+            WebDriverWait(driver, timeout, poll_frequency=self.poll).until(safe)
+            ok = True
+        except TimeoutException:
+            ok = False
+            self.log(f"⏳ Espera '{label}' atingiu o timeout de {timeout}s")
+
+        waited = time.monotonic() - start
+
+        with self.lock:
+            self.records.append({
+                'label': label,
+                'waited': waited,
+                'legacy': legacy_delay,
+                'ok': ok
+            })
+
+        return ok
+
+    def wait_page(self, driver, css, label, legacy_delay=0, timeout=None):
+        """Aguarda o elemento `css` da página (ver page_ready)
+
+        Se ele não aparecer até o timeout, espera ao menos o documento
+        terminar de carregar antes de seguir. Retorna True se o elemento
+        (ou o redirecionamento para /auth) veio a tempo.
+        """
+        ok = self.wait(driver, page_ready(css), label, legacy_delay, timeout)
+        if not ok:
+            self.wait(driver, document_ready, f"{label}_documento", timeout=timeout)
+        return ok
+
+    def summary(self):
+        """Totais das esperas: tempo esperado, tempo fixo antigo e economia"""
+        with self.lock:
+            records = list(self.records)
+
+        waited = sum(r['waited'] for r in records)
+        legacy = sum(r['legacy'] for r in records)
+
+        by_label = {}
+        for r in records:
+            entry = by_label.setdefault(r['label'], {'count': 0, 'waited': 0.0, 'timeouts': 0})
+            entry['count'] += 1
+            entry['waited'] += r['waited']
+            if not r['ok']:
+                entry['timeouts'] += 1
+
+        return {
+            'total_esperas': len(records),
+            'tempo_esperado_s': round(waited, 3),
+            'tempo_fixo_anterior_s': round(legacy, 3),
+            'tempo_economizado_s': round(legacy - waited, 3),
+            'timeouts': sum(1 for r in records if not r['ok']),
+            'por_etapa': {
+                label: {
+                    'count': e['count'],
+                    'waited_s': round(e['waited'], 3),
+                    'timeouts': e['timeouts']
+                }
+                for label, e in by_label.items()
+            }
+        }
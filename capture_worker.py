@@ -0,0 +1,110 @@
+"""
+Navegador quente para o modo daemon - Império Rapidinhas
+Mantém o Chrome (e sua sessão/perfil) vivo entre capturas agendadas, em vez
+de reinstalar o driver, abrir o navegador e logar a cada execução. O
+navegador é reciclado após N capturas ou quando passa do limite de memória.
+"""
+import threading
+
+import psutil
+
+from capture_corrected import ImperioCapturaCorrected
+
+
+class WarmBrowserWorker:
+    """Executa capturas sucessivas reaproveitando o mesmo WebDriver"""
+
+    def __init__(self, config_file, max_captures=20, max_rss_mb=1500,
+                 user_data_dir='data/browser_profile', log=None):
+        self.config_file = config_file
+        self.max_captures = max_captures
+        self.max_rss_mb = max_rss_mb
+        self.user_data_dir = user_data_dir
+        self.log = log or print
+        self.driver = None
+        self.captures = 0
+        self.recycles = 0
+        self.lock = threading.Lock()
+
+    def run_capture(self, headless=True, capture_details=True, progress=None, cancel_event=None, tier='completa'):
+        """Roda uma captura com o navegador quente; retorna (resultado, captura)
+
+        `progress` e `cancel_event` são repassados à captura (fila de
+        capturas do servidor web).
+        """
+        # Um único navegador: capturas agendadas e manuais entram na fila
+        with self.lock:
+            return self._run_capture(headless, capture_details, progress, cancel_event, tier)
+
+    def _run_capture(self, headless, capture_details, progress=None, cancel_event=None, tier='completa'):
+        capture = ImperioCapturaCorrected(self.config_file)
+        capture.driver = self.driver
+        capture.progress_callback = progress
+        capture.cancel_event = cancel_event
+        if self.user_data_dir:
+            capture.user_data_dir = self.user_data_dir
+
+        try:
+            result = capture.run(headless=headless, capture_details=capture_details, keep_driver=True, tier=tier)
+        finally:
+            # A captura pode ter aberto o navegador sob demanda ou reciclado o do pool
+            self.driver = capture.driver
+
+        if self.driver:
+            self.captures += 1
+            # Camada quente sem rifas a atualizar (capture.skipped) não é falha
+            failed = not result and not capture.skipped
+            if failed or self.should_recycle():
+                self.recycle()
+
+        return result, capture
+
+    def rss_mb(self):
+        """Memória residente do chromedriver e de todos os processos do Chrome"""
+        try:
+            process = psutil.Process(self.driver.service.process.pid)
+            processes = [process] + process.children(recursive=True)
+        except Exception:
+            return 0.0
+
+        total = 0
+        for proc in processes:
+            try:
+                total += proc.memory_info().rss
+            except psutil.Error:
+                pass
+        return total / 1024 / 1024
+
+    def should_recycle(self):
+        if self.max_captures and self.captures >= self.max_captures:
+            self.log(f"♻️ Navegador atingiu {self.captures} capturas")
+            return True
+
+        rss = self.rss_mb()
+        if self.max_rss_mb and rss > self.max_rss_mb:
+            self.log(f"♻️ Navegador usando {rss:.0f} MB (limite {self.max_rss_mb} MB)")
+            return True
+
+        return False
+
+    def recycle(self):
+        """Fecha o navegador; a próxima captura abre um novo com o mesmo perfil"""
+        self.close()
+        self.captures = 0
+        self.recycles += 1
+
+    def stats(self):
+        return {
+            'navegador_ativo': self.driver is not None,
+            'capturas_no_navegador': self.captures,
+            'reciclagens': self.recycles,
+            'rss_mb': round(self.rss_mb(), 1) if self.driver else 0.0
+        }
+
+    def close(self):
+        if self.driver:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
@@ -5,22 +5,31 @@ Identifica a estrutura real da página para debug
 """
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.common.exceptions import NoAlertPresentException
 from bs4 import BeautifulSoup
 import json
-import time
+import sys
 from datetime import datetime
 from pathlib import Path
 
+from capture_fixtures import FixtureRecorder
+from capture_pagination import detect_pagination, page_url
+
+from capture_waits import (
+    ReadinessWaiter, document_ready, element_present, url_left, alert_present, any_of
+)
+
 class ImperioDiagnostic:
     def __init__(self, config_file='./config/config.json'):
         """Inicializa diagnóstico"""
         self.config = self.load_config(config_file)
         self.driver = None
+        self.waiter = ReadinessWaiter(
+            timeout=self.config.get('capture', {}).get('wait_timeout', 10)
+        )
         
     def load_config(self, config_file):
         """Carrega configuração"""
@@ -49,7 +58,7 @@ class ImperioDiagnostic:
             alert = self.driver.switch_to.alert
             print(f"📢 Alert detectado: '{alert.text}'")
             alert.accept()
-            time.sleep(1)
+            self.waiter.wait(self.driver, document_ready, 'alert', legacy_delay=1)
         except NoAlertPresentException:
             pass
     
@@ -58,7 +67,7 @@ class ImperioDiagnostic:
         print("\n🔐 Fazendo login...")
         
         self.driver.get(f"{self.config['imperio']['base_url']}/auth")
-        time.sleep(2)
+        self.waiter.wait(self.driver, element_present("[name='username']"), 'login_form', legacy_delay=2)
         
         # Login
         username_field = self.driver.find_element(By.NAME, "username")
@@ -70,7 +79,7 @@ class ImperioDiagnostic:
         login_button = self.driver.find_element(By.XPATH, "//button[@type='submit']")
         login_button.click()
         
-        time.sleep(3)
+        self.waiter.wait(self.driver, any_of(url_left('/auth'), alert_present), 'login_submit', legacy_delay=3)
         self.handle_alert()
         
         print("✅ Login realizado!")
@@ -82,7 +91,7 @@ class ImperioDiagnostic:
         
         # Navega para rifas
         self.driver.get(f"{self.config['imperio']['base_url']}/admin/rifas")
-        time.sleep(3)
+        self.waiter.wait_page(self.driver, "input[type='checkbox'][name='rifa[]']", 'rifas_list', legacy_delay=3)
         self.handle_alert()
         
         # Salva screenshot
@@ -221,7 +230,7 @@ class ImperioDiagnostic:
             
             print(f"🔗 Testando URL: {test_url}")
             self.driver.get(test_url)
-            time.sleep(2)
+            self.waiter.wait_page(self.driver, 'table.table', 'report', legacy_delay=2)
             
             # Verifica se carregou
             if "relatorio" in self.driver.current_url.lower():
@@ -240,7 +249,43 @@ class ImperioDiagnostic:
         else:
             print("⚠️ Nenhum token encontrado para teste")
     
-    def run(self):
+    def record_fixtures(self, max_list_pages=3, max_reports=10, fixtures_dir='data/fixtures'):
+        """Grava HTML da lista e de relatórios como fixtures para o benchmark offline"""
+        print("\n🎞️ GRAVANDO FIXTURES DE HTML")
+        print("="*60)
+        
+        recorder = FixtureRecorder(fixtures_dir)
+        base_url = self.config['imperio']['base_url']
+        checkbox_css = "input[type='checkbox'][name='rifa[]']"
+        
+        self.driver.get(f"{base_url}/admin/rifas")
+        self.waiter.wait_page(self.driver, checkbox_css, 'rifas_list', legacy_delay=3)
+        
+        html = self.driver.page_source
+        recorder.record('lista', self.driver.current_url, html, pagina=1)
+        tokens = [cb.get_attribute('data-token') for cb in self.driver.find_elements(By.CSS_SELECTOR, checkbox_css)]
+        
+        pagination = detect_pagination(BeautifulSoup(html, 'html.parser'), self.driver.current_url)
+        if pagination:
+            last_page = min(pagination.get('total_pages') or max_list_pages, max_list_pages)
+            for page in range(2, last_page + 1):
+                url = page_url(pagination['template'], page)
+                self.driver.get(url)
+                self.waiter.wait_page(self.driver, checkbox_css, 'pagination', legacy_delay=3)
+                recorder.record('lista', url, self.driver.page_source, pagina=page)
+        
+        for token in [t for t in tokens if t][:max_reports]:
+            url = f"{base_url}/admin/rifas/relatorios/{token}"
+            self.driver.get(url)
+            self.waiter.wait_page(self.driver, 'table.table', 'report', legacy_delay=2)
+            recorder.record('relatorio', url, self.driver.page_source, token=token)
+        
+        total = len(recorder.manifest['fixtures'])
+        print(f"✅ {total} fixtures em {recorder.fixtures_dir}")
+        print("💡 Rode: python benchmarks/bench_capture_parse.py")
+        return recorder.fixtures_dir
+    
+    def run(self, fixtures=False):
         """Executa diagnóstico completo"""
         print("🏥 FERRAMENTA DE DIAGNÓSTICO - IMPÉRIO RAPIDINHAS")
         print("="*60)
@@ -255,6 +300,12 @@ class ImperioDiagnostic:
             # Teste adicional
             self.test_direct_api_access()
             
+            if fixtures:
+                self.record_fixtures()
+            
+            waits = self.waiter.summary()
+            print(f"\n⏱️ Esperas: {waits['tempo_esperado_s']:.1f}s (sleeps fixos: {waits['tempo_fixo_anterior_s']:.1f}s)")
+            
             print("\n✅ Diagnóstico concluído!")
             print("\n📋 RESUMO:")
             print(f"   - Screenshot: {result['screenshot']}")
@@ -274,7 +325,7 @@ class ImperioDiagnostic:
 
 def main():
     diagnostic = ImperioDiagnostic()
-    diagnostic.run()
+    diagnostic.run(fixtures='--fixtures' in sys.argv)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
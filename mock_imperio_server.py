@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Servidor simulado do painel - Império Rapidinhas
+Imita /auth, a lista paginada /admin/rifas (checkboxes com data-token) e
+/admin/rifas/relatorios/{token}, com quantidade de rifas, linhas por
+relatório, latência e erros configuráveis. Serve para testar e medir a
+captura completa (ImperioCapturaCorrected/ImperioAutomationSystem) sem usar
+a conta de produção: basta apontar imperio.base_url para o endereço dele.
+
+Uso:
+    python mock_imperio_server.py --rifas 2000 --rows 90 --latency-ms 40 --error-rate 0.01
+"""
+import argparse
+import hashlib
+import json
+import random
+import secrets
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from capture_fixtures import synthetic_list_page, synthetic_report_page
+
+SESSION_COOKIE = 'imperio_session'
+
+LOGIN_PAGE = """<html><body>
+<form method="post" action="/auth">
+<input type="hidden" name="_token" value="{csrf}">
+<input type="text" name="username"> <input type="password" name="password">
+<button type="submit">Entrar</button>
+</form>{error}</body></html>"""
+
+
+class MockImperioState:
+    """Configuração e contadores compartilhados pelas requisições"""
+
+    def __init__(self, rifas=2000, per_page=50, rows=60, latency_ms=0, jitter_ms=0,
+                 error_rate=0.0, username=None, password=None, seed=0, etag=False):
+        self.rifas = rifas
+        self.per_page = per_page
+        self.rows = rows
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.username = username
+        self.password = password
+        self.etag = etag
+        self.random = random.Random(seed)
+        self.sessions = set()
+        self.csrf = secrets.token_hex(8)
+        self.counters = {'requests': 0, 'erros_injetados': 0, 'logins': 0, 'paginas_lista': 0, 'relatorios': 0, 'nao_modificados': 0}
+        self.lock = threading.Lock()
+
+    @property
+    def total_pages(self):
+        return max(1, -(-self.rifas // self.per_page))
+
+    def count(self, key):
+        with self.lock:
+            self.counters[key] += 1
+
+    def delay(self):
+        if self.latency_ms or self.jitter_ms:
+            with self.lock:
+                jitter = self.random.uniform(0, self.jitter_ms)
+            time.sleep((self.latency_ms + jitter) / 1000)
+
+    def inject_error(self):
+        if not self.error_rate:
+            return False
+        with self.lock:
+            failed = self.random.random() < self.error_rate
+            if failed:
+                self.counters['erros_injetados'] += 1
+        return failed
+
+    def check_credentials(self, username, password):
+        if self.username is not None and username != self.username:
+            return False
+        if self.password is not None and password != self.password:
+            return False
+        return bool(username and password)
+
+    def pagination(self, page):
+        links = ''.join(
+            f'<li class="page-item{" active" if n == page else ""}"><a class="page-link" href="/admin/rifas?page={n}">{n}</a></li>'
+            for n in range(1, self.total_pages + 1)
+        )
+        return f'<p>Página {page} de {self.total_pages}</p><ul class="pagination">{links}</ul>'
+
+    def list_page(self, page):
+        start = (page - 1) * self.per_page + 1
+        count = max(0, min(self.per_page, self.rifas - start + 1))
+        return synthetic_list_page(start, count, self.pagination(page))
+
+    def report_page(self, token):
+        try:
+            number = int(token.replace('tok', ''))
+        except ValueError:
+            return None
+        if not 1 <= number <= self.rifas:
+            return None
+        return synthetic_report_page(f'{number}º RAPIDINHA R$ 1.000,00', self.rows, seed=number)
+
+
+class MockImperioHandler(BaseHTTPRequestHandler):
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_html(self, html, status=200, headers=None):
+        body = html.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def redirect(self, location, headers=None):
+        self.send_response(302)
+        self.send_header('Location', location)
+        self.send_header('Content-Length', '0')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    def session_id(self):
+        for part in (self.headers.get('Cookie') or '').split(';'):
+            name, _, value = part.strip().partition('=')
+            if name == SESSION_COOKIE:
+                return value
+        return None
+
+    def authenticated(self):
+        return self.session_id() in self.state.sessions
+
+    def do_GET(self):
+        state = self.state
+        state.count('requests')
+        state.delay()
+
+        url = urlparse(self.path)
+
+        if url.path == '/__stats':
+            self.send_html(json.dumps(state.counters))
+            return
+
+        if url.path == '/auth':
+            if self.authenticated():
+                self.redirect('/admin/rifas')
+                return
+            error = '<div class="alert">Usuário ou senha inválidos</div>' if 'erro' in url.query else ''
+            self.send_html(LOGIN_PAGE.format(csrf=state.csrf, error=error))
+            return
+
+        if not url.path.startswith('/admin'):
+            self.redirect('/admin/rifas' if self.authenticated() else '/auth')
+            return
+
+        if not self.authenticated():
+            self.redirect('/auth')
+            return
+
+        if state.inject_error():
+            self.send_html('<h1>503 Service Unavailable</h1>', status=503)
+            return
+
+        if url.path.rstrip('/') == '/admin/rifas':
+            try:
+                page = int(parse_qs(url.query).get('page', ['1'])[0])
+            except ValueError:
+                page = 1
+            state.count('paginas_lista')
+            self.send_html(state.list_page(max(1, page)))
+            return
+
+        if url.path.startswith('/admin/rifas/relatorios/'):
+            html = state.report_page(url.path.rsplit('/', 1)[-1])
+            if html is None:
+                self.send_html('<h1>404</h1>', status=404)
+                return
+            if state.etag:
+                etag = '"' + hashlib.md5(html.encode('utf-8')).hexdigest() + '"'
+                if self.headers.get('If-None-Match') == etag:
+                    state.count('nao_modificados')
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                state.count('relatorios')
+                self.send_html(html, headers={'ETag': etag})
+                return
+            state.count('relatorios')
+            self.send_html(html)
+            return
+
+        self.send_html('<h1>404</h1>', status=404)
+
+    def do_POST(self):
+        state = self.state
+        state.count('requests')
+        state.delay()
+
+        if urlparse(self.path).path != '/auth':
+            self.send_html('<h1>404</h1>', status=404)
+            return
+
+        length = int(self.headers.get('Content-Length') or 0)
+        form = parse_qs(self.rfile.read(length).decode('utf-8'))
+        username = form.get('username', [''])[0]
+        password = form.get('password', [''])[0]
+
+        if form.get('_token', [''])[0] != state.csrf or not state.check_credentials(username, password):
+            self.redirect('/auth?erro=1')
+            return
+
+        session_id = secrets.token_hex(16)
+        with state.lock:
+            state.sessions.add(session_id)
+        state.count('logins')
+        self.redirect('/admin/rifas', {'Set-Cookie': f'{SESSION_COOKIE}={session_id}; Path=/; HttpOnly'})
+
+
+def start_mock_server(host='127.0.0.1', port=0, **options):
+    """Sobe o servidor em uma thread; retorna (server, base_url)"""
+    handler = type('Handler', (MockImperioHandler,), {'state': MockImperioState(**options)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor simulado do painel Império Rapidinhas')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--rifas', type=int, default=2000, help='Quantidade de rifas na lista')
+    parser.add_argument('--per-page', type=int, default=50, help='Rifas por página da lista')
+    parser.add_argument('--rows', type=int, default=60, help='Linhas (dias) por relatório')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Latência fixa por requisição')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Latência aleatória adicional')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fração de respostas 503 injetadas')
+    parser.add_argument('--etag', action='store_true', help='Relatórios com ETag e resposta 304 condicional')
+    parser.add_argument('--username', help='Usuário aceito (padrão: qualquer)')
+    parser.add_argument('--password', help='Senha aceita (padrão: qualquer)')
+    args = parser.parse_args()
+
+    server, base_url = start_mock_server(
+        args.host, args.port,
+        rifas=args.rifas, per_page=args.per_page, rows=args.rows,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        username=args.username, password=args.password, etag=args.etag
+    )
+
+    print("\n🎭 SERVIDOR SIMULADO - IMPÉRIO RAPIDINHAS")
+    print("=" * 60)
+    print(f"📍 {base_url}")
+    print(f"🎰 {args.rifas} rifas em {server.RequestHandlerClass.state.total_pages} páginas, {args.rows} linhas por relatório")
+    print(f"💡 Aponte imperio.base_url para {base_url} no config.json")
+    print("=" * 60)
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -180,26 +180,35 @@ def status():
         console.print("❌ Configuração: [red]Não encontrada[/red]")
     
     # Verifica dados
+    from capture_latest import read_latest
+    
     data_dir = ROOT_DIR / 'data' / 'captures'
-    if data_dir.exists():
+    captures = []
+    latest = read_latest(data_dir)
+    if latest:
+        # Ponteiro da última captura: sem varrer a pasta
+        console.print(f"\n📊 Capturas: [cyan]{latest.get('total_arquivos', 0)}[/cyan] arquivos")
+        console.print(f"   Última: {Path(latest['arquivo']).name}")
+        summary = latest.get('resumo', {})
+    elif data_dir.exists():
         captures = list(data_dir.glob('*.json'))
         console.print(f"\n📊 Capturas: [cyan]{len(captures)}[/cyan] arquivos")
         
         if captures:
             latest = max(captures, key=lambda p: p.stat().st_mtime)
             console.print(f"   Última: {latest.name}")
+            
+            # Carrega última captura
+            with open(latest, 'r') as f:
+                data = json.load(f)
+                summary = data.get('resumo_geral', {})
     
     # Tabela de estatísticas
-    if captures:
+    if latest:
         table = Table(title="\nEstatísticas Recentes", box=box.ROUNDED)
         table.add_column("Métrica", style="cyan")
         table.add_column("Valor", style="green")
         
-        # Carrega última captura
-        with open(latest, 'r') as f:
-            data = json.load(f)
-            summary = data.get('resumo_geral', {})
-            
         table.add_row("Total de Rifas", str(summary.get('total_rifas', 0)))
         table.add_row("Arrecadação Total", f"R$ {summary.get('arrecadado_total', 0):,.2f}")
         table.add_row("Títulos Vendidos", f"{summary.get('titulos_total', 0):,}")
@@ -207,6 +216,19 @@ def status():
         
         console.print(table)
 
+@cli.command()
+@click.option('--data-dir', default=str(ROOT_DIR / 'data' / 'captures'), help='Pasta dos captura_*.json')
+@click.option('--db', default=str(ROOT_DIR / 'data' / 'analytics.db'), help='Banco SQLite de analytics')
+@click.option('--backfill', is_flag=True, help='Confere no arquivo Parquet todas as capturas do banco')
+def ingest(data_dir, db, backfill):
+    """Carrega as capturas JSON no banco de analytics"""
+    from app.services.ingestion import IngestionStore
+    
+    store = IngestionStore(db)
+    count = store.ingest_pending(data_dir, log=logger.info, backfill=backfill)
+    total = store.query('SELECT COUNT(*) FROM capturas')[0][0]
+    logger.info(f"{count} capturas ingeridas ({total} no banco)")
+
 @cli.command()
 def shell():
     """Abre shell interativo"""